@@ -1,63 +1,68 @@
 import sys
+import numpy as np
 from itertools import combinations
-from collections import defaultdict, OrderedDict
+from collections import defaultdict, OrderedDict, ChainMap
 from pylogabstract.clustering.recursion_clustering import LogClustering
+from pylogabstract.preprocess.preprocess import Preprocess
 from pylogabstract.preprocess.hamming_similarity import HammingSimilarity
+from pylogabstract.preprocess.similarity_executor import SimilarityExecutor
+from pylogabstract.preprocess.token_dictionary import TokenDictionary, ASTERISK_ID
 from pylogabstract.parser.parser import Parser
+from pylogabstract.parser.raw_log_store import RawLogStore
 from pylogabstract.output.output import Output
 from pylogabstract.abstraction.abstraction_utility import AbstractionUtility
+from pylogabstract.abstraction.template_matcher import TemplateMatcher
 from pylogabstract.evaluation.evaluation import Evaluation
 
 
 class LogAbstraction(object):
-    def __init__(self):
-        self.abstractions_nonmerge = defaultdict(dict)
-        self.abstractions_nonmerge_id = 0
-        self.word_check = []
+    def __init__(self, workers=None, clustering_backend='girvan_newman', parser_backend=None, lsh_config=None,
+                 inference_socket=None, parse_cache=None):
+        self.__reset()
+
+        # parsed logs and unique events so far, update() continues from them
+        self.parsed_logs = OrderedDict()
+        self.raw_logs = {}
+        self.preprocess = Preprocess(self.parsed_logs, self.raw_logs, self.token_dictionary)
+        self.clustering_backend = clustering_backend
+        self.lsh_config = lsh_config
+
+        # initiate log parsing, labels come from an inference server only if its socket is given
+        # parse_cache: True to keep parse results of log files on disk, None for Config.use_parse_cache
+        self.parser = Parser(inference_socket, parser_backend, parse_cache)
 
-        # initiate log parsing
-        self.parser = Parser()
+        # worker pool shared by all graph constructions
+        self.executor = SimilarityExecutor(workers)
 
     @staticmethod
     def __get_asterisk(candidate):
-        # candidate: list of list
-        abstraction = ''
-
-        # transpose row to column
-        candidate_transpose = list(zip(*candidate))
-        candidate_length = len(candidate)
-
-        if candidate_length > 1:
-            # get abstraction
-            abstraction_list = []
-            for index, message in enumerate(candidate_transpose):
-                message_length = len(set(message))
-                if message_length == 1:
-                    abstraction_list.append(message[0])
-                else:
-                    abstraction_list.append('*')
-
-            abstraction = ' '.join(abstraction_list)
+        # candidate: list of token id arrays
+        # a position with different tokens becomes the asterisk, positions after the shortest one are dropped
+        if not candidate:
+            return np.array([], dtype=np.int32)
 
-        elif candidate_length == 1:
-            abstraction = ' '.join(candidate[0])
+        common = min(len(tokens) for tokens in candidate)
+        candidate = np.array([tokens[:common] for tokens in candidate], dtype=np.int32).reshape(len(candidate), common)
+        abstraction = candidate[0].copy()
+        abstraction[(candidate != abstraction).any(axis=0)] = ASTERISK_ID
 
         return abstraction
 
+    @staticmethod
+    def __update_asterisk(abstraction, words):
+        # add one more candidate to an abstraction, same result as __get_asterisk on all candidates
+        return [word1 if word1 == word2 else '*' for word1, word2 in zip(abstraction, words)]
+
     @staticmethod
     def __check_total_asterisk(abstraction1, abstraction2, cluster_id1, cluster_id2):
         # parent_id = smaller cluster merge into this cluster
         # child_id = merged cluster, not processed anymore
-        total1 = 0
-        total2 = 0
-        for word1, word2 in zip(abstraction1, abstraction2):
-            if word1 == '*':
-                total1 += 1
-            if word2 == '*':
-                total2 += 1
+        common = min(len(abstraction1), len(abstraction2))
+        total1 = int((abstraction1[:common] == ASTERISK_ID).sum())
+        total2 = int((abstraction2[:common] == ASTERISK_ID).sum())
 
         parent_id, child_id = -1, -1
-        parent_abstraction, child_abstraction = [], []
+        parent_abstraction, child_abstraction = np.array([], dtype=np.int32), np.array([], dtype=np.int32)
         if total1 > total2:
             parent_id = cluster_id1
             child_id = cluster_id2
@@ -86,55 +91,60 @@ class LogAbstraction(object):
         partial_parsed_logs = OrderedDict()
         partial_raw_logs = {}
         partial_event_attributes = {}
+
+        # raw log store is already indexed by line id, no raw text is copied
+        # after update(), the store is the last map of a ChainMap that is indexed by line id too
+        is_store = isinstance(raw_logs, RawLogStore) or \
+            (isinstance(raw_logs, ChainMap) and isinstance(raw_logs.maps[-1], RawLogStore))
+        if is_store:
+            partial_raw_logs = raw_logs
+
         for node in nodes:
             for line_index in event_attributes[node]['member']:
                 partial_parsed_logs[line_index] = parsed_logs[line_index]
-                partial_raw_logs[line_index] = raw_logs[line_index]
+                if not is_store:
+                    partial_raw_logs[line_index] = raw_logs[line_index]
 
             partial_event_attributes[node] = event_attributes[node]
 
         return partial_parsed_logs, partial_raw_logs, partial_event_attributes
 
-    def __check_word(self, word):
-        if word not in self.word_check:
-            alphabet_count = 0
-            digit_count = 0
-            for character in word:
-                if character.isalpha():
-                    alphabet_count += 1
-
-                if character.isdigit():
-                    digit_count += 1
-
-            if alphabet_count == 1 or digit_count == 1 or digit_count == len(word):
-                self.word_check.append(word)
-                word = '*'
-
-            # replace digit and symbol
-            replaced = '1234567890~!@#$%^&*()-_=+{}[]|\\;:'"<>,.?/"
-            word_replace = word
-            for character in replaced:
-                word_replace = word_replace.replace(character, '*')
-
-            if set(word_replace) == {'*'}:
-                self.word_check.append(word)
-                word = '*'
+    @staticmethod
+    def __is_variable_word(word):
+        alphabet_count = 0
+        digit_count = 0
+        for character in word:
+            if character.isalpha():
+                alphabet_count += 1
 
-        else:
-            word = '*'
+            if character.isdigit():
+                digit_count += 1
+
+        if alphabet_count == 1 or digit_count == 1 or digit_count == len(word):
+            return True
 
-        return word
+        # replace digit and symbol
+        replaced = '1234567890~!@#$%^&*()-_=+{}[]|\\;:'"<>,.?/"
+        word_replace = word
+        for character in replaced:
+            word_replace = word_replace.replace(character, '*')
+
+        return set(word_replace) == {'*'}
+
+    def __check_word(self, word):
+        # word: token id, a variable word becomes the asterisk, each token is checked once
+        word_check = self.word_check.get(word)
+        if word_check is None:
+            word_check = ASTERISK_ID if self.__is_variable_word(self.token_dictionary.tokens[word]) else word
+            self.word_check[word] = word_check
+
+        return word_check
 
     @staticmethod
     def __check_over_abstraction(abstraction):
         # check if there are too many asterisk in an abstraction
-        abstraction_split = abstraction.split()
-        abstraction_len = len(abstraction_split)
-
-        asterisk_count = 0
-        for word in abstraction_split:
-            if word == '*':
-                asterisk_count += 1
+        abstraction_len = len(abstraction)
+        asterisk_count = int((abstraction == ASTERISK_ID).sum())
 
         over_abstraction = False
         if (asterisk_count == abstraction_len - 1) and (abstraction_len > 3):
@@ -142,6 +152,12 @@ class LogAbstraction(object):
 
         return over_abstraction
 
+    @staticmethod
+    def __is_same_cluster(sub_cluster, nodes):
+        # check if clustering returns only one cluster with the given nodes
+        sub_cluster_nodes = [cluster['nodes'] for clusters in sub_cluster.values() for cluster in clusters.values()]
+        return len(sub_cluster_nodes) == 1 and set(sub_cluster_nodes[0]) == set(nodes)
+
     def __get_all_asterisk(self, all_clusters, event_attributes, parsed_logs, raw_logs):
         # main loop to get asterisk
         # abstractions[message_length] = {cluster_id: abstraction, ...}
@@ -150,15 +166,14 @@ class LogAbstraction(object):
             for cluster_id, cluster in clusters.items():
                 candidate = []
                 for node in cluster['nodes']:
-                    message = event_attributes[node]['message'].split()
-                    candidate.append(message)
+                    candidate.append(event_attributes[node]['tokens'])
 
                 asterisk = self.__get_asterisk(candidate)
-                check_asterisk = set(asterisk.replace(' ', ''))
                 over_abstraction = self.__check_over_abstraction(asterisk)
 
                 # run clustering again if abstraction is all asterisk, such as * * * * *
-                if check_asterisk == {'*'} or over_abstraction:
+                sub_cluster = None
+                if self.token_dictionary.is_asterisk_only(asterisk) or over_abstraction:
                     # get partial data only for the cluster that has all asterisk
                     partial_parsed_logs, partial_raw_logs, partial_event_attributes = \
                         self.__get_partial_logs(cluster['nodes'], event_attributes, parsed_logs, raw_logs)
@@ -168,9 +183,15 @@ class LogAbstraction(object):
 
                     # clustering again
                     log_clustering = LogClustering(partial_parsed_logs, partial_raw_logs,
-                                                   partial_message_length_group, partial_event_attributes)
+                                                   partial_message_length_group, partial_event_attributes,
+                                                   self.executor, self.clustering_backend, self.lsh_config)
                     sub_cluster = log_clustering.get_clustering()
 
+                    # clustering again gives back the same cluster, keep its abstraction
+                    if self.__is_same_cluster(sub_cluster, cluster['nodes']):
+                        sub_cluster = None
+
+                if sub_cluster is not None:
                     # recursion to get asterisk
                     self.__get_all_asterisk(sub_cluster, event_attributes, parsed_logs, raw_logs)
 
@@ -190,7 +211,7 @@ class LogAbstraction(object):
         checked_parent_id = []
         valid_combinations = []
         not_merge_id = []
-        abstractionstr_abstractionid = {}
+        abstractionkey_abstractionid = {}
 
         # get abstraction that will not be checked (merged)
         for original_cluster_id, abstraction in abstractions.items():
@@ -211,12 +232,10 @@ class LogAbstraction(object):
         if valid_combinations:
             for cluster_id1, cluster_id2 in valid_combinations:
                 if (cluster_id1 not in checked_cluster_id) and (cluster_id2 not in checked_cluster_id):
-                    hs = HammingSimilarity()
-                    hamming_similarity = hs.get_weighted_hamming(abstractions[cluster_id1]['abstraction'],
-                                                                 abstractions[cluster_id2]['abstraction'])
+                    abstraction1 = abstractions[cluster_id1]['abstraction']
+                    abstraction2 = abstractions[cluster_id2]['abstraction']
+                    hamming_similarity = HammingSimilarity.get_weighted_hamming_ids(abstraction1, abstraction2)
                     if hamming_similarity > 0.:
-                        abstraction1 = abstractions[cluster_id1]['abstraction'].split()
-                        abstraction2 = abstractions[cluster_id2]['abstraction'].split()
 
                         # check parent and child abstraction
                         parent_abstraction, child_abstraction, parent_id, child_id = \
@@ -226,7 +245,7 @@ class LogAbstraction(object):
                         # once merge = False, it will not continue checking
                         merge = False
                         parent_abstraction_check = []
-                        for word1, word2 in zip(parent_abstraction, child_abstraction):
+                        for word1, word2 in zip(parent_abstraction.tolist(), child_abstraction.tolist()):
                             word1_check = self.__check_word(word1)
                             word2_check = self.__check_word(word2)
                             parent_abstraction_check.append(word1_check)
@@ -234,17 +253,17 @@ class LogAbstraction(object):
                             if word1 == word2:
                                 merge = True
 
-                            elif (word1 != word2) and (word1 == '*'):
+                            elif (word1 != word2) and (word1 == ASTERISK_ID):
                                 merge = True
 
-                            elif (word1 != word2) and (word1 != '*') and (word2 != '*'):
+                            elif (word1 != word2) and (word1 != ASTERISK_ID) and (word2 != ASTERISK_ID):
                                 if word1_check == word2_check:
                                     merge = True
                                 else:
                                     merge = False
                                     break
 
-                            elif (word1 != word2) and (word1 != '*') and (word2 == '*'):
+                            elif (word1 != word2) and (word1 != ASTERISK_ID) and (word2 == ASTERISK_ID):
                                 if word1_check == word2:
                                     merge = True
                                 else:
@@ -255,9 +274,11 @@ class LogAbstraction(object):
                         if merge:
                             # add to checked abstractions
                             if (parent_id != -1) and (child_id != -1):
-                                abstractions[parent_id]['abstraction'] = ' '.join(parent_abstraction_check)
-                                if abstractions[parent_id]['abstraction'] in abstractionstr_abstractionid.keys():
-                                    existing_id = abstractionstr_abstractionid[abstractions[parent_id]['abstraction']]
+                                abstractions[parent_id]['abstraction'] = np.array(parent_abstraction_check,
+                                                                                  dtype=np.int32)
+                                abstraction_key = tuple(parent_abstraction_check)
+                                if abstraction_key in abstractionkey_abstractionid.keys():
+                                    existing_id = abstractionkey_abstractionid[abstraction_key]
 
                                     # check parent_id nodes because of __check_word convert word to asterisk
                                     extended_nodes = []
@@ -274,7 +295,7 @@ class LogAbstraction(object):
                                         'abstraction': abstractions[parent_id]['abstraction'],
                                         'nodes': abstractions[cluster_id1]['nodes'] + abstractions[cluster_id2]['nodes']
                                     }
-                                    abstractionstr_abstractionid[abstractions[parent_id]['abstraction']] = cluster_id
+                                    abstractionkey_abstractionid[abstraction_key] = cluster_id
                                     cluster_id += 1
 
                                 checked_cluster_id.append(child_id)
@@ -305,84 +326,239 @@ class LogAbstraction(object):
         else:
             return abstractions
 
-    def __run_merge_abstraction(self):
-        merged_abstractions = {}
-        for message_length, abstraction in self.abstractions_nonmerge.items():
-            merged_abstractions[message_length] = self.__merge_abstraction(abstraction)
+    def __set_merged_abstraction(self, message_length):
+        # merge a copy because merging changes abstractions and their node lists
+        abstractions = {}
+        for cluster_id, abstraction in self.abstractions_nonmerge[message_length].items():
+            abstractions[cluster_id] = {'abstraction': abstraction['abstraction'],
+                                        'nodes': list(abstraction['nodes']),
+                                        'check': abstraction['check']}
+        merged_abstractions = self.__merge_abstraction(abstractions)
+
+        # abstractions are token id arrays until here, the template matcher keeps strings
+        for abstraction in merged_abstractions.values():
+            abstraction['abstraction'] = self.token_dictionary.get_string(abstraction['abstraction'])
+        self.merged_abstractions[message_length] = merged_abstractions
+        self.message_matchers[message_length] = TemplateMatcher(merged_abstractions)
+
+        # events assigned to an abstraction by update() are matched again after merging
+        matched_nodes = self.matched_nodes[message_length]
+        self.matched_nodes[message_length] = []
+        for node in matched_nodes:
+            self.__add_matched_node(message_length, node)
+
+        self.__set_abstraction_entries(message_length)
+
+    def __add_matched_node(self, message_length, node):
+        # assign an event to the first abstraction it matches
+        # an event without a matching abstraction becomes its own abstraction
+        event = self.preprocess.event_attributes[node]
+        message = event['message']
+        cluster_id = self.__match_abstraction(message_length, message)
+        if cluster_id is not None:
+            self.merged_abstractions[message_length][cluster_id]['nodes'].append(node)
+            self.matched_nodes[message_length].append(node)
+            self.node_clusterid[message_length][node] = cluster_id
 
-        return merged_abstractions
+        else:
+            abstraction = {'abstraction': event['tokens'], 'nodes': [node], 'check': False}
+            self.abstractions_nonmerge[message_length][self.abstractions_nonmerge_id] = abstraction
+            self.abstractions_nonmerge_id += 1
 
-    def __get_final_abstraction(self, abstractions, event_attributes, parsed_logs):
-        # restart abstraction id from 0, get abstraction and its log ids
+            merged_abstractions = self.merged_abstractions[message_length]
+            cluster_id = max(merged_abstractions.keys()) + 1 if merged_abstractions else 0
+            merged_abstractions[cluster_id] = {'abstraction': message, 'nodes': [node]}
+            self.message_matchers[message_length].add(cluster_id, message)
+
+    def __match_abstraction(self, message_length, message):
+        # get cluster id of the merged abstraction that matches the message, the most specific one first
+        matcher = self.message_matchers.get(message_length)
+        if matcher is None:
+            return None
+
+        return matcher.match(message.split())
+
+    @staticmethod
+    def __get_entity_message(parsed):
+        # entity words are words of all fields except the main message
+        values = []
+        message = []
+        for label, value in parsed.items():
+            if label != 'message':
+                values.extend(value.split())
+
+            # get the message here
+            else:
+                message.extend(value.split())
+
+        return values, message
+
+    def __set_abstraction_entries(self, message_length):
         # in this method, we include other fields such as timestamp, hostname, ip address, etc in abstraction
+        # one entry per cluster and number of entity words:
+        # abstraction_entries[message_length] = [{'entity': list, 'message': list, 'log_id': list}, ...]
+        entries = []
+        entry_index = {}
+        node_clusterid = {}
+        for cluster_id, cluster in self.merged_abstractions[message_length].items():
+            # get log ids per cluster
+            log_ids = []
+            for node in cluster['nodes']:
+                log_ids.extend(self.preprocess.event_attributes[node]['member'])
+                if node not in node_clusterid:
+                    node_clusterid[node] = cluster_id
+
+            # get entities from raw logs per cluster (except the main message)
+            for log_id in log_ids:
+                values, message = self.__get_entity_message(self.parsed_logs[log_id])
+                self.__add_entry(entries, entry_index, (cluster_id, len(values)), values, message, log_id)
+
+        self.abstraction_entries[message_length] = entries
+        self.entry_index[message_length] = entry_index
+        self.node_clusterid[message_length] = node_clusterid
+
+    def __add_entry(self, entries, entry_index, key, values, message, log_id):
+        # get asterisk for entity and message, one word list per entry
+        index = entry_index.get(key)
+        if index is None:
+            entry_index[key] = len(entries)
+            entries.append({'entity': values, 'message': message, 'log_id': [log_id]})
+
+        else:
+            entry = entries[index]
+            entry['entity'] = self.__update_asterisk(entry['entity'], values)
+            entry['message'] = self.__update_asterisk(entry['message'], message)
+            entry['log_id'].append(log_id)
+
+    def __add_log(self, message_length, node, log_id):
+        # a line of an already clustered event only updates its abstraction entry
+        cluster_id = self.node_clusterid[message_length].get(node)
+
+        # the event was dropped when merging abstractions, as in get_abstraction()
+        if cluster_id is None:
+            return
+
+        values, message = self.__get_entity_message(self.parsed_logs[log_id])
+        self.__add_entry(self.abstraction_entries[message_length], self.entry_index[message_length],
+                         (cluster_id, len(values)), values, message, log_id)
+
+    def __get_final_abstraction(self):
+        # restart abstraction id from 0, get abstraction and its log ids
         final_abstractions = {}
         abstraction_id = 0
-        for message_length, abstraction in abstractions.items():
-            # get log ids per cluster
-            for cluster_id, cluster in abstraction.items():
-                log_ids = []
-                for node in cluster['nodes']:
-                    log_ids.extend(event_attributes[node]['member'])
-
-                # get entities from raw logs per cluster (except the main message)
-                candidates = defaultdict(list)
-                candidates_log_ids = defaultdict(list)
-                candidates_messages = defaultdict(list)
-                for log_id in log_ids:
-                    parsed = parsed_logs[log_id]
-                    values = []
-                    values_length = 0
-                    message = []
-                    for label, value in parsed.items():
-                        if label != 'message':
-                            value_split = value.split()
-                            values.extend(value_split)
-                            values_length += len(value_split)
-
-                        # get the message here
-                        else:
-                            message_split = value.split()
-                            message.extend(message_split)
-
-                    # get abstraction candidates and their respective log ids
-                    candidates[values_length].append(values)
-                    candidates_log_ids[values_length].append(log_id)
-                    candidates_messages[values_length].append(message)
-
-                # get asterisk for entity and message and then set final abstraction
-                for label_length, candidate in candidates.items():
-                    entity_abstraction = self.__get_asterisk(candidate)
-                    message_abstraction = self.__get_asterisk(candidates_messages[label_length])
-                    final_abstractions[abstraction_id] = {
-                        'abstraction': entity_abstraction + ' ' + message_abstraction,
-                        'log_id': candidates_log_ids[label_length]
-                    }
-                    abstraction_id += 1
+        for message_length in self.merged_abstractions.keys():
+            for entry in self.abstraction_entries[message_length]:
+                final_abstractions[abstraction_id] = {
+                    'abstraction': ' '.join(entry['entity']) + ' ' + ' '.join(entry['message']),
+                    'log_id': entry['log_id']
+                }
+                abstraction_id += 1
 
         return final_abstractions
 
-    def get_abstraction(self, log_file):
+    def __reset(self):
+        # token ids of this abstraction, they are dropped with the abstractions of the previous log file
+        # word_check[token id] = token id of the checked word, the asterisk for a variable word
+        self.token_dictionary = TokenDictionary()
+        self.word_check = {}
+
         # initialize abstractions
         self.abstractions_nonmerge = defaultdict(dict)
         self.abstractions_nonmerge_id = 0
+        self.merged_abstractions = {}
+        self.message_matchers = {}
+        self.matched_nodes = defaultdict(list)
+        self.node_clusterid = {}
+        self.abstraction_entries = {}
+        self.entry_index = {}
+
+    def get_abstraction(self, log_file):
+        self.__reset()
 
         # parsing logs
-        parsed_logs, raw_logs = self.parser.parse_logs(log_file)
+        parsed_logs, raw_logs = self.parser.parse_logs(log_file, raw_log_store=True)
 
         # get clusters and event attributes
         # clusters[message_length] = {cluster_id: {'nodes': list, 'check': bool}, ...}
-        log_clustering = LogClustering(parsed_logs, raw_logs)
+        log_clustering = LogClustering(parsed_logs, raw_logs, executor=self.executor,
+                                       clustering_backend=self.clustering_backend, lsh_config=self.lsh_config,
+                                       token_dictionary=self.token_dictionary)
         clusters = log_clustering.get_clustering()
         event_attributes = log_clustering.event_attributes
 
+        # keep parsed logs and unique events for update()
+        self.parsed_logs = parsed_logs
+        self.raw_logs = raw_logs
+        self.preprocess = log_clustering.preprocess
+
         # get abstraction
         self.__get_all_asterisk(clusters, event_attributes, parsed_logs, raw_logs)
-        merged_abstractions = self.__run_merge_abstraction()
-        final_abstractions = self.__get_final_abstraction(merged_abstractions, event_attributes, parsed_logs)
+        for message_length in self.abstractions_nonmerge.keys():
+            self.__set_merged_abstraction(message_length)
+        final_abstractions = self.__get_final_abstraction()
 
         # final_abstractions[abstraction_id] = {'abstraction': str, 'log_id': [int, ...]}
         return final_abstractions, raw_logs
 
+    def update(self, lines):
+        # lines: new log lines, such as lines appended to a tailed log file
+        # lines of known messages are assigned to their abstraction in O(words)
+        # only new messages without a matching abstraction are clustered, per message length group
+        parsed_logs, raw_logs = self.parser.parse_lines(lines, len(self.parsed_logs))
+        self.parsed_logs.update(parsed_logs)
+
+        # raw lines of updates are kept in memory on top of the raw logs of the log file
+        if not isinstance(self.raw_logs, ChainMap):
+            self.raw_logs = ChainMap({}, self.raw_logs)
+        self.raw_logs.maps[0].update(raw_logs)
+
+        # new unique events get the next event ids
+        event_attributes = self.preprocess.event_attributes
+        first_event_id = len(event_attributes)
+        self.preprocess.update_unique_events(parsed_logs.items())
+
+        # assign new events to a matching abstraction, the rest goes to clustering
+        unmatched_nodes = defaultdict(list)
+        for node in range(first_event_id, len(event_attributes)):
+            message_length = event_attributes[node]['message_length']
+            if self.__match_abstraction(message_length, event_attributes[node]['message']) is None:
+                unmatched_nodes[message_length].append(node)
+            else:
+                self.__add_matched_node(message_length, node)
+
+        # clustering and merging only for the message length groups of unmatched events
+        for message_length, nodes in unmatched_nodes.items():
+            partial_parsed_logs, partial_raw_logs, partial_event_attributes = \
+                self.__get_partial_logs(nodes, event_attributes, self.parsed_logs, self.raw_logs)
+            partial_message_length_group = {
+                message_length: nodes
+            }
+            log_clustering = LogClustering(partial_parsed_logs, partial_raw_logs,
+                                           partial_message_length_group, partial_event_attributes,
+                                           self.executor, self.clustering_backend, self.lsh_config)
+            clusters = log_clustering.get_clustering()
+            self.__get_all_asterisk(clusters, event_attributes, self.parsed_logs, self.raw_logs)
+            self.__set_merged_abstraction(message_length)
+
+        # lines of other groups are added to their abstraction entries
+        for log_id, parsed in parsed_logs.items():
+            node = self.preprocess.message_eventid[parsed['message']]
+            message_length = event_attributes[node]['message_length']
+            if message_length not in unmatched_nodes:
+                self.__add_log(message_length, node, log_id)
+
+        final_abstractions = self.__get_final_abstraction()
+
+        # final_abstractions[abstraction_id] = {'abstraction': str, 'log_id': [int, ...]}
+        return final_abstractions, self.raw_logs
+
+    def close(self):
+        # stop worker processes and release the mmap of the raw log store
+        self.executor.close()
+        raw_logs = self.raw_logs.maps[-1] if isinstance(self.raw_logs, ChainMap) else self.raw_logs
+        if isinstance(raw_logs, RawLogStore):
+            raw_logs.close()
+
 
 def get_evaluation_metrics(groundtruth_file, lineid_abstractionid_prediction):
     groundtruth = AbstractionUtility.read_json(groundtruth_file)
@@ -410,6 +586,7 @@ if __name__ == '__main__':
     logfile = '/home/hudan/Git/pylogabstract/datasets/' + dataset + '/logs/' + filename
     log_abstraction = LogAbstraction()
     abstraction_results, rawlogs = log_abstraction.get_abstraction(logfile)
+    log_abstraction.close()
 
     # prepare ground truth for comparison
     abstraction_withid_file = \
@@ -0,0 +1,102 @@
+import json
+
+
+class TemplateMatcher(object):
+    """Match log lines to abstractions with a token-position prefix tree.
+
+    The first level of the tree is keyed by the number of words. Each following level is keyed by the word
+    at that position, and an asterisk in an abstraction becomes a wildcard child. Matching tries the
+    constant word first and goes back to the wildcard child when the constant path does not reach a leaf.
+    The tree only contains dictionaries, lists, strings, and integers, so it is saved as JSON.
+    """
+    def __init__(self, abstractions=None):
+        # tree[number of words] = {'children': {word: node, ...}, 'abstraction_id': int or None}
+        self.tree = {}
+        self.abstractions = {}
+
+        if abstractions is not None:
+            for abstraction_id, abstraction in abstractions.items():
+                self.add(abstraction_id, abstraction['abstraction'])
+
+    def add(self, abstraction_id, abstraction):
+        # the first abstraction added for a word sequence is kept
+        words = abstraction.split()
+        self.abstractions[abstraction_id] = abstraction
+
+        node = self.tree.get(len(words))
+        if node is None:
+            node = {'children': {}, 'abstraction_id': None}
+            self.tree[len(words)] = node
+
+        for word in words:
+            children = node['children']
+            if word not in children:
+                children[word] = {'children': {}, 'abstraction_id': None}
+            node = children[word]
+
+        if node['abstraction_id'] is None:
+            node['abstraction_id'] = abstraction_id
+
+    def match(self, words):
+        # words: list of words of a log line
+        # output: abstraction id, or None if no abstraction matches
+        node = self.tree.get(len(words))
+        if node is None:
+            return None
+
+        words_length = len(words)
+        stack = [(node, 0)]
+        while stack:
+            node, position = stack.pop()
+            if position == words_length:
+                return node['abstraction_id']
+
+            # push the wildcard first so the constant word is tried first
+            children = node['children']
+            wildcard = children.get('*')
+            if wildcard is not None:
+                stack.append((wildcard, position + 1))
+
+            word = words[position]
+            if word != '*':
+                child = children.get(word)
+                if child is not None:
+                    stack.append((child, position + 1))
+
+        return None
+
+    def match_parsed(self, parsed_log):
+        # parsed_log: {label: value, ...} from Parser, words of all fields except the message come first
+        values = []
+        message = []
+        for label, value in parsed_log.items():
+            if label != 'message':
+                values.extend(value.split())
+            else:
+                message.extend(value.split())
+
+        return self.match(values + message)
+
+    def __len__(self):
+        return len(self.abstractions)
+
+    def save(self, json_file):
+        # json keys are strings, number of words and abstraction ids are converted back by load()
+        matcher = {
+            'tree': self.tree,
+            'abstractions': self.abstractions
+        }
+        with open(json_file, 'w') as f:
+            json.dump(matcher, f)
+
+    @staticmethod
+    def load(json_file):
+        with open(json_file, 'r') as f:
+            matcher = json.load(f)
+
+        template_matcher = TemplateMatcher()
+        template_matcher.tree = {int(words_length): node for words_length, node in matcher['tree'].items()}
+        template_matcher.abstractions = {int(abstraction_id): abstraction
+                                         for abstraction_id, abstraction in matcher['abstractions'].items()}
+
+        return template_matcher
@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+from collections import OrderedDict
+from configparser import ConfigParser
+from pylogabstract.abstraction.abstraction import LogAbstraction, get_evaluation_metrics
+from pylogabstract.abstraction.abstraction_utility import AbstractionUtility
+
+
+def get_dataset_path():
+    # dataset path is taken from the experiment configuration
+    current_path = os.path.dirname(os.path.realpath(__file__))
+    config_path = os.path.join(current_path, '..', 'experiment', 'abstraction.conf')
+    parser = ConfigParser()
+    parser.read(config_path)
+
+    return parser.get('datasets', 'dataset_path')
+
+
+def get_dataset_files(dataset_path, dataset):
+    # log files of a dataset and their ground truth files
+    log_path = os.path.join(dataset_path, dataset, 'logs')
+    files = []
+    for root, dirnames, filenames in os.walk(log_path):
+        for filename in sorted(filenames):
+            files.append({
+                'log_path': os.path.join(root, filename),
+                'abstraction_withid_path': os.path.join(dataset_path, dataset, 'logs-abstraction_withid', filename),
+                'lineid_abstractionid_path': os.path.join(dataset_path, dataset, 'logs-lineid_abstractionid',
+                                                          filename)
+            })
+
+    return files
+
+
+def run_dataset(log_abstraction, files):
+    # mean accuracy and total abstraction time for one dataset
+    accuracy = []
+    total_time = 0.
+    for properties in files:
+        start = time.time()
+        abstractions, raw_logs = log_abstraction.get_abstraction(properties['log_path'])
+        total_time += time.time() - start
+
+        lineid_abstractionid = \
+            AbstractionUtility.get_abstractionid_from_groundtruth(properties['abstraction_withid_path'], abstractions)
+        metrics = get_evaluation_metrics(properties['lineid_abstractionid_path'], lineid_abstractionid)
+        accuracy.append(metrics['accuracy'])
+
+    mean_accuracy = sum(accuracy) / len(accuracy) if accuracy else 0.
+
+    return mean_accuracy, total_time
+
+
+def run_benchmark(datasets, settings):
+    # settings: {name: keyword arguments of LogAbstraction}
+    # accuracy is also reported relative to the first setting, e.g. the loss of an approximate mode
+    dataset_path = get_dataset_path()
+    baseline = {}
+    for name, kwargs in settings.items():
+        log_abstraction = LogAbstraction(**kwargs)
+        for dataset in datasets:
+            files = get_dataset_files(dataset_path, dataset)
+            mean_accuracy, total_time = run_dataset(log_abstraction, files)
+            baseline.setdefault(dataset, mean_accuracy)
+            print('%-20s %-20s files: %3d, accuracy: %.3f (%+.3f), time: %.2f sec' %
+                  (name, dataset, len(files), mean_accuracy, mean_accuracy - baseline[dataset], total_time))
+        log_abstraction.close()
+
+
+if __name__ == '__main__':
+    # clustering_benchmark.py [dataset ...]
+    dataset_list = ['casper-rw', 'dfrws-2009-jhuisi', 'dfrws-2009-nssal',
+                    'dfrws-2016', 'honeynet-challenge7']
+    if len(sys.argv) > 1:
+        dataset_list = sys.argv[1:]
+
+    # the bundled datasets have small groups, so the approximate settings bucket every group of 50 or more
+    backend_settings = OrderedDict([
+        ('girvan_newman', {'clustering_backend': 'girvan_newman'}),
+        ('louvain', {'clustering_backend': 'louvain'}),
+        ('label_propagation', {'clustering_backend': 'label_propagation'}),
+        ('lsh_128_32', {'lsh_config': {'min_group_size': 50, 'signatures': 128, 'bands': 32}}),
+        ('lsh_64_16', {'lsh_config': {'min_group_size': 50, 'signatures': 64, 'bands': 16}}),
+        ('lsh_32_4', {'lsh_config': {'min_group_size': 50, 'signatures': 32, 'bands': 4}})
+    ])
+    run_benchmark(dataset_list, backend_settings)
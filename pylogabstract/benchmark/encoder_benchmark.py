@@ -0,0 +1,67 @@
+import sys
+import time
+import numpy as np
+from pylogabstract.parser.model.config import Config
+from pylogabstract.parser.model.data_utils import pad_sequences, BatchEncoder
+
+
+def encode_python(processing_word, sentences_raw, use_chars):
+    # padding as done by NERModel.get_feed_dict
+    words = []
+    for words_raw in sentences_raw:
+        sentence = [processing_word(w) for w in words_raw]
+        if type(sentence[0]) == tuple:
+            sentence = zip(*sentence)
+        words.append(sentence)
+
+    if use_chars:
+        char_ids, word_ids = zip(*words)
+        word_ids, sequence_lengths = pad_sequences(word_ids, 0)
+        char_ids, word_lengths = pad_sequences(char_ids, pad_tok=0, nlevels=2)
+        return word_ids, sequence_lengths, char_ids, word_lengths
+
+    word_ids, sequence_lengths = pad_sequences(words, 0)
+    return word_ids, sequence_lengths, None, None
+
+
+def is_identical(python_arrays, numpy_arrays):
+    for python_array, numpy_array in zip(python_arrays, numpy_arrays):
+        if python_array is None and numpy_array is None:
+            continue
+        if not np.array_equal(np.array(python_array, dtype=np.int32), numpy_array):
+            return False
+
+    return True
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('Please input log file name.')
+        print('encoder_benchmark.py log_file')
+        sys.exit(1)
+
+    else:
+        logfile = sys.argv[1]
+        config = Config(inference=True)
+        with open(logfile, 'r') as f:
+            sentences = [line.strip().split() for line in f]
+        sentences = [words for words in sentences if words]
+
+        batch_size = config.batch_size_parse
+        batches = [sentences[start:start + batch_size] for start in range(0, len(sentences), batch_size)]
+        encoder = BatchEncoder(config.processing_word, config.use_chars, config.cache_size_encode)
+
+        start = time.time()
+        python_batches = [encode_python(config.processing_word, batch, config.use_chars) for batch in batches]
+        python_time = time.time() - start
+
+        start = time.time()
+        numpy_batches = [encoder.encode(batch) for batch in batches]
+        numpy_time = time.time() - start
+
+        mismatch = sum(1 for python_arrays, numpy_arrays in zip(python_batches, numpy_batches)
+                       if not is_identical(python_arrays, numpy_arrays))
+        print('Lines : %d, batches: %d' % (len(sentences), len(batches)))
+        print('Python: %10.1f lines/sec' % (len(sentences) / python_time))
+        print('NumPy : %10.1f lines/sec, speedup: %5.2f, mismatch batches: %d' %
+              (len(sentences) / numpy_time, python_time / numpy_time, mismatch))
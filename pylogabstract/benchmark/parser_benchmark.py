@@ -0,0 +1,51 @@
+import sys
+import time
+from pylogabstract.parser.parser import Parser
+
+
+def get_throughput(parser, log_file, batch):
+    # parse a log file and measure lines per second
+    start = time.time()
+    parsed_logs, raw_logs = parser.parse_logs(log_file, batch=batch)
+    elapsed = time.time() - start
+    lines_per_second = len(parsed_logs) / elapsed if elapsed > 0 else 0.
+
+    return parsed_logs, lines_per_second
+
+
+def get_mismatch(parsed_logs1, parsed_logs2):
+    # count lines with different parsing results
+    mismatch = 0
+    for line_id, parsed in parsed_logs1.items():
+        if parsed != parsed_logs2[line_id]:
+            mismatch += 1
+
+    return mismatch
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('Please input log file name.')
+        print('parser_benchmark.py log_file')
+        sys.exit(1)
+
+    else:
+        logfile = sys.argv[1]
+        # measure the model, not the on-disk parse cache
+        parser = Parser(parse_cache=False)
+
+        # per-line path versus batch path
+        parsed_perline, perline_throughput = get_throughput(parser, logfile, False)
+        parsed_batch, batch_throughput = get_throughput(parser, logfile, True)
+
+        # hybrid mode, syslog headers are labeled by header grammars
+        parser.config.use_header_grammar = True
+        parsed_hybrid, hybrid_throughput = get_throughput(parser, logfile, True)
+
+        print('Lines                 :', len(parsed_batch))
+        print('Batch size            :', parser.config.batch_size_parse)
+        print('Per-line              : %.1f lines/sec' % perline_throughput)
+        print('Batch                 : %.1f lines/sec' % batch_throughput)
+        print('Hybrid                : %.1f lines/sec' % hybrid_throughput)
+        print('Mismatch lines        :', get_mismatch(parsed_perline, parsed_batch))
+        print('Hybrid mismatch lines :', get_mismatch(parsed_batch, parsed_hybrid))
@@ -0,0 +1,56 @@
+import sys
+import time
+from pylogabstract.parser.parser import Parser
+from pylogabstract.parser.prediction_cache import PredictionCache
+from pylogabstract.benchmark.parser_benchmark import get_mismatch
+from pylogabstract.benchmark.clustering_benchmark import get_dataset_path, get_dataset_files
+
+
+def run_dataset(parser, files):
+    # parse all log files of a dataset, output: parsed logs per file, lines per second
+    parsed_files = []
+    total_lines = 0
+    total_time = 0.
+    for properties in files:
+        start = time.time()
+        parsed_logs, raw_logs = parser.parse_logs(properties['log_path'])
+        total_time += time.time() - start
+        total_lines += len(parsed_logs)
+        parsed_files.append(parsed_logs)
+
+    lines_per_second = total_lines / total_time if total_time > 0 else 0.
+
+    return parsed_files, total_lines, lines_per_second
+
+
+def run_benchmark(datasets, cache_size=100000):
+    # parsing throughput without and with the prediction cache, the cache is off in Config by default
+    dataset_path = get_dataset_path()
+    # measure the model, not the on-disk parse cache
+    parser = Parser(parse_cache=False)
+    for dataset in datasets:
+        files = get_dataset_files(dataset_path, dataset)
+
+        parser.prediction_cache = PredictionCache(0)
+        parsed_nocache, total_lines, nocache_throughput = run_dataset(parser, files)
+
+        parser.prediction_cache = PredictionCache(cache_size)
+        parsed_cache, total_lines, cache_throughput = run_dataset(parser, files)
+
+        mismatch = 0
+        for parsed_logs1, parsed_logs2 in zip(parsed_nocache, parsed_cache):
+            mismatch += get_mismatch(parsed_logs1, parsed_logs2)
+
+        print('%-20s lines: %8d, no cache: %8.1f lines/sec, cache: %8.1f lines/sec, '
+              'hits: %d, misses: %d, hit rate: %.3f, mismatch lines: %d' %
+              (dataset, total_lines, nocache_throughput, cache_throughput, parser.prediction_cache.hits,
+               parser.prediction_cache.misses, parser.prediction_cache.get_hit_rate(), mismatch))
+
+
+if __name__ == '__main__':
+    dataset_list = ['casper-rw', 'dfrws-2009-jhuisi', 'dfrws-2009-nssal',
+                    'dfrws-2016', 'honeynet-challenge7']
+    if len(sys.argv) > 1:
+        dataset_list = sys.argv[1:]
+
+    run_benchmark(dataset_list)
@@ -0,0 +1,49 @@
+import sys
+import time
+import multiprocessing
+from pylogabstract.parser.parser import Parser
+from pylogabstract.benchmark.parser_benchmark import get_mismatch
+
+
+def get_worker_counts(max_workers):
+    # 1, 2, 4, ... up to max_workers
+    worker_counts = []
+    workers = 1
+    while workers < max_workers:
+        worker_counts.append(workers)
+        workers *= 2
+    worker_counts.append(max_workers)
+
+    return worker_counts
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('Please input log file name.')
+        print('parser_parallel_benchmark.py log_file [max_workers]')
+        sys.exit(1)
+
+    else:
+        logfile = sys.argv[1]
+        maximum_workers = int(sys.argv[2]) if len(sys.argv) > 2 else multiprocessing.cpu_count()
+        # measure the model, not the on-disk parse cache
+        parser = Parser(parse_cache=False)
+
+        # single process batch parsing as the baseline
+        start = time.time()
+        parsed_single, raw_single = parser.parse_logs(logfile)
+        single_throughput = len(parsed_single) / (time.time() - start)
+        print('Lines : %d' % len(parsed_single))
+        print('Workers: %3d, %10.1f lines/sec, speedup: %5.2f' % (1, single_throughput, 1.))
+
+        # time includes starting the worker processes and restoring the model in each worker
+        for worker_count in get_worker_counts(maximum_workers):
+            if worker_count == 1:
+                continue
+
+            start = time.time()
+            parsed_sharded, raw_sharded = parser.parse_logs(logfile, workers=worker_count)
+            throughput = len(parsed_sharded) / (time.time() - start)
+            print('Workers: %3d, %10.1f lines/sec, speedup: %5.2f, mismatch lines: %d' %
+                  (worker_count, throughput, throughput / single_throughput,
+                   get_mismatch(parsed_single, parsed_sharded)))
@@ -0,0 +1,48 @@
+import sys
+import time
+import random
+from collections import OrderedDict
+from pylogabstract.preprocess.preprocess import Preprocess
+
+
+def get_synthetic_logs(total_lines, total_unique):
+    # synthetic parsed logs with a fixed number of unique messages
+    random.seed(0)
+    words = ['session', 'opened', 'closed', 'for', 'user', 'root', 'by', 'uid', 'port', 'from']
+    messages = []
+    for index in range(total_unique):
+        message_length = random.randint(3, 10)
+        message = [random.choice(words) for _ in range(message_length - 1)]
+        message.append(str(index))
+        messages.append(' '.join(message))
+
+    parsed_logs = OrderedDict()
+    for line_id in range(total_lines):
+        parsed_logs[line_id] = OrderedDict([('timestamp', 'Dec 10 06:55:46'),
+                                            ('message', messages[random.randrange(total_unique)])])
+
+    return parsed_logs
+
+
+def get_preprocess_time(parsed_logs):
+    start = time.time()
+    preprocess = Preprocess(parsed_logs, {})
+    preprocess.get_unique_events()
+    elapsed = time.time() - start
+
+    return preprocess, elapsed
+
+
+if __name__ == '__main__':
+    # scaling from 10K to 1M lines, time per line should stay flat
+    unique = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for lines in [10000, 100000, 1000000]:
+        logs = get_synthetic_logs(lines, min(unique, lines))
+        result, total_time = get_preprocess_time(logs)
+
+        # every line belongs to exactly one unique event
+        total_member = sum(len(attr['member']) for attr in result.event_attributes.values())
+        assert total_member == lines
+
+        print('Lines: %7d, unique events: %6d, time: %.2f sec, %.2f usec/line' %
+              (lines, len(result.event_attributes), total_time, total_time / lines * 1e6))
@@ -0,0 +1,44 @@
+import sys
+import time
+import random
+from collections import OrderedDict
+from pylogabstract.preprocess.preprocess import Preprocess
+from pylogabstract.preprocess.hamming_similarity import VectorizedHammingSimilarity
+from pylogabstract.preprocess.similarity_executor import SimilarityExecutor
+
+
+def get_synthetic_group(total_unique, message_length):
+    # one message length group of unique messages, half of the words come from a small vocabulary
+    random.seed(0)
+    parsed_logs = OrderedDict()
+    for line_id in range(total_unique):
+        message = ['w%d' % random.randint(0, 300) if random.random() < 0.5 else 'v%d' % random.randint(0, 10 ** 6)
+                   for _ in range(message_length)]
+        parsed_logs[line_id] = {'message': ' '.join(message)}
+
+    preprocess = Preprocess(parsed_logs, {})
+    preprocess.get_unique_events()
+
+    return preprocess.event_attributes, preprocess.message_length_group[message_length]
+
+
+def get_similarity_time(event_attributes, group, executor):
+    start = time.time()
+    hamming_similarity = VectorizedHammingSimilarity(event_attributes, group, executor)
+    rows, columns, weights = hamming_similarity.get_similarity_edges()
+
+    return len(rows), time.time() - start
+
+
+if __name__ == '__main__':
+    # similarity_benchmark.py [unique messages] [workers]
+    # workers map the token matrix and index from shared files, tasks only carry row ranges
+    total_unique = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    attributes, indices = get_synthetic_group(total_unique, 12)
+
+    for total_workers in [1, workers]:
+        with SimilarityExecutor(total_workers) as similarity_executor:
+            total_edges, total_time = get_similarity_time(attributes, indices, similarity_executor)
+        print('Messages: %7d, workers: %2d, edges: %10d, time: %.2f sec' %
+              (len(indices), total_workers, total_edges, total_time))
@@ -0,0 +1,61 @@
+import os
+import sys
+import json
+import time
+import resource
+import subprocess
+
+
+def load_model(mode):
+    # build and restore the model in a fresh process, output: seconds and peak resident memory in MB
+    start = time.time()
+    from pylogabstract.parser.model.ner_model import NERModel
+    from pylogabstract.parser.model.config import Config
+
+    if mode == 'full':
+        config = Config()
+        model = NERModel(config)
+        model.build()
+    else:
+        # inference restores the checkpoint, bundle maps the single-file model
+        config = Config(inference=True, use_bundle=(mode == 'bundle'))
+        model = NERModel(config)
+        model.build_inference()
+    model.restore_model()
+
+    elapsed = time.time() - start
+    peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.
+
+    return elapsed, peak_memory
+
+
+def run_child(mode):
+    # each measurement runs in its own interpreter so graph and memory start empty
+    output = subprocess.check_output([sys.executable, '-m', 'pylogabstract.benchmark.startup_benchmark',
+                                      'child', mode])
+    result = json.loads(output.decode('utf-8').strip().split('\n')[-1])
+
+    return result['time'], result['memory']
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == 'child':
+        child_time, child_memory = load_model(sys.argv[2])
+        print(json.dumps({'time': child_time, 'memory': child_memory}))
+        sys.exit(0)
+
+    from pylogabstract.parser.model.config import Config
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    build_modes = ['full', 'inference']
+    if os.path.exists(Config.filename_bundle):
+        build_modes.append('bundle')
+
+    for build_mode in build_modes:
+        times, memories = [], []
+        for _ in range(repeat):
+            load_time, memory = run_child(build_mode)
+            times.append(load_time)
+            memories.append(memory)
+
+        print('%-10s startup: %6.2f sec (min %6.2f), peak memory: %8.1f MB' %
+              (build_mode, sum(times) / len(times), min(times), max(memories)))
@@ -0,0 +1,59 @@
+import sys
+import time
+from pylogabstract.parser.model.config import Config
+from pylogabstract.parser.model.data_utils import CoNLLDataset, load_vocab
+from pylogabstract.parser.model.perceptron_tagger import PerceptronTagger, evaluate_tagger
+
+
+def load_ner_model():
+    # output: NERModel, or None if tensorflow is not installed
+    try:
+        from pylogabstract.parser.model.ner_model import NERModel
+    except ImportError:
+        return None
+
+    config = Config(inference=True)
+    model = NERModel(config)
+    model.build_inference()
+    model.restore_model()
+
+    return model
+
+
+def load_perceptron_tagger():
+    config = Config(load=False, inference=True)
+    tagger = PerceptronTagger(config)
+    tagger.restore(config.filename_perceptron)
+
+    return tagger
+
+
+def get_throughput(tagger, sentences, batch_size):
+    # sentences (log lines) per second with minibatches of batch_size
+    start = time.time()
+    for index in range(0, len(sentences), batch_size):
+        tagger.predict_sentences(sentences[index:index + batch_size])
+
+    return len(sentences) / (time.time() - start)
+
+
+if __name__ == '__main__':
+    # tagger_benchmark.py [conll_test_file]
+    test_file = sys.argv[1] if len(sys.argv) > 1 else Config.filename_test
+    test = [(words, tags) for words, tags in CoNLLDataset(test_file)]
+    test_sentences = [words for words, tags in test]
+    tag_to_idx = load_vocab(Config.filename_tags)
+    print('Sentences: %d' % len(test))
+
+    for backend, load_tagger in [('ner', load_ner_model), ('perceptron', load_perceptron_tagger)]:
+        start = time.time()
+        backend_tagger = load_tagger()
+        load_time = time.time() - start
+        if backend_tagger is None:
+            print('%-10s skipped, tensorflow is not installed' % backend)
+            continue
+
+        metrics = evaluate_tagger(backend_tagger, test, tag_to_idx, Config.batch_size_parse)
+        throughput = get_throughput(backend_tagger, test_sentences, Config.batch_size_parse)
+        print('%-10s load: %6.2f sec, acc: %6.2f, f1: %6.2f, %10.1f lines/sec' %
+              (backend, load_time, metrics['acc'], metrics['f1'], throughput))
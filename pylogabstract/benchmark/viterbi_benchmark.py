@@ -0,0 +1,52 @@
+import sys
+import time
+import numpy as np
+import tensorflow as tf
+from pylogabstract.parser.model.data_utils import viterbi_decode_batch
+
+
+def get_batch(batch_size, max_length, ntags, random_state):
+    # random logits of a padded batch, sentence lengths between 1 and max_length
+    scores = random_state.randn(batch_size, max_length, ntags).astype(np.float32)
+    sequence_lengths = random_state.randint(1, max_length + 1, size=batch_size)
+
+    return scores, sequence_lengths
+
+
+def decode_loop(scores, transition_params, sequence_lengths):
+    # current decoding of NERModel.predict_batch, one sentence at a time
+    viterbi_sequences = []
+    for score, sequence_length in zip(scores, sequence_lengths):
+        viterbi_seq, viterbi_score = tf.contrib.crf.viterbi_decode(score[:sequence_length], transition_params)
+        viterbi_sequences.append(viterbi_seq)
+
+    return viterbi_sequences
+
+
+if __name__ == '__main__':
+    # viterbi_benchmark.py [batches] [batch_size] [max_length] [ntags]
+    batches = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    max_length = int(sys.argv[3]) if len(sys.argv) > 3 else 40
+    ntags = int(sys.argv[4]) if len(sys.argv) > 4 else 33
+
+    random_state = np.random.RandomState(0)
+    transition_params = random_state.randn(ntags, ntags).astype(np.float32)
+    data = [get_batch(batch_size, max_length, ntags, random_state) for _ in range(batches)]
+
+    start = time.time()
+    loop_sequences = [decode_loop(scores, transition_params, lengths) for scores, lengths in data]
+    loop_time = time.time() - start
+
+    start = time.time()
+    batch_sequences = [viterbi_decode_batch(scores, transition_params, lengths)[0] for scores, lengths in data]
+    batch_time = time.time() - start
+
+    sentences = batches * batch_size
+    mismatch = sum(1 for loop_batch, batched in zip(loop_sequences, batch_sequences)
+                   for loop_sequence, batch_sequence in zip(loop_batch, batched)
+                   if list(loop_sequence) != list(batch_sequence))
+    print('Sentences: %d, max length: %d, tags: %d' % (sentences, max_length, ntags))
+    print('Loop   : %10.1f sentences/sec' % (sentences / loop_time))
+    print('Batched: %10.1f sentences/sec, speedup: %5.2f, mismatch sentences: %d' %
+          (sentences / batch_time, loop_time / batch_time, mismatch))
@@ -0,0 +1,46 @@
+import community as commun
+from collections import defaultdict
+from networkx.algorithms import community
+from pylogabstract.clustering.girvan_newman import IncrementalGirvanNewman
+
+
+class CommunityDetection(object):
+    def __init__(self, graph, backend='girvan_newman', seed=0):
+        # backend: girvan_newman, louvain, or label_propagation
+        # seed: random state of louvain and label_propagation, so the same graph gives the same communities
+        self.graph = graph
+        self.backend = backend
+        self.seed = seed
+        self.backends = {
+            'girvan_newman': self.__get_girvan_newman,
+            'louvain': self.__get_louvain,
+            'label_propagation': self.__get_label_propagation
+        }
+
+    def __get_girvan_newman(self):
+        # Girvan-Newman with lightest edge removal, the level with the highest modularity is the best cluster
+        girvan_newman = IncrementalGirvanNewman(self.graph)
+        best_cluster = girvan_newman.get_best_partition()
+
+        return best_cluster
+
+    def __get_louvain(self):
+        # Louvain method, near-linear time modularity optimization
+        partition = commun.best_partition(self.graph, weight='weight', random_state=self.seed)
+        clusters = defaultdict(list)
+        for node_id, cluster_id in partition.items():
+            clusters[cluster_id].append(node_id)
+
+        return [clusters[cluster_id] for cluster_id in sorted(clusters.keys())]
+
+    def __get_label_propagation(self):
+        # asynchronous label propagation, linear time per iteration
+        return list(community.asyn_lpa_communities(self.graph, weight='weight', seed=self.seed))
+
+    def get_communities(self):
+        # output: list of node collections, one per community
+        if self.backend not in self.backends.keys():
+            raise ValueError('Unknown clustering backend: ' + str(self.backend))
+
+        return self.backends[self.backend]()
+
@@ -7,6 +7,10 @@ class ForceClustering(object):
         self.__WEIGHT_THRESHOLD = 0.75
         self.cluster_id = cluster_id
 
+    def set_graph(self, graph_model):
+        # create only the edges that are kept, instead of removing edges from the full graph
+        self.graph = graph_model.create_graph(self.__WEIGHT_THRESHOLD)
+
     def __remove_edges(self):
         removed_edges = []
         for edge in self.graph.edges.data():
@@ -0,0 +1,168 @@
+import community as commun
+import networkx as nx
+
+
+class IncrementalGirvanNewman(object):
+    """Girvan-Newman clustering with the lightest edge selector and incremental modularity.
+
+    Removing the lightest edge never changes the weight of other edges, so the removal order is
+    the edge list stably sorted by weight. Splits are found by adding the edges back in reverse
+    order with union-find, and modularity is updated only for the two communities a split touches.
+    The returned partition is identical to the best level of networkx girvan_newman()
+    scored with community.modularity().
+    """
+    def __init__(self, graph):
+        self.graph = graph
+
+        # levels with approximate modularity this close to the maximum are checked exactly
+        self.__EPSILON = 1e-9
+
+    @staticmethod
+    def __convert_to_nodeid_clusterid(partition):
+        # output: {nodeid:clusterid, ...}
+        part_dict = {}
+        cluster_id = 0
+        for p in partition:
+            for node_id in p:
+                part_dict[node_id] = cluster_id
+            cluster_id += 1
+
+        return part_dict
+
+    def __get_working_graph(self):
+        # the same working copy as networkx girvan_newman()
+        g = self.graph.copy().to_undirected()
+        g.remove_edges_from(list(nx.selfloop_edges(g)))
+
+        return g
+
+    @staticmethod
+    def __get_splits(g, edges, order):
+        # add edges back from the last removed one, an edge joining two components is a split
+        # splits: [(removal position, nodes of the smaller side), ...] in removal order
+        parent = {node: node for node in g.nodes()}
+        members = {node: [node] for node in g.nodes()}
+
+        def find(node):
+            root = node
+            while parent[root] != root:
+                root = parent[root]
+            while parent[node] != root:
+                parent[node], node = root, parent[node]
+            return root
+
+        splits = []
+        for position in reversed(range(len(order))):
+            u, v, _ = edges[order[position]]
+            root_u, root_v = find(u), find(v)
+            if root_u != root_v:
+                if len(members[root_u]) < len(members[root_v]):
+                    root_u, root_v = root_v, root_u
+                splits.append((position, list(members[root_v])))
+                members[root_u].extend(members.pop(root_v))
+                parent[root_v] = root_u
+        splits.reverse()
+
+        return splits
+
+    def __get_level_graph(self, edges, order, position):
+        g = self.__get_working_graph()
+        g.remove_edges_from([(edges[index][0], edges[index][1]) for index in order[:position + 1]])
+
+        return g
+
+    def __get_candidate_positions(self, g, splits):
+        # approximate modularity per level, updated incrementally for every split
+        links = self.graph.size(weight='weight')
+        degree = dict(self.graph.degree(weight='weight'))
+
+        # initial communities are the connected components
+        label = {}
+        internal, degree_sum = {}, {}
+        for community_id, component in enumerate(nx.connected_components(g)):
+            degree_sum[community_id] = 0.
+            internal[community_id] = 0.
+            for node in component:
+                label[node] = community_id
+
+        for node in self.graph:
+            community_id = label[node]
+            degree_sum[community_id] += degree[node]
+            for neighbor, data in self.graph[node].items():
+                if label[neighbor] == community_id:
+                    weight = data.get('weight', 1)
+                    internal[community_id] += weight if neighbor == node else weight / 2.
+
+        def term(community_internal, community_degree):
+            return community_internal / links - (community_degree / (2. * links)) ** 2
+
+        # upper bound of any later level: internal weight only decreases and degree term is at least per node
+        node_degree_term = sum((node_degree / (2. * links)) ** 2 for node_degree in degree.values())
+        total_internal = sum(internal.values())
+
+        modularity = sum(term(internal[community_id], degree_sum[community_id]) for community_id in internal)
+        new_community_id = len(internal)
+        level_modularity = []
+        max_modularity = -1.
+        for position, smaller_side in splits:
+            # split community into the smaller side and the rest
+            community_id = label[smaller_side[0]]
+            smaller_set = set(smaller_side)
+            smaller_internal, smaller_degree, cut = 0., 0., 0.
+            for node in smaller_side:
+                smaller_degree += degree[node]
+                for neighbor, data in self.graph[node].items():
+                    weight = data.get('weight', 1)
+                    if neighbor in smaller_set:
+                        smaller_internal += weight if neighbor == node else weight / 2.
+                    elif label[neighbor] == community_id:
+                        cut += weight
+
+            rest_internal = internal[community_id] - smaller_internal - cut
+            rest_degree = degree_sum[community_id] - smaller_degree
+            modularity += term(smaller_internal, smaller_degree) + term(rest_internal, rest_degree) - \
+                term(internal[community_id], degree_sum[community_id])
+
+            for node in smaller_side:
+                label[node] = new_community_id
+            internal[community_id], degree_sum[community_id] = rest_internal, rest_degree
+            internal[new_community_id], degree_sum[new_community_id] = smaller_internal, smaller_degree
+            new_community_id += 1
+            total_internal -= cut
+
+            level_modularity.append((position, modularity))
+            max_modularity = max(max_modularity, modularity)
+
+            # stop early once no later level can reach the maximum
+            if total_internal / links - node_degree_term < max_modularity - self.__EPSILON:
+                break
+
+        return [position for position, modularity in level_modularity
+                if modularity >= max_modularity - self.__EPSILON]
+
+    def get_best_partition(self):
+        # same result as the full sweep:
+        # for cluster in girvan_newman(graph, lightest): keep cluster with the highest modularity
+        g = self.__get_working_graph()
+        if g.number_of_edges() == 0:
+            return tuple(nx.connected_components(self.graph))
+
+        # lightest edge first, ties in edge iteration order as min() does
+        edges = list(g.edges(data='weight'))
+        order = sorted(range(len(edges)), key=lambda index: edges[index][2])
+        splits = self.__get_splits(g, edges, order)
+        candidate_positions = self.__get_candidate_positions(g, splits)
+
+        # score candidate levels exactly like the full sweep
+        max_modularity = -1.
+        best_cluster = []
+        for position in candidate_positions:
+            cluster = tuple(nx.connected_components(self.__get_level_graph(edges, order, position)))
+            partition = self.__convert_to_nodeid_clusterid(cluster)
+            modularity = commun.modularity(partition, self.graph)
+            if max_modularity < modularity:
+                max_modularity = modularity
+                best_cluster = cluster
+
+        return best_cluster
+
@@ -0,0 +1,183 @@
+import numpy as np
+from pylogabstract.preprocess.hamming_similarity import VectorizedHammingSimilarity
+
+
+class MinHashLSH(object):
+    """Approximate bucketing of a large message length group with MinHash and LSH.
+
+    Each message is a set of (position, token) features. Messages whose MinHash signatures
+    are equal in at least one band share a bucket, and buckets are connected transitively.
+    More signatures per band find fewer, purer buckets, more bands find more similar pairs.
+    A merge pass then joins buckets whose first messages are similar enough, so a template
+    that is split by LSH is clustered together again. A message that is still in a very small bucket
+    is compared with the first message of every larger bucket and joins the bucket of the most similar one,
+    as it would join their community in the exact graph.
+    """
+    def __init__(self, event_attributes, event_indices, signatures=128, bands=32, executor=None, seed=0):
+        if signatures % bands != 0:
+            raise ValueError('Signatures must be a multiple of bands: %d, %d' % (signatures, bands))
+
+        self.event_attributes = event_attributes
+        self.event_indices = event_indices
+        self.signatures = signatures
+        self.bands = bands
+        self.executor = executor
+        self.seed = seed
+
+        # number of row pairs compared when rows of small buckets are attached
+        self.comparisons = 0
+
+        # Mersenne prime of the hash functions (a * feature + b) mod prime, the product fits in int64
+        self.__PRIME = 2 ** 31 - 1
+
+        # minimum hamming similarity of the first messages of two buckets to merge them
+        self.__MERGE_THRESHOLD = 0.75
+
+        # rows of smaller buckets join other buckets, alone they would be clustered as isolated nodes
+        # or single edges, which are never merged with other abstractions
+        self.__MIN_BUCKET_SIZE = 3
+
+        # maximum number of token comparisons held in memory when rows of small buckets are attached
+        self.__MAX_BLOCK_ELEMENTS = 2 ** 22
+
+    def __get_features(self):
+        # output: feature id of every (position, token) of all messages and the first feature of each message
+        # a message without tokens gets the feature 0, so every message has at least one feature
+        empty = np.array([-1], dtype=np.int32)
+        tokens = [self.event_attributes[event_id]['tokens'] for event_id in self.event_indices]
+        tokens = [message if len(message) > 0 else empty for message in tokens]
+        lengths = np.array([len(message) for message in tokens], dtype=np.int64)
+        starts = np.cumsum(lengths) - lengths
+
+        token_ids = np.concatenate(tokens).astype(np.int64) + 1
+        positions = np.arange(len(token_ids), dtype=np.int64) - np.repeat(starts, lengths)
+        features = (token_ids * int(lengths.max()) + positions) % self.__PRIME
+
+        return features, starts
+
+    def get_signatures(self):
+        # minimum hash of the features of each message, one column per hash function
+        features, starts = self.__get_features()
+        random_state = np.random.RandomState(self.seed)
+        a = random_state.randint(1, self.__PRIME, size=self.signatures).astype(np.int64)
+        b = random_state.randint(0, self.__PRIME, size=self.signatures).astype(np.int64)
+
+        signatures = np.empty((len(starts), self.signatures), dtype=np.int64)
+        for index in range(self.signatures):
+            hashes = (a[index] * features + b[index]) % self.__PRIME
+            signatures[:, index] = np.minimum.reduceat(hashes, starts)
+
+        return signatures
+
+    @staticmethod
+    def __get_components(labels, buckets):
+        # connect rows of the same bucket until labels do not change, the label is the smallest row
+        while True:
+            previous = labels.copy()
+            for inverse, total_buckets in buckets:
+                bucket_label = np.full(total_buckets, len(labels), dtype=np.int64)
+                np.minimum.at(bucket_label, inverse, labels)
+                labels = np.minimum(labels, bucket_label[inverse])
+                labels = labels[labels]
+
+            if np.array_equal(labels, previous):
+                return labels
+
+    def __get_band_buckets(self, signatures):
+        # bucket id of every row in each band, the signatures of a band are mixed into one 64-bit key
+        rows_per_band = self.signatures // self.bands
+        multipliers = np.random.RandomState(self.seed + 1).randint(1, 2 ** 62, size=rows_per_band).astype(np.uint64)
+        multipliers |= np.uint64(1)
+        buckets = []
+        for band in range(self.bands):
+            band_signatures = signatures[:, band * rows_per_band:(band + 1) * rows_per_band].astype(np.uint64)
+            keys = (band_signatures * multipliers).sum(axis=1, dtype=np.uint64)
+            _, inverse = np.unique(keys, return_inverse=True)
+            buckets.append((inverse.reshape(-1), int(inverse.max()) + 1))
+
+        return buckets
+
+    @staticmethod
+    def __get_edge_components(labels, rows, columns):
+        # connect the two rows of every edge until labels do not change, the label is the smallest row
+        while True:
+            previous = labels.copy()
+            np.minimum.at(labels, rows, labels[columns])
+            np.minimum.at(labels, columns, labels[rows])
+            labels = labels[labels]
+
+            if np.array_equal(labels, previous):
+                return labels
+
+    def __merge_buckets(self, labels):
+        # join buckets whose first messages have hamming similarity >= __MERGE_THRESHOLD
+        first_rows = np.unique(labels)
+        first_events = [self.event_indices[row] for row in first_rows]
+        hamming_similarity = VectorizedHammingSimilarity(self.event_attributes, first_events, self.executor)
+        rows, columns, _ = hamming_similarity.get_similarity_edges(self.__MERGE_THRESHOLD)
+        if len(rows) == 0:
+            return labels
+
+        first_labels = self.__get_edge_components(np.arange(len(first_rows), dtype=np.int64), rows, columns)
+
+        # every row gets the first row of its merged bucket
+        return first_rows[first_labels[np.searchsorted(first_rows, labels)]]
+
+    def __get_token_matrix(self):
+        # rows of token ids padded with -1 and the hamming weight of each position of a row
+        tokens = [self.event_attributes[event_id]['tokens'] for event_id in self.event_indices]
+        lengths = np.array([len(message) for message in tokens], dtype=np.int64)
+        width = max(int(lengths.max()), 1)
+        token_matrix = np.full((len(tokens), width), -1, dtype=np.int32)
+        token_matrix[np.arange(width)[None, :] < lengths[:, None]] = np.concatenate(tokens)
+        weights = np.maximum(lengths[:, None] - np.arange(width, dtype=np.int64)[None, :], 0)
+
+        return token_matrix, weights
+
+    def __attach_small_buckets(self, labels):
+        # a row of a small bucket gets the large bucket whose first row has the highest weighted hamming
+        # similarity to it, ties go to the first bucket, a row without any similar bucket keeps its bucket
+        _, inverse, counts = np.unique(labels, return_inverse=True, return_counts=True)
+        small_rows = np.flatnonzero(counts[inverse] < self.__MIN_BUCKET_SIZE)
+        first_rows = np.unique(labels[counts[inverse] >= self.__MIN_BUCKET_SIZE])
+        if len(small_rows) == 0 or len(first_rows) == 0:
+            return labels
+
+        # a row is compared with one row per large bucket, not with all rows of the large buckets
+        token_matrix, weights = self.__get_token_matrix()
+        first_tokens = token_matrix[first_rows]
+        total_weights = weights[:, 0] * (weights[:, 0] + 1) // 2
+        block_rows = max(1, self.__MAX_BLOCK_ELEMENTS // first_tokens.size)
+        attached = labels.copy()
+        for start in range(0, len(small_rows), block_rows):
+            rows = small_rows[start:start + block_rows]
+            same_token = (token_matrix[rows][:, None, :] == first_tokens[None, :, :]) & \
+                (token_matrix[rows][:, None, :] >= 0)
+            scores = (same_token * weights[rows][:, None, :]).sum(axis=2)
+            self.comparisons += scores.size
+
+            # normalised weighted hamming similarity, rounded as in HammingSimilarity.get_weighted_hamming
+            similarity = np.round(scores / np.maximum(total_weights[rows], 1)[:, None], 3)
+            best = similarity.argmax(axis=1)
+            similar = similarity[np.arange(len(rows)), best] > 0.
+            attached[rows[similar]] = first_rows[best[similar]]
+
+        return attached
+
+    def get_buckets(self):
+        # output: list of buckets, a bucket is a list of event ids in the order of event_indices
+        if len(self.event_indices) == 0:
+            return []
+
+        signatures = self.get_signatures()
+        labels = self.__get_components(np.arange(len(self.event_indices), dtype=np.int64),
+                                       self.__get_band_buckets(signatures))
+        labels = self.__merge_buckets(labels)
+        labels = self.__attach_small_buckets(labels)
+
+        order = np.argsort(labels, kind='mergesort')
+        sorted_labels = labels[order]
+        starts = np.flatnonzero(np.append(True, sorted_labels[1:] != sorted_labels[:-1]))
+        buckets = [[self.event_indices[row] for row in rows] for rows in np.split(order, starts[1:])]
+
+        return buckets
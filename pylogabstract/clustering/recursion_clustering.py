@@ -1,44 +1,42 @@
-import community as commun
 import networkx as nx
 import sys
 from collections import defaultdict
-from networkx.algorithms import community
-from operator import itemgetter
 from pylogabstract.preprocess.preprocess import Preprocess
 from pylogabstract.preprocess.create_graph import CreateGraph
 from pylogabstract.parser.parser import Parser
 from pylogabstract.clustering.force_clustering import ForceClustering
+from pylogabstract.clustering.minhash_lsh import MinHashLSH
+from pylogabstract.clustering.community_detection import CommunityDetection
 
 
 class LogClustering(object):
-    def __init__(self, parsed_logs, raw_logs, partial_message_length_group=None, partial_event_attributes=None):
+    def __init__(self, parsed_logs, raw_logs, partial_message_length_group=None, partial_event_attributes=None,
+                 executor=None, clustering_backend='girvan_newman', lsh_config=None, token_dictionary=None):
         self.clusters = defaultdict(dict)
         self.cluster_id = 0
         self.message_length_group = {}
         self.event_attributes = {}
+        self.event_position = None
         self.preprocess = None
         self.parsed_logs = parsed_logs
         self.raw_logs = raw_logs
         self.partial_message_length_group = partial_message_length_group
         self.partial_event_attributes = partial_event_attributes
+        self.executor = executor
+        self.clustering_backend = clustering_backend
+
+        # approximate mode, groups with at least min_group_size messages are split by MinHash LSH first
+        # lsh_config: {'min_group_size': int, 'signatures': int, 'bands': int} or None for exact clustering
+        self.lsh_config = lsh_config
+
+        # token ids of messages, shared with the caller that reads the event attributes
+        self.token_dictionary = token_dictionary
 
         # we only have 4GB computer, so we limit the computation.
         self.__BOTTOM_DENSITY = 0.8
         self.__TOP_DENSITY = 1.0
         self.__MAX_EDGES = 10000
 
-    @staticmethod
-    def __convert_to_nodeid_clusterid(partition):
-        # output: {nodeid:clusterid, ...}
-        part_dict = {}
-        cluster_id = 0
-        for p in partition:
-            for node_id in p:
-                part_dict[node_id] = cluster_id
-            cluster_id += 1
-
-        return part_dict
-
     @staticmethod
     def __convert_to_clusterid_nodeid(partitions):
         # output: {clusterid: [nodeid, ...], ...}
@@ -119,37 +117,51 @@ class LogClustering(object):
             return None
 
     def __get_graph_cluster(self, graph):
-        # initialize maximum modularity and best cluster
-        max_modularity = -1.
-        best_cluster = []
-
-        # clustering using Girvan-Newman method
-        clusters = community.girvan_newman(graph, most_valuable_edge=lightest)
-        for cluster in clusters:
-            # calculate modularity for each cluster
-            partition = self.__convert_to_nodeid_clusterid(cluster)
-            modularity = commun.modularity(partition, graph)
-
-            # best cluster has the highest modularity
-            if max_modularity < modularity:
-                max_modularity = modularity
-                best_cluster = cluster
+        # clustering with the selected community detection backend
+        community_detection = CommunityDetection(graph, self.clustering_backend)
+        best_cluster = community_detection.get_communities()
         best_cluster = self.__convert_to_clusterid_nodeid(best_cluster)
 
         return best_cluster
 
+    def __is_dense_group(self, graph_model, group_length):
+        # a graph with fewer possible edges than __MAX_EDGES is never forced, so edges are counted only if needed
+        # density is computed as in nx.density, from the edge count instead of the graph
+        possible_edges = group_length * (group_length - 1) // 2
+        if possible_edges < self.__MAX_EDGES:
+            return False
+
+        edge_count = graph_model.get_edge_count()
+        graph_density = edge_count / (group_length * (group_length - 1)) * 2 if edge_count > 0 else 0
+
+        return (self.__BOTTOM_DENSITY < graph_density <= self.__TOP_DENSITY) and (edge_count >= self.__MAX_EDGES)
+
     def __get_partial_unique_events(self, indices):
+        # events of indices in the order of event_attributes, without scanning all events for every group
+        if self.event_position is None:
+            self.event_position = {index: position for position, index in enumerate(self.event_attributes.keys())}
+
         partial_unique_events = []
-        for index, attr in self.event_attributes.items():
-            if index in indices:
-                partial_unique_events.append((index, attr))
+        for index in sorted(set(indices), key=self.event_position.get):
+            partial_unique_events.append((index, self.event_attributes[index]))
 
         return partial_unique_events
 
-    def __get_clusters(self, message_length_group):
+    def __get_lsh_buckets(self, group):
+        # output: buckets of a large group, or None if the group is clustered exactly
+        if self.lsh_config is None or len(group) < self.lsh_config['min_group_size']:
+            return None
+
+        minhash_lsh = MinHashLSH(self.event_attributes, group, self.lsh_config.get('signatures', 128),
+                                 self.lsh_config.get('bands', 32), self.executor)
+
+        return minhash_lsh.get_buckets()
+
+    def __get_clusters(self, message_length_group, bucketing=True):
         for message_length, group in message_length_group.items():
             # no graph needed as there is only one node
             group_length = len(group)
+            buckets = self.__get_lsh_buckets(group) if bucketing and group_length > 1 else None
             if group_length == 1:
                 self.clusters[message_length][self.cluster_id] = {
                     'nodes': group,
@@ -157,30 +169,32 @@ class LogClustering(object):
                 }
                 self.cluster_id += 1
 
+            # exact clustering within each bucket of a very large group, buckets are not split again
+            elif buckets is not None:
+                for bucket in buckets:
+                    self.__get_clusters({message_length: bucket}, bucketing=False)
+
             # create graph for a particular group
             else:
                 unique_events = self.__get_partial_unique_events(group)
-                graph_model = CreateGraph(unique_events, self.event_attributes, group)
-                graph = graph_model.create_graph()
-
-                # if it is a complete graph, no clustering needed
-                graph_density = nx.density(graph)
+                graph_model = CreateGraph(unique_events, self.event_attributes, group, self.executor)
 
-                # high density graph
-                # we only have 4GB computer, so we limit the computation.
-                if (self.__BOTTOM_DENSITY < graph_density <= self.__TOP_DENSITY) and \
-                        (len(graph.edges) >= self.__MAX_EDGES):
-                    force_clustering = ForceClustering(graph, self.cluster_id)
+                # high density graph, only the edges kept by force clustering are created
+                if self.__is_dense_group(graph_model, group_length):
+                    force_clustering = ForceClustering(None, self.cluster_id)
+                    force_clustering.set_graph(graph_model)
                     clusters, self.cluster_id = force_clustering.get_clusters()
                     self.clusters[message_length].update(clusters)
 
                 else:
                     # clustering with valid graph only
+                    graph = graph_model.create_graph()
                     graph = self.__get_valid_graph(message_length, graph)
                     if graph is not None:
                         clusters = self.__get_graph_cluster(graph)
                         for index, nodes in clusters.items():
-                            if len(nodes) <= 3:
+                            # a backend may keep the whole graph as one community, do not recurse on it
+                            if len(nodes) <= 3 or len(clusters) == 1:
                                 self.clusters[message_length][self.cluster_id] = {
                                     'nodes': nodes,
                                     'check': True
@@ -189,12 +203,12 @@ class LogClustering(object):
                             else:
                                 # recursion here
                                 message_length_group_recursion = {message_length: nodes}
-                                self.__get_clusters(message_length_group_recursion)
+                                self.__get_clusters(message_length_group_recursion, bucketing=False)
 
     def __run_preprocess(self):
         # preprocess
         if self.partial_message_length_group is None and self.partial_event_attributes is None:
-            self.preprocess = Preprocess(self.parsed_logs, self.raw_logs)
+            self.preprocess = Preprocess(self.parsed_logs, self.raw_logs, self.token_dictionary)
             self.preprocess.get_unique_events()
             self.message_length_group = self.preprocess.message_length_group
             self.event_attributes = self.preprocess.event_attributes
@@ -210,12 +224,6 @@ class LogClustering(object):
         return self.clusters
 
 
-def lightest(g):
-    # get lightest edge weight in a graph
-    u, v, w = min(g.edges(data='weight'), key=itemgetter(2))
-    return u, v
-
-
 if __name__ == '__main__':
     # parse log file
     # get log file name
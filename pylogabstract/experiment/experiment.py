@@ -3,6 +3,7 @@ import errno
 import csv
 import sys
 import statistics
+from optparse import OptionParser
 from configparser import ConfigParser
 from pylogabstract.abstraction.abstraction import LogAbstraction
 from pylogabstract.abstraction.abstraction_utility import AbstractionUtility
@@ -17,7 +18,7 @@ from pylogabstract.evaluation.evaluation import Evaluation
 
 
 class Experiment(object):
-    def __init__(self, method, dataset, config_file):
+    def __init__(self, method, dataset, config_file, inference_socket=None, parse_cache=None):
         self.method = method
         self.dataset = dataset
         self.config_file = config_file
@@ -25,11 +26,13 @@ class Experiment(object):
         self.files = {}
 
         # initiate abstraction
+        # inference_socket: socket of a running inference server, so each run does not load its own model
+        # parse_cache: True to read log files parsed by an earlier run from the parse cache
         if self.method == 'pylogabstract':
-            self.log_abstraction = LogAbstraction()
+            self.log_abstraction = LogAbstraction(inference_socket=inference_socket, parse_cache=parse_cache)
 
         elif self.method in ['iplom', 'logsig', 'drain', 'logmine', 'spell']:
-            self.misc_utility = MiscUtility()
+            self.misc_utility = MiscUtility(inference_socket, parse_cache)
 
     @staticmethod
     def __check_path(path):
@@ -294,7 +297,20 @@ if __name__ == '__main__':
     dataset_list = ['casper-rw', 'dfrws-2009-jhuisi', 'dfrws-2009-nssal',
                     'dfrws-2016', 'honeynet-challenge7']
 
-    if len(sys.argv) < 3:
+    option_parser = OptionParser(usage='usage: experiment.py [options] method_name dataset_name')
+    option_parser.add_option('-s', '--inference-socket',
+                             action='store',
+                             dest='inference_socket',
+                             help='Unix domain socket of a running pylogabstract-server, the server tags the logs '
+                                  'instead of a model loaded in this process. Default: no server.')
+    option_parser.add_option('--parse-cache',
+                             action='store_true',
+                             dest='parse_cache',
+                             help='Read log files parsed by an earlier run from the parse cache. '
+                                  'Default: Config.use_parse_cache.')
+    (options, args) = option_parser.parse_args()
+
+    if len(args) < 2:
         print('Please input abstraction method and dataset name.')
         print('experiment.py method_name dataset_name')
         print('Supported methods :', abstraction_list)
@@ -302,9 +318,10 @@ if __name__ == '__main__':
         sys.exit(1)
 
     else:
-        abstraction_method = sys.argv[1]
-        dataset_name = sys.argv[2]
+        abstraction_method = args[0]
+        dataset_name = args[1]
         conf_file = ''
 
-        experiment = Experiment(abstraction_method, dataset_name, conf_file)
+        experiment = Experiment(abstraction_method, dataset_name, conf_file, options.inference_socket,
+                                options.parse_cache)
         experiment.run_abstraction_serial()
@@ -2,6 +2,7 @@ import os
 import json
 import errno
 import sys
+from optparse import OptionParser
 from configparser import ConfigParser
 from collections import defaultdict
 from pylogabstract.preprocess.preprocess import Preprocess
@@ -10,14 +11,16 @@ from pylogabstract.parser.parser import Parser
 
 
 class GroundTruth(object):
-    def __init__(self, dataset, datasets_config_file, wordlist_dir):
+    def __init__(self, dataset, datasets_config_file, wordlist_dir, inference_socket=None, parse_cache=None):
         self.dataset = dataset
         self.datasets_config_file = datasets_config_file
         self.wordlist_dir = wordlist_dir
         self.configurations = {}
 
         # initiate parser
-        self.parser = Parser()
+        # inference_socket: socket of a running inference server, so each run does not load its own model
+        # parse_cache: True to read log files parsed by an earlier run from the parse cache
+        self.parser = Parser(inference_socket, parse_cache=parse_cache)
 
     @staticmethod
     def __check_path(path):
@@ -77,7 +80,7 @@ class GroundTruth(object):
 
     def __get_preprocessed_logs(self, log_file):
         # parse log files
-        parsed_logs, raw_logs = self.parser.parse_logs(log_file)
+        parsed_logs, raw_logs = self.parser.parse_logs(log_file, raw_log_store=True)
 
         # preprocessing
         preprocess = Preprocess(parsed_logs, raw_logs)
@@ -250,13 +253,27 @@ if __name__ == '__main__':
     dataset_list = ['casper-rw', 'dfrws-2009-jhuisi', 'dfrws-2009-nssal',
                     'dfrws-2016', 'honeynet-challenge7']
 
-    if len(sys.argv) < 2:
+    option_parser = OptionParser(usage='usage: groundtruth.py [options] dataset_name')
+    option_parser.add_option('-s', '--inference-socket',
+                             action='store',
+                             dest='inference_socket',
+                             help='Unix domain socket of a running pylogabstract-server, the server tags the logs '
+                                  'instead of a model loaded in this process. Default: no server.')
+    option_parser.add_option('--parse-cache',
+                             action='store_true',
+                             dest='parse_cache',
+                             help='Read log files parsed by an earlier run from the parse cache. '
+                                  'Default: Config.use_parse_cache.')
+    (options, args) = option_parser.parse_args()
+
+    if len(args) < 1:
         print('Please input dataset name.')
         print('experiment.py dataset_name')
         print('Supported datasets:', dataset_list)
         sys.exit(1)
 
     else:
-        dataset_name = sys.argv[1]
-        gt = GroundTruth(dataset_name, datasets_config, wordlist_directory)
+        dataset_name = args[0]
+        gt = GroundTruth(dataset_name, datasets_config, wordlist_directory, options.inference_socket,
+                         options.parse_cache)
         gt.get_ground_truth()
@@ -3,8 +3,10 @@ from pylogabstract.abstraction.abstraction_utility import AbstractionUtility
 
 
 class MiscUtility(object):
-    def __init__(self):
-        self.parser = Parser()
+    def __init__(self, inference_socket=None, parse_cache=None):
+        # inference_socket: socket of a running inference server, so each run does not load its own model
+        # parse_cache: True to read log files parsed by an earlier run from the parse cache
+        self.parser = Parser(inference_socket, parse_cache=parse_cache)
 
     def __parser(self, log_file):
         # parse log files, only message field given to the method
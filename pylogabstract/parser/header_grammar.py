@@ -0,0 +1,70 @@
+import re
+
+
+class HeaderGrammar(object):
+    """Label syslog headers with precompiled per-token grammars.
+
+    Each grammar is a list of (token pattern, NER entity) for the first words of a line.
+    The first grammar whose patterns match all of its words labels the header with the same
+    BIO tags as the NER model, so the entities end up in the same keys as the model output.
+    Only tags of the model are emitted: an entity without a B- tag in the model starts with its I- tag.
+    """
+    def __init__(self, tags):
+        # tags: NER tags of the model, such as the keys of load_vocab(config.filename_tags)
+        self.tags = set(tags)
+
+        month = r'(?:<\d{1,3}>)?(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)'
+        day = r'\d{1,2}'
+        time = r'\d{2}:\d{2}:\d{2}'
+        iso_timestamp = r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?(?:Z|[+-]\d{2}:\d{2})?'
+        hostname = r'[\w.\-]+'
+        tag = r'[^\s\[\]:]+(?:\[\d+\])?:'
+        nil_or_value = r'\S+'
+
+        grammars = [
+            # RFC 5424: <PRI>VERSION TIMESTAMP HOSTNAME APP-NAME PROCID MSGID
+            # the process id is a number and the message id a subservice, so the service is the app name only
+            [(r'(?:<\d{1,3}>)?\d{1,2}', 'LEV'), (iso_timestamp, 'TIM'), (hostname, 'HOS'),
+             (nil_or_value, 'SER'), (nil_or_value, 'NUM'), (nil_or_value, 'SUB')],
+
+            # RFC 3164: Mmm dd hh:mm:ss HOSTNAME TAG[PID]:
+            [(month, 'TIM'), (day, 'TIM'), (time, 'TIM'), (hostname, 'HOS'), (tag, 'SER')],
+
+            # RFC 3164 with high precision timestamp: TIMESTAMP HOSTNAME TAG[PID]:
+            [(iso_timestamp, 'TIM'), (hostname, 'HOS'), (tag, 'SER')]
+        ]
+
+        self.__GRAMMARS = []
+        for grammar in grammars:
+            patterns = [re.compile(pattern + r'\Z') for pattern, entity in grammar]
+            self.__GRAMMARS.append((patterns, self.__get_bio_labels([entity for pattern, entity in grammar])))
+
+    def __get_bio_labels(self, entities):
+        # consecutive words of the same entity are one entity
+        labels = []
+        previous_entity = None
+        for entity in entities:
+            if entity == previous_entity or 'B-' + entity not in self.tags:
+                labels.append('I-' + entity)
+            else:
+                labels.append('B-' + entity)
+            previous_entity = entity
+
+        return labels
+
+    def get_labels(self, words):
+        # output: NER labels of the header words, empty list if no grammar matches
+        for patterns, labels in self.__GRAMMARS:
+            if len(words) < len(patterns):
+                continue
+
+            matched = True
+            for pattern, word in zip(patterns, words):
+                if pattern.match(word) is None:
+                    matched = False
+                    break
+
+            if matched:
+                return list(labels)
+
+        return []
@@ -0,0 +1,61 @@
+import os
+import json
+import socket
+
+
+class InferenceClient(object):
+    """Client of the NER inference server, used by Parser in place of NERModel.
+
+    Requests and responses are one JSON object per line over a Unix domain socket:
+    {"sentences": [[word, ...], ...]} is answered by {"labels": [[label, ...], ...]} and
+    {"model": true} by {"model": fingerprint of the model files of the server}.
+    Labels are trusted, so the client only connects to a socket owned by the same user.
+    """
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self.__socket = None
+        self.__file = None
+
+    def __connect(self):
+        if self.__socket is None:
+            if os.stat(self.socket_path).st_uid != os.getuid():
+                raise RuntimeError('Inference server socket is owned by another user: ' + self.socket_path)
+
+            self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.__socket.connect(self.socket_path)
+            self.__file = self.__socket.makefile('rb')
+
+    def __request(self, request):
+        # send one request line and read its response line
+        self.__connect()
+        self.__socket.sendall((json.dumps(request) + '\n').encode('utf-8'))
+
+        response = self.__file.readline()
+        if not response:
+            self.close()
+            raise RuntimeError('Inference server closed the connection: ' + self.socket_path)
+
+        response = json.loads(response.decode('utf-8'))
+        if 'error' in response:
+            raise RuntimeError('Inference server error: ' + response['error'])
+
+        return response
+
+    def get_model_fingerprint(self):
+        # same output as Config.get_model_fingerprint() in the server process
+        return self.__request({'model': True})['model']
+
+    def predict_sentences(self, sentences_raw):
+        # same output as NERModel.predict_sentences(), one label list per sentence
+        return self.__request({'sentences': sentences_raw})['labels']
+
+    def predict(self, words_raw):
+        # same output as NERModel.predict(), labels of one sentence
+        return self.predict_sentences([words_raw])[0]
+
+    def close(self):
+        if self.__socket is not None:
+            self.__file.close()
+            self.__socket.close()
+            self.__file = None
+            self.__socket = None
@@ -0,0 +1,196 @@
+import os
+import json
+import signal
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from optparse import OptionParser
+from pylogabstract.parser.model.config import Config
+
+
+class InferenceServer(object):
+    """Local NER inference service over a Unix domain socket.
+
+    One warm NERModel serves all clients. Concurrent requests are combined into one dynamic batch:
+    the first request waits at most max_wait seconds for more sentences, up to max_batch_size.
+    The model runs in a single worker thread, so new requests are still read while a batch is predicted.
+    """
+    def __init__(self, socket_path=None, max_batch_size=None, max_wait=None):
+        self.config = Config(inference=True)
+        self.socket_path = socket_path if socket_path else self.config.inference_socket
+        self.max_batch_size = max_batch_size if max_batch_size else self.config.max_batch_inference
+        self.max_wait = max_wait if max_wait is not None else self.config.max_wait_inference
+        self.batches = 0
+        self.sentences = 0
+        self.queue = None
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+        # clients add the model files of the server to the key of their parse cache
+        self.model_fingerprint = self.config.get_model_fingerprint('ner')
+
+        # load pretrained model
+        self.model = None
+        self.__load_model()
+
+    def __load_model(self):
+        # tensorflow is imported only when the model is loaded
+        from pylogabstract.parser.model.ner_model import NERModel
+
+        self.model = NERModel(self.config)
+        self.model.build_inference()
+        self.model.restore_model()
+
+    def __predict(self, sentences_raw):
+        # sort by number of words so each minibatch needs little padding, empty sentences have no label
+        ner_labels = [[] for _ in sentences_raw]
+        indices = sorted([index for index, words in enumerate(sentences_raw) if words],
+                         key=lambda index: len(sentences_raw[index]))
+
+        batch_size = self.config.batch_size_parse
+        for start in range(0, len(indices), batch_size):
+            batch_indices = indices[start:start + batch_size]
+            batch_labels = self.model.predict_sentences([sentences_raw[index] for index in batch_indices])
+            for index, ner_label in zip(batch_indices, batch_labels):
+                ner_labels[index] = ner_label
+
+        return ner_labels
+
+    async def __run_batches(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            # wait for the first request, then collect more requests until the batch is full or time is up
+            requests = [await self.queue.get()]
+            total_sentences = len(requests[0][0])
+            deadline = loop.time() + self.max_wait
+            while total_sentences < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+
+                try:
+                    request = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+                requests.append(request)
+                total_sentences += len(request[0])
+
+            sentences_raw = [words for sentences, future in requests for words in sentences]
+            try:
+                ner_labels = await loop.run_in_executor(self.executor, self.__predict, sentences_raw)
+            except Exception as exception:
+                for sentences, future in requests:
+                    if not future.cancelled():
+                        future.set_exception(exception)
+                continue
+
+            self.batches += 1
+            self.sentences += len(sentences_raw)
+
+            # send the labels back to each request
+            start = 0
+            for sentences, future in requests:
+                if not future.cancelled():
+                    future.set_result(ner_labels[start:start + len(sentences)])
+                start += len(sentences)
+
+    async def __handle_client(self, reader, writer):
+        # one JSON request per line, answered in order
+        loop = asyncio.get_event_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                try:
+                    request = json.loads(line.decode('utf-8'))
+                    if 'model' in request:
+                        response = {'model': self.model_fingerprint}
+                    else:
+                        future = loop.create_future()
+                        await self.queue.put((request['sentences'], future))
+                        response = {'labels': await future}
+                except Exception as exception:
+                    response = {'error': repr(exception)}
+
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+
+        except ConnectionError:
+            pass
+
+        finally:
+            writer.close()
+
+    def __make_socket_dir(self):
+        # the default socket directory is private to the user, other users cannot bind or replace the socket
+        socket_dir = self.config.dir_inference
+        if not os.path.isdir(socket_dir):
+            os.makedirs(socket_dir, mode=0o700)
+
+        stat = os.lstat(socket_dir)
+        if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+            raise RuntimeError('Inference socket directory must be owned by the user with mode 0700: ' + socket_dir)
+
+    def serve_forever(self):
+        if os.path.dirname(os.path.abspath(self.socket_path)) == os.path.abspath(self.config.dir_inference):
+            self.__make_socket_dir()
+
+        # remove a stale socket file from a previous run
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+        # only the user can connect to the socket
+        loop = asyncio.get_event_loop()
+        self.queue = asyncio.Queue()
+        umask = os.umask(0o177)
+        try:
+            server = loop.run_until_complete(asyncio.start_unix_server(self.__handle_client, path=self.socket_path,
+                                                                       limit=self.config.max_request_inference))
+        finally:
+            os.umask(umask)
+        batch_task = asyncio.ensure_future(self.__run_batches())
+        loop.add_signal_handler(signal.SIGTERM, loop.stop)
+        print('NER inference server is listening on', self.socket_path)
+
+        try:
+            loop.run_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            batch_task.cancel()
+            server.close()
+            loop.run_until_complete(server.wait_closed())
+            self.executor.shutdown()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            print('Served', self.sentences, 'sentences in', self.batches, 'batches')
+
+
+def main():
+    parser = OptionParser(usage='usage: pylogabstract-server [options]')
+    parser.add_option('-s', '--socket',
+                      action='store',
+                      dest='socket_path',
+                      help='Unix domain socket path. Default: Config.inference_socket.')
+    parser.add_option('-b', '--batch-size',
+                      action='store',
+                      type='int',
+                      dest='max_batch_size',
+                      help='Maximum number of sentences in one dynamic batch.')
+    parser.add_option('-t', '--max-wait',
+                      action='store',
+                      type='float',
+                      dest='max_wait',
+                      help='Maximum time in milliseconds a request waits for other requests.')
+
+    # get options
+    (options, args) = parser.parse_args()
+    max_wait = options.max_wait / 1000. if options.max_wait is not None else None
+
+    inference_server = InferenceServer(options.socket_path, options.max_batch_size, max_wait)
+    inference_server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -61,12 +61,12 @@ input> I love Paris""")
 
 def main():
     # create instance of config
-    config = Config()
+    config = Config(inference=True)
 
-    # build model
+    # build model, only the graph needed for tagging
     model = NERModel(config)
-    model.build()
-    model.restore_session(config.dir_model)
+    model.build_inference()
+    model.restore_model()
 
     # interactive shell
     interactive_shell(model)
@@ -66,6 +66,17 @@ class BaseModel(object):
         self.saver = tf.train.Saver()
 
 
+    def initialize_inference_session(self):
+        """Defines self.sess without initializing the variables
+
+        All variables are set by restore_session() or restore_bundle()
+
+        """
+        self.logger.info("Initializing tf session for inference")
+        self.sess = tf.Session()
+        self.saver = tf.train.Saver()
+
+
     def restore_session(self, dir_model):
         """Reload weights into session
 
@@ -78,6 +89,28 @@ class BaseModel(object):
         self.saver.restore(self.sess, dir_model)
 
 
+    def restore_bundle(self, bundle):
+        """Sets the weights from a model bundle
+
+        Args:
+            bundle: ModelBundle with one array per graph variable
+
+        """
+        self.logger.info("Loading the model bundle...")
+        variables = bundle.get_variables()
+        for variable in tf.global_variables():
+            variable.load(variables[variable.op.name], self.sess)
+
+
+    def restore_model(self):
+        """Sets the weights from the bundle if the config has one, else from
+        the latest checkpoint"""
+        if self.config.bundle is not None:
+            self.restore_bundle(self.config.bundle)
+        else:
+            self.restore_session(self.config.dir_model)
+
+
     def save_session(self):
         """Saves session = weights"""
         if not os.path.exists(self.config.dir_model):
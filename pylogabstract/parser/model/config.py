@@ -1,30 +1,43 @@
 import os
+import getpass
+import tempfile
 
 
 from pylogabstract.parser.model.general_utils import get_logger
 from pylogabstract.parser.model.data_utils import get_trimmed_glove_vectors, load_vocab, \
         get_processing_word
+from pylogabstract.parser.model.model_bundle import ModelBundle
 
 
 class Config():
-    def __init__(self, load=True):
+    def __init__(self, load=True, inference=False, use_bundle=True):
         """Initialize hyperparameters and load vocabs
 
         Args:
             load_embeddings: (bool) if True, load embeddings into
                 np array, else None
+            inference: (bool) if True, only tagging is needed: no output
+                directory, no log file and no pre-trained embeddings
+            use_bundle: (bool) if True and inference, load vocabs, embeddings
+                and weights from filename_bundle when it exists
 
         """
+        self.inference = inference
+        self.bundle = None
+
         # directory for training outputs
-        if not os.path.exists(self.dir_output):
+        if not inference and not os.path.exists(self.dir_output):
             os.makedirs(self.dir_output)
 
         # create instance of logger
-        self.logger = get_logger(self.path_log)
+        self.logger = get_logger(None if inference else self.path_log)
 
         # load if requested (default)
         if load:
-            self.load()
+            if inference and use_bundle and os.path.exists(self.filename_bundle):
+                self.load_bundle()
+            else:
+                self.load()
 
 
     def load(self):
@@ -50,9 +63,70 @@ class Config():
         self.processing_tag  = get_processing_word(self.vocab_tags,
                 lowercase=False, allow_unk=False)
 
-        # 3. get pre-trained embeddings
+        # 3. get pre-trained embeddings, restored from the checkpoint for inference
         self.embeddings = (get_trimmed_glove_vectors(self.filename_trimmed)
-                if self.use_pretrained else None)
+                if self.use_pretrained and not self.inference else None)
+
+
+    def load_bundle(self):
+        """Loads vocabulary, processing functions and word embeddings from
+        the memory-mapped model bundle
+
+        The weights are set later by BaseModel.restore_model()
+
+        """
+        self.bundle = ModelBundle(self.filename_bundle)
+        bundle_config = self.bundle.header['config']
+        if bundle_config != self.get_bundle_config():
+            raise ValueError('Model bundle was built with other hyperparameters: ' + self.filename_bundle)
+
+        # 1. vocabulary
+        self.vocab_words = self.bundle.get_vocab('words')
+        self.vocab_tags  = self.bundle.get_vocab('tags')
+        self.vocab_chars = self.bundle.get_vocab('chars')
+
+        self.nwords     = len(self.vocab_words)
+        self.nchars     = len(self.vocab_chars)
+        self.ntags      = len(self.vocab_tags)
+
+        # 2. get processing functions that map str -> id
+        self.processing_word = get_processing_word(self.vocab_words,
+                self.vocab_chars, lowercase=True, chars=self.use_chars)
+        self.processing_tag  = get_processing_word(self.vocab_tags,
+                lowercase=False, allow_unk=False)
+
+        # 3. word vectors are looked up in the bundle, not in the graph
+        self.embeddings = None
+
+
+    def get_bundle_config(self):
+        """Returns the hyperparameters that a model bundle must match"""
+        return {'dim_word': self.dim_word, 'dim_char': self.dim_char,
+                'hidden_size_char': self.hidden_size_char,
+                'hidden_size_lstm': self.hidden_size_lstm,
+                'use_crf': self.use_crf, 'use_chars': self.use_chars}
+
+
+    def get_model_fingerprint(self, backend):
+        """Returns the name, size and modification time of the model files
+        of a backend, the files that change tagging results"""
+        if backend == 'perceptron':
+            model_files = [self.filename_perceptron]
+        else:
+            model_files = [self.filename_bundle, self.filename_words,
+                    self.filename_tags, self.filename_chars]
+            if os.path.isdir(self.dir_model):
+                model_files += [os.path.join(self.dir_model, name)
+                        for name in sorted(os.listdir(self.dir_model))]
+
+        fingerprint = [backend]
+        for model_file in model_files:
+            if os.path.exists(model_file):
+                stat = os.stat(model_file)
+                fingerprint.append([os.path.basename(model_file), stat.st_size,
+                        stat.st_mtime_ns])
+
+        return fingerprint
 
 
     # general config
@@ -105,3 +179,34 @@ class Config():
     use_chars = True # if char embedding, training is 3.5x slower on CPU
 
     label_file = os.path.join(file_path, '..', "data/label.txt")
+
+    # tagger used by Parser: "ner" (BiLSTM in tensorflow) or "perceptron" (numpy only)
+    backend = "ner"
+    # averaged perceptron tagger (created with perceptron_tagger.py)
+    filename_perceptron = os.path.join(file_path, '..', "data/perceptron.npz")
+    nepochs_perceptron = 10
+
+    # single-file model for inference (created with model_bundle.py)
+    filename_bundle = os.path.join(file_path, '..', "data/model.bundle")
+
+    # parsing
+    batch_size_parse = 256 # number of log lines per sess.run when parsing
+    buffer_size_parse = 4096 # number of log lines held in memory by iter_parse
+    # number of label sequences in the prediction cache, 0 to disable
+    # the cache is lossy: lines that differ only in numbers, IP addresses or hex strings reuse the labels
+    # of the first such line, which can differ from the model output for them, so it is off by default
+    cache_size_parse = 0
+    cache_size_encode = 100000 # number of distinct tokens kept encoded by the batch encoder
+    use_header_grammar = False # if True, syslog headers are labeled by grammars, the rest by the model
+    shard_size_parse = 8388608 # bytes of a log file per worker task in parallel parsing
+    use_parse_cache = False # if True, parse results are kept on disk by log file content and model
+    dir_parse_cache = os.path.join(os.path.expanduser('~'), '.cache', 'pylogabstract', 'parse')
+    max_size_parse_cache = 1073741824 # bytes of the parse cache directory, least recently used files are removed
+
+    # inference server, Parser only uses it when it is given the socket path
+    # the default socket is in a directory that only the user can access
+    dir_inference = os.path.join(tempfile.gettempdir(), 'pylogabstract-' + getpass.getuser())
+    inference_socket = os.path.join(dir_inference, 'ner.sock')
+    max_batch_inference = 1024 # maximum number of sentences in one dynamic batch
+    max_wait_inference = 0.005 # seconds a request waits for requests of other clients
+    max_request_inference = 67108864 # maximum bytes of one request line
@@ -337,6 +337,143 @@ def pad_sequences(sequences, pad_tok, nlevels=1):
     return sequence_padded, sequence_length
 
 
+class BatchEncoder(object):
+    """Encodes a batch of raw sentences into padded numpy arrays
+
+    Gives the same word_ids, char_ids and lengths as processing_word
+    followed by pad_sequences, but each distinct token is processed once
+    and kept in a cache, and the padding is done with numpy masks.
+
+    Example:
+        ```python
+        encoder = BatchEncoder(config.processing_word, config.use_chars)
+        word_ids, sequence_lengths, char_ids, word_lengths = \
+                encoder.encode([["Failed", "password"], ["sshd"]])
+        ```
+
+    """
+    def __init__(self, processing_word, chars=False, max_size=100000):
+        """
+        Args:
+            processing_word: function returned by get_processing_word
+            chars: (bool) if True, processing_word returns (char ids, word id)
+            max_size: (int) maximum number of cached tokens, the cache is
+                emptied when it is full
+
+        """
+        self.processing_word = processing_word
+        self.chars = chars
+        self.max_size = max_size
+        self.tokens = {}
+
+
+    def __get_token(self, word):
+        token = self.tokens.get(word)
+        if token is None:
+            token = self.processing_word(word)
+            if len(self.tokens) >= self.max_size:
+                self.tokens.clear()
+            self.tokens[word] = token
+
+        return token
+
+
+    def encode(self, sentences_raw):
+        """
+        Args:
+            sentences_raw: list of sentences, a sentence is a non-empty list
+                of words (string)
+
+        Returns:
+            word_ids: int32 array (batch size, max sentence length)
+            sequence_lengths: int32 array (batch size)
+            char_ids: int32 array (batch size, max sentence length, max word
+                length), None without chars
+            word_lengths: int32 array (batch size, max sentence length), None
+                without chars
+
+        """
+        tokens = [self.__get_token(word) for words_raw in sentences_raw
+                  for word in words_raw]
+        sequence_lengths = np.array([len(words_raw) for words_raw in sentences_raw],
+                                    dtype=np.int32)
+
+        # mask of the valid steps, filled in row-major order like the flat tokens
+        max_length = sequence_lengths.max()
+        mask = np.arange(max_length) < sequence_lengths[:, None]
+
+        word_ids = np.zeros(mask.shape, dtype=np.int32)
+        if not self.chars:
+            word_ids[mask] = tokens
+            return word_ids, sequence_lengths, None, None
+
+        word_ids[mask] = [token[1] for token in tokens]
+        token_lengths = np.array([len(token[0]) for token in tokens], dtype=np.int32)
+        word_lengths = np.zeros(mask.shape, dtype=np.int32)
+        word_lengths[mask] = token_lengths
+
+        # pad the chars of all tokens to the longest word, then place them in the batch
+        max_length_word = token_lengths.max()
+        token_mask = np.arange(max_length_word) < token_lengths[:, None]
+        token_chars = np.zeros(token_mask.shape, dtype=np.int32)
+        token_chars[token_mask] = [char_id for token in tokens for char_id in token[0]]
+        char_ids = np.zeros(mask.shape + (max_length_word,), dtype=np.int32)
+        char_ids[mask] = token_chars
+
+        return word_ids, sequence_lengths, char_ids, word_lengths
+
+
+def viterbi_decode_batch(scores, transition_params, sequence_lengths):
+    """Decodes the best tag sequences of a padded batch at once
+
+    Gives the same sequences as tf.contrib.crf.viterbi_decode on each
+    sentence: steps after the end of a sentence keep its trellis and point
+    back to the same tag, so the padding does not change the result.
+
+    Args:
+        scores: array (batch size, max sentence length, ntags), unary
+            potentials (logits)
+        transition_params: array (ntags, ntags), binary potentials
+        sequence_lengths: length of each sentence
+
+    Returns:
+        viterbi_sequences: list of list of tag ids, one for each sentence
+        viterbi_scores: array (batch size), score of each sequence
+
+    """
+    batch_size, max_length, ntags = scores.shape
+    sequence_lengths = np.asarray(sequence_lengths)
+    trellis = scores[:, 0].copy()
+    backpointers = np.zeros((batch_size, max_length, ntags), dtype=np.int32)
+    backpointers[:] = np.arange(ntags, dtype=np.int32)
+
+    # longest sentences first, so the active sentences at step t are a prefix
+    order = np.argsort(-sequence_lengths, kind='mergesort')
+    tags = np.arange(ntags)
+    for t in range(1, max_length):
+        active = order[:np.count_nonzero(sequence_lengths > t)]
+
+        # shape = (active sentences, previous tag, tag)
+        v = trellis[active, :, None] + transition_params
+        backpointer = np.argmax(v, 1)
+        trellis[active] = scores[active, t] + \
+                v[np.arange(len(active))[:, None], backpointer, tags]
+        backpointers[active, t] = backpointer
+
+    # follow the backpointers from the last step of each sentence
+    viterbi = np.zeros((batch_size, max_length), dtype=np.int32)
+    viterbi[:, -1] = np.argmax(trellis, 1)
+    rows = np.arange(batch_size)
+    for t in range(max_length - 1, 0, -1):
+        viterbi[:, t - 1] = backpointers[rows, t, viterbi[:, t]]
+
+    viterbi_sequences = [viterbi[i, :length].tolist()
+                         for i, length in enumerate(sequence_lengths)]
+    viterbi_scores = np.max(trellis, 1)
+
+    return viterbi_sequences, viterbi_scores
+
+
 def minibatches(data, minibatch_size):
     """
     Args:
@@ -8,7 +8,7 @@ def get_logger(filename):
     """Return a logger instance that writes in filename
 
     Args:
-        filename: (string) path to log.txt
+        filename: (string) path to log.txt, if None no log file is written
 
     Returns:
         logger: (instance of logger)
@@ -17,11 +17,12 @@ def get_logger(filename):
     logger = logging.getLogger('logger')
     logger.setLevel(logging.DEBUG)
     logging.basicConfig(format='%(message)s', level=logging.DEBUG)
-    handler = logging.FileHandler(filename)
-    handler.setLevel(logging.DEBUG)
-    handler.setFormatter(logging.Formatter(
-            '%(asctime)s:%(levelname)s: %(message)s'))
-    logging.getLogger().addHandler(handler)
+    if filename is not None:
+        handler = logging.FileHandler(filename)
+        handler.setLevel(logging.DEBUG)
+        handler.setFormatter(logging.Formatter(
+                '%(asctime)s:%(levelname)s: %(message)s'))
+        logging.getLogger().addHandler(handler)
 
     return logger
 
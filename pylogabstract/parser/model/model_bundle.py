@@ -0,0 +1,243 @@
+import sys
+import json
+import mmap
+import struct
+from bisect import bisect_left
+import numpy as np
+
+
+MAGIC = b'PLABNDL1'
+ALIGNMENT = 64
+
+
+class VocabTable(object):
+    """Read-only vocabulary backed by a memory-mapped sorted table
+
+    The words are sorted and stored as one UTF-8 blob with offsets, so a
+    lookup is a binary search. Found words are kept in a small dict, so
+    repeated words cost one dict lookup. It can be used in place of the
+    dict[word] = index returned by load_vocab.
+
+    """
+    def __init__(self, blob, offsets, ids):
+        self.blob = blob
+        self.offsets = offsets
+        self.ids = ids
+        self.keys_view = _SortedKeys(blob, offsets)
+        self.found = {}
+
+
+    def __len__(self):
+        return len(self.ids)
+
+
+    def get(self, word, default=None):
+        index = self.found.get(word)
+        if index is not None:
+            return index
+
+        key = word.encode('utf-8')
+        position = bisect_left(self.keys_view, key)
+        if position < len(self.ids) and self.keys_view[position] == key:
+            index = self.ids[position]
+            self.found[word] = index
+            return index
+
+        return default
+
+
+    def __contains__(self, word):
+        return self.get(word) is not None
+
+
+    def __getitem__(self, word):
+        index = self.get(word)
+        if index is None:
+            raise KeyError(word)
+
+        return index
+
+
+    def items(self):
+        for position in range(len(self.ids)):
+            yield self.keys_view[position].decode('utf-8'), self.ids[position]
+
+
+class _SortedKeys(object):
+    """Sequence of the sorted UTF-8 words for bisect"""
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+    def __getitem__(self, position):
+        return self.blob[self.offsets[position]:self.offsets[position + 1]]
+
+
+class ModelBundle(object):
+    """Single-file model bundle: vocabulary tables, float32 word embeddings
+    and the weights of the inference graph
+
+    The file is one JSON header followed by arrays aligned to 64 bytes. It
+    is opened with mmap, so loading does not parse or decompress anything
+    and processes on one host share the pages of the embeddings.
+
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = open(filename, 'rb')
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic = self.mmap[:len(MAGIC)]
+        if magic != MAGIC:
+            raise ValueError('Not a model bundle: ' + filename)
+
+        header_length = struct.unpack('<Q', self.mmap[len(MAGIC):len(MAGIC) + 8])[0]
+        header_start = len(MAGIC) + 8
+        self.header = json.loads(self.mmap[header_start:header_start + header_length].decode('utf-8'))
+        self.embeddings = self.get_array('embeddings')
+
+
+    def get_array(self, name):
+        """Returns a read-only array that points into the mapped file"""
+        array = self.header['arrays'][name]
+        count = int(np.prod(array['shape'])) if array['shape'] else 1
+        return np.frombuffer(self.mmap, dtype=array['dtype'], count=count,
+                offset=array['offset']).reshape(array['shape'])
+
+
+    def get_vocab(self, name):
+        """Returns the VocabTable of words, tags or chars"""
+        blob = self.header['arrays'][name + '/blob']
+        offsets = self.header['arrays'][name + '/offsets']
+        ids = self.header['arrays'][name + '/ids']
+
+        # memoryview indexing is cheaper than numpy scalars for a binary search
+        view = memoryview(self.mmap)
+        blob = view[blob['offset']:blob['offset'] + blob['shape'][0]]
+        offsets = view[offsets['offset']:offsets['offset'] + 8 * offsets['shape'][0]].cast('q')
+        ids = view[ids['offset']:ids['offset'] + 4 * ids['shape'][0]].cast('i')
+
+        return VocabTable(_BytesView(blob), offsets, ids)
+
+
+    def get_variables(self):
+        """Returns dict[variable name] = array for restore_bundle"""
+        return {name: self.get_array('variable/' + name)
+                for name in self.header['variables']}
+
+
+    def get_word_embeddings(self, word_ids):
+        """Looks up the word vectors of padded word ids in numpy"""
+        return self.embeddings[np.asarray(word_ids, dtype=np.int64)]
+
+
+class _BytesView(object):
+    """Slices of a memoryview returned as bytes for comparison"""
+    def __init__(self, view):
+        self.view = view
+
+
+    def __getitem__(self, key):
+        return self.view[key].tobytes()
+
+
+def get_vocab_arrays(vocab):
+    """Returns blob, offsets and ids arrays of a dict[word] = index sorted
+    by the UTF-8 bytes of the words"""
+    items = sorted((word.encode('utf-8'), index) for word, index in vocab.items())
+    blob = b''.join(word for word, index in items)
+    offsets = [0]
+    for word, index in items:
+        offsets.append(offsets[-1] + len(word))
+
+    return (np.frombuffer(blob, dtype=np.uint8), np.array(offsets, dtype=np.int64),
+            np.array([index for word, index in items], dtype=np.int32))
+
+
+def write_bundle(filename, arrays, variables, config):
+    """Writes arrays (dict[name] = np array) with a JSON header
+
+    Args:
+        filename: (string) path of the bundle
+        arrays: dict[name] = np array, stored in this order
+        variables: list of names of the graph variables in arrays
+        config: dict of hyperparameters the bundle was built with
+
+    """
+    header = {'arrays': {}, 'variables': variables, 'config': config}
+
+    # offsets depend on the header length, so the header reserves space for them first
+    header_length = 0
+    while True:
+        offset = len(MAGIC) + 8 + header_length
+        for name, array in arrays.items():
+            offset = (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+            header['arrays'][name] = {'offset': offset, 'dtype': array.dtype.str,
+                                      'shape': list(array.shape)}
+            offset += array.nbytes
+
+        header_bytes = json.dumps(header).encode('utf-8')
+        if len(header_bytes) <= header_length:
+            header_bytes += b' ' * (header_length - len(header_bytes))
+            break
+        header_length = len(header_bytes) + ALIGNMENT
+
+    with open(filename, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', header_length))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.write(b'\0' * (header['arrays'][name]['offset'] - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+
+
+def pack(filename):
+    """Builds a bundle from the vocabulary files and the trained checkpoint
+
+    Args:
+        filename: (string) path of the bundle
+
+    """
+    import tensorflow as tf
+    from pylogabstract.parser.model.config import Config
+    from pylogabstract.parser.model.ner_model import NERModel
+
+    # inference graph without bundle gives the names of all needed variables
+    config = Config(inference=True, use_bundle=False)
+    model = NERModel(config)
+    model.build_inference()
+    variable_names = [variable.op.name for variable in tf.global_variables()]
+
+    reader = tf.train.NewCheckpointReader(config.dir_model)
+    arrays = {}
+    for name, vocab in [('words', config.vocab_words), ('tags', config.vocab_tags),
+                        ('chars', config.vocab_chars)]:
+        blob, offsets, ids = get_vocab_arrays(vocab)
+        arrays[name + '/blob'] = blob
+        arrays[name + '/offsets'] = offsets
+        arrays[name + '/ids'] = ids
+
+    # word embeddings are looked up in numpy, other variables are loaded into the graph
+    word_embeddings_name = 'words/_word_embeddings'
+    arrays['embeddings'] = reader.get_tensor(word_embeddings_name).astype(np.float32)
+    variables = []
+    for name in variable_names:
+        if name != word_embeddings_name:
+            arrays['variable/' + name] = reader.get_tensor(name)
+            variables.append(name)
+
+    write_bundle(filename, arrays, variables, config.get_bundle_config())
+    model.close_session()
+
+
+if __name__ == '__main__':
+    # python -m pylogabstract.parser.model.model_bundle [bundle_file]
+    from pylogabstract.parser.model.config import Config
+    bundle_file = sys.argv[1] if len(sys.argv) > 1 else Config.filename_bundle
+    pack(bundle_file)
+    print('Model bundle is written to', bundle_file)
@@ -2,7 +2,8 @@ import numpy as np
 import tensorflow as tf
 
 
-from pylogabstract.parser.model.data_utils import minibatches, pad_sequences, get_chunks
+from pylogabstract.parser.model.data_utils import minibatches, pad_sequences, get_chunks, \
+        BatchEncoder, viterbi_decode_batch
 from pylogabstract.parser.model.general_utils import Progbar
 from pylogabstract.parser.model.base_model import BaseModel
 
@@ -14,6 +15,8 @@ class NERModel(BaseModel):
         super(NERModel, self).__init__(config)
         self.idx_to_tag = {idx: tag for tag, idx in
                            self.config.vocab_tags.items()}
+        self.batch_encoder = BatchEncoder(self.config.processing_word,
+                self.config.use_chars, self.config.cache_size_encode)
 
 
     def add_placeholders(self):
@@ -44,6 +47,13 @@ class NERModel(BaseModel):
         self.lr = tf.placeholder(dtype=tf.float32, shape=[],
                         name="lr")
 
+        # shape = (batch size, max length of sentence, dim_word)
+        # word vectors looked up in the model bundle
+        if self.config.bundle is not None:
+            self.word_vectors = tf.placeholder(tf.float32,
+                        shape=[None, None, self.config.dim_word],
+                        name="word_vectors")
+
 
     def get_feed_dict(self, words, labels=None, lr=None, dropout=None):
         """Given some data, pad it and build a feed dictionary
@@ -74,6 +84,9 @@ class NERModel(BaseModel):
             self.sequence_lengths: sequence_lengths
         }
 
+        if self.config.bundle is not None:
+            feed[self.word_vectors] = self.config.bundle.get_word_embeddings(word_ids)
+
         if self.config.use_chars:
             feed[self.char_ids] = char_ids
             feed[self.word_lengths] = word_lengths
@@ -91,17 +104,56 @@ class NERModel(BaseModel):
         return feed, sequence_lengths
 
 
+    def get_encoded_feed_dict(self, sentences_raw, dropout=None):
+        """Same feed dictionary as get_feed_dict() for raw sentences, built
+        with the numpy batch encoder
+
+        Args:
+            sentences_raw: list of sentences, a sentence is a non-empty list
+                of words (string)
+            dropout: (float) keep prob
+
+        Returns:
+            dict {placeholder: value}
+
+        """
+        word_ids, sequence_lengths, char_ids, word_lengths = \
+                self.batch_encoder.encode(sentences_raw)
+
+        # build feed dictionary
+        feed = {
+            self.word_ids: word_ids,
+            self.sequence_lengths: sequence_lengths
+        }
+
+        if self.config.bundle is not None:
+            feed[self.word_vectors] = self.config.bundle.get_word_embeddings(word_ids)
+
+        if self.config.use_chars:
+            feed[self.char_ids] = char_ids
+            feed[self.word_lengths] = word_lengths
+
+        if dropout is not None:
+            feed[self.dropout] = dropout
+
+        return feed, sequence_lengths
+
+
     def add_word_embeddings_op(self):
         """Defines self.word_embeddings
 
         If self.config.embeddings is not None and is a np array initialized
         with pre-trained word vectors, the word embeddings is just a look-up
         and we don't train the vectors. Otherwise, a random matrix with
-        the correct shape is initialized.
+        the correct shape is initialized. With a model bundle, the word
+        vectors are fed by get_feed_dict().
         """
         with tf.variable_scope("words"):
-            if self.config.embeddings is None:
-                self.logger.info("WARNING: randomly initializing word vectors")
+            if self.config.bundle is not None:
+                word_embeddings = self.word_vectors
+            elif self.config.embeddings is None:
+                if not self.config.inference:
+                    self.logger.info("WARNING: randomly initializing word vectors")
                 _word_embeddings = tf.get_variable(
                         name="_word_embeddings",
                         dtype=tf.float32,
@@ -113,8 +165,9 @@ class NERModel(BaseModel):
                         dtype=tf.float32,
                         trainable=self.config.train_embeddings)
 
-            word_embeddings = tf.nn.embedding_lookup(_word_embeddings,
-                    self.word_ids, name="word_embeddings")
+            if self.config.bundle is None:
+                word_embeddings = tf.nn.embedding_lookup(_word_embeddings,
+                        self.word_ids, name="word_embeddings")
 
         with tf.variable_scope("chars"):
             if self.config.use_chars:
@@ -227,6 +280,26 @@ class NERModel(BaseModel):
         self.initialize_session() # now self.sess is defined and vars are init
 
 
+    def build_inference(self):
+        """Builds only the graph needed to tag sentences
+
+        No loss, optimizer or summaries are created. The variables are not
+        initialized because restore_model() sets all of them.
+
+        """
+        self.add_placeholders()
+        self.add_word_embeddings_op()
+        self.add_logits_op()
+        self.add_pred_op()
+
+        if self.config.use_crf:
+            # same variable as created by crf_log_likelihood in add_loss_op
+            self.trans_params = tf.get_variable("transitions",
+                    shape=[self.config.ntags, self.config.ntags])
+
+        self.initialize_inference_session()
+
+
     def predict_batch(self, words):
         """
         Args:
@@ -239,18 +312,28 @@ class NERModel(BaseModel):
         """
         fd, sequence_lengths = self.get_feed_dict(words, dropout=1.0)
 
+        return self.predict_feed(fd, sequence_lengths)
+
+
+    def predict_feed(self, fd, sequence_lengths):
+        """
+        Args:
+            fd: feed dictionary of a batch
+            sequence_lengths: length of each sentence of the batch
+
+        Returns:
+            labels_pred: list of labels for each sentence
+            sequence_length
+
+        """
         if self.config.use_crf:
             # get tag scores and transition params of CRF
-            viterbi_sequences = []
             logits, trans_params = self.sess.run(
                     [self.logits, self.trans_params], feed_dict=fd)
 
-            # iterate over the sentences because no batching in vitervi_decode
-            for logit, sequence_length in zip(logits, sequence_lengths):
-                logit = logit[:sequence_length] # keep only the valid steps
-                viterbi_seq, viterbi_score = tf.contrib.crf.viterbi_decode(
-                        logit, trans_params)
-                viterbi_sequences += [viterbi_seq]
+            # decode the whole padded batch at once
+            viterbi_sequences, viterbi_scores = viterbi_decode_batch(
+                    logits, trans_params, sequence_lengths)
 
             return viterbi_sequences, sequence_lengths
 
@@ -260,6 +343,29 @@ class NERModel(BaseModel):
             return labels_pred, sequence_lengths
 
 
+    def predict_sentences(self, sentences_raw):
+        """Returns list of tags for a batch of sentences
+
+        Args:
+            sentences_raw: list of sentences, a sentence is a non-empty list
+                of words (string)
+
+        Returns:
+            preds: list of list of tags (string), one list for each sentence
+
+        """
+        fd, sequence_lengths = self.get_encoded_feed_dict(sentences_raw,
+                dropout=1.0)
+        pred_ids, sequence_lengths = self.predict_feed(fd, sequence_lengths)
+
+        # keep only the valid steps of each padded sentence
+        preds = []
+        for pred_id, sequence_length in zip(pred_ids, sequence_lengths):
+            preds.append([self.idx_to_tag[idx] for idx in list(pred_id[:sequence_length])])
+
+        return preds
+
+
     def run_epoch(self, train, dev, epoch):
         """Performs one complete pass over the train set and evaluate on dev
 
@@ -0,0 +1,288 @@
+import re
+import numpy as np
+
+
+from pylogabstract.parser.model.data_utils import CoNLLDataset, get_chunks, viterbi_decode_batch
+
+
+class PerceptronTagger(object):
+    """Averaged structured perceptron over hand-crafted token features
+
+    A linear-chain tagger implemented in numpy, with the same tags and the
+    same predict_sentences() and predict() as NERModel, so Parser can use
+    it without TensorFlow. A tag sequence is scored by the weights of its
+    token features plus tag transitions and decoded with Viterbi.
+
+    """
+    def __init__(self, config):
+        self.config = config
+        self.logger = config.logger
+        self.tags = []
+        self.tag_to_idx = {}
+        self.features = {}
+        self.weights = None
+        self.transitions = None
+
+        # token features, they do not depend on the neighbours of a token
+        self.__token_features = {}
+        self.__MAX_TOKEN_FEATURES = 100000
+        self.__MAX_POSITION = 10
+        self.__UPPER = re.compile('[A-Z]+')
+        self.__LOWER = re.compile('[a-z]+')
+        self.__DIGIT = re.compile('[0-9]+')
+
+
+    def __get_shape(self, word):
+        # Dec -> Xx, 06:55:30 -> 0:0:0, sshd[24208]: -> x[0]:
+        shape = self.__UPPER.sub('X', word)
+        shape = self.__LOWER.sub('x', shape)
+        return self.__DIGIT.sub('0', shape)
+
+
+    def __get_token(self, word):
+        token = self.__token_features.get(word)
+        if token is None:
+            lower = word.lower()
+            token = (lower, self.__get_shape(word), lower[:3], lower[-3:])
+            if len(self.__token_features) >= self.__MAX_TOKEN_FEATURES:
+                self.__token_features.clear()
+            self.__token_features[word] = token
+
+        return token
+
+
+    def get_features(self, words_raw):
+        """Returns the list of feature strings of each word
+
+        Log entities depend much on the position of a word, so positions
+        from the start and the end of the line are features too.
+
+        """
+        tokens = [self.__get_token(word) for word in words_raw]
+        length = len(tokens)
+        features = []
+        for i, (lower, shape, prefix, suffix) in enumerate(tokens):
+            position = min(i, self.__MAX_POSITION)
+            previous = tokens[i - 1] if i > 0 else ('<s>', '<s>')
+            following = tokens[i + 1] if i < length - 1 else ('</s>', '</s>')
+            features.append(['bias', 'w=' + lower, 's=' + shape,
+                             'p3=' + prefix, 'x3=' + suffix,
+                             'i=%d' % position, 'r=%d' % min(length - 1 - i, 3),
+                             'is=%d %s' % (position, shape),
+                             'w-1=' + previous[0], 's-1=' + previous[1],
+                             'w+1=' + following[0], 's+1=' + following[1],
+                             's-1s=%s %s' % (previous[1], shape)])
+
+        return features
+
+
+    def __get_feature_ids(self, words_raw):
+        # unknown features are skipped, bias is always known so no token is empty
+        feature_ids = []
+        for token_features in self.get_features(words_raw):
+            feature_ids.append([self.features[feature] for feature in token_features
+                                if feature in self.features])
+
+        return feature_ids
+
+
+    def __get_scores(self, sentences_ids, weights):
+        # output: padded scores (batch size, max sentence length, ntags) and sentence lengths
+        sequence_lengths = np.array([len(sentence_ids) for sentence_ids in sentences_ids])
+        ids, starts = [], []
+        for sentence_ids in sentences_ids:
+            for token_ids in sentence_ids:
+                starts.append(len(ids))
+                ids.extend(token_ids)
+
+        emissions = np.add.reduceat(weights[ids], starts, axis=0)
+        mask = np.arange(sequence_lengths.max()) < sequence_lengths[:, None]
+        scores = np.zeros(mask.shape + (len(self.tags),), dtype=weights.dtype)
+        scores[mask] = emissions
+
+        return scores, sequence_lengths
+
+
+    def predict_sentences(self, sentences_raw):
+        """Returns list of tags for a batch of sentences
+
+        Args:
+            sentences_raw: list of sentences, a sentence is a non-empty list
+                of words (string)
+
+        Returns:
+            preds: list of list of tags (string), one list for each sentence
+
+        """
+        sentences_ids = [self.__get_feature_ids(words_raw) for words_raw in sentences_raw]
+        scores, sequence_lengths = self.__get_scores(sentences_ids, self.weights)
+        pred_ids, _ = viterbi_decode_batch(scores, self.transitions, sequence_lengths)
+
+        return [[self.tags[idx] for idx in pred_id] for pred_id in pred_ids]
+
+
+    def predict(self, words_raw):
+        """Returns list of tags of one sentence"""
+        return self.predict_sentences([words_raw])[0]
+
+
+    def train(self, train, dev):
+        """Trains the weights with the averaged perceptron
+
+        The weights after an update at step c are summed lazily: the average
+        is weights - totals / c, with totals += c * update.
+
+        Args:
+            train: dataset that yields tuple of sentences, tags
+            dev: dataset
+
+        """
+        self.tags = [tag for tag, idx in sorted(self.config.vocab_tags.items(),
+                                                 key=lambda item: item[1])]
+        self.tag_to_idx = {tag: idx for idx, tag in enumerate(self.tags)}
+
+        # feature vocabulary of the training set
+        self.features = {}
+        data = []
+        for words, tags in train:
+            for token_features in self.get_features(words):
+                for feature in token_features:
+                    if feature not in self.features:
+                        self.features[feature] = len(self.features)
+            data.append((self.__get_feature_ids(words),
+                         np.array([self.tag_to_idx[tag] for tag in tags])))
+
+        ntags = len(self.tags)
+        weights = np.zeros((len(self.features), ntags))
+        weights_total = np.zeros_like(weights)
+        transitions = np.zeros((ntags, ntags))
+        transitions_total = np.zeros_like(transitions)
+        step = 1
+
+        random_state = np.random.RandomState(0)
+        for epoch in range(self.config.nepochs_perceptron):
+            errors = 0
+            for index in random_state.permutation(len(data)):
+                sentence_ids, gold = data[index]
+                scores, sequence_lengths = self.__get_scores([sentence_ids], weights)
+                pred = np.array(viterbi_decode_batch(scores, transitions, sequence_lengths)[0][0])
+
+                wrong = np.flatnonzero(gold != pred)
+                if len(wrong) > 0:
+                    errors += 1
+                    for t in wrong:
+                        update = np.zeros(ntags)
+                        update[gold[t]] += 1
+                        update[pred[t]] -= 1
+                        weights[sentence_ids[t]] += update
+                        weights_total[sentence_ids[t]] += step * update
+
+                    for t in range(1, len(gold)):
+                        if gold[t - 1] != pred[t - 1] or gold[t] != pred[t]:
+                            transitions[gold[t - 1], gold[t]] += 1
+                            transitions[pred[t - 1], pred[t]] -= 1
+                            transitions_total[gold[t - 1], gold[t]] += step
+                            transitions_total[pred[t - 1], pred[t]] -= step
+
+                step += 1
+
+            # evaluate the averaged weights
+            self.weights = (weights - weights_total / step).astype(np.float32)
+            self.transitions = (transitions - transitions_total / step).astype(np.float32)
+            metrics = self.run_evaluate(dev)
+            self.logger.info("Epoch {:} out of {:}, sentences with errors: {:}, ".format(
+                    epoch + 1, self.config.nepochs_perceptron, errors) +
+                    " - ".join(["{} {:04.2f}".format(k, v) for k, v in metrics.items()]))
+
+
+    def run_evaluate(self, test):
+        """Evaluates performance on test set
+
+        Args:
+            test: dataset that yields tuple of (sentences, tags)
+
+        Returns:
+            metrics: (dict) metrics["acc"] = 98.4, ...
+
+        """
+        return evaluate_tagger(self, test, self.tag_to_idx, self.config.batch_size_parse)
+
+
+    def save(self, filename):
+        """Saves tags, feature vocabulary and averaged weights"""
+        features = sorted(self.features, key=self.features.get)
+        np.savez(filename, tags=np.array(self.tags), features=np.array(features),
+                 weights=self.weights, transitions=self.transitions)
+
+
+    def restore(self, filename):
+        """Loads tags, feature vocabulary and weights saved by save()"""
+        self.logger.info("Loading the perceptron tagger...")
+        data = np.load(filename)
+        self.tags = data['tags'].tolist()
+        self.tag_to_idx = {tag: idx for idx, tag in enumerate(self.tags)}
+        self.features = {feature: idx for idx, feature in enumerate(data['features'].tolist())}
+        self.weights = data['weights']
+        self.transitions = data['transitions']
+
+
+def evaluate_tagger(tagger, test, tag_to_idx, batch_size):
+    """Token accuracy and chunk precision, recall and F1 of a tagger
+
+    Args:
+        tagger: object with predict_sentences(), such as NERModel
+        test: dataset that yields tuple of (sentences, tags) of raw words
+        tag_to_idx: dict[tag] = idx
+        batch_size: (int) number of sentences per prediction
+
+    Returns:
+        metrics: (dict) metrics["acc"] = 98.4, ...
+
+    """
+    accs = []
+    correct_preds, total_correct, total_preds = 0., 0., 0.
+    sentences = [(words, tags) for words, tags in test]
+    for start in range(0, len(sentences), batch_size):
+        batch = sentences[start:start + batch_size]
+        labels_pred = tagger.predict_sentences([words for words, tags in batch])
+
+        for (words, lab), lab_pred in zip(batch, labels_pred):
+            lab = [tag_to_idx[tag] for tag in lab]
+            lab_pred = [tag_to_idx[tag] for tag in lab_pred]
+            accs += [a == b for (a, b) in zip(lab, lab_pred)]
+
+            lab_chunks = set(get_chunks(lab, tag_to_idx))
+            lab_pred_chunks = set(get_chunks(lab_pred, tag_to_idx))
+
+            correct_preds += len(lab_chunks & lab_pred_chunks)
+            total_preds += len(lab_pred_chunks)
+            total_correct += len(lab_chunks)
+
+    p = correct_preds / total_preds if correct_preds > 0 else 0
+    r = correct_preds / total_correct if correct_preds > 0 else 0
+    f1 = 2 * p * r / (p + r) if correct_preds > 0 else 0
+    acc = np.mean(accs)
+
+    return {"acc": 100 * acc, "f1": 100 * f1, "p": 100 * p, "r": 100 * r}
+
+
+def main():
+    # train on the same CoNLL files as NERModel, then evaluate on the test set
+    from pylogabstract.parser.model.config import Config
+
+    config = Config(inference=True, use_bundle=False)
+    train = CoNLLDataset(config.filename_train, max_iter=config.max_iter)
+    dev = CoNLLDataset(config.filename_dev, max_iter=config.max_iter)
+    test = CoNLLDataset(config.filename_test, max_iter=config.max_iter)
+
+    tagger = PerceptronTagger(config)
+    tagger.train(train, dev)
+    metrics = tagger.run_evaluate(test)
+    config.logger.info("Test: " + " - ".join(["{} {:04.2f}".format(k, v) for k, v in metrics.items()]))
+
+    tagger.save(config.filename_perceptron)
+    config.logger.info("Perceptron tagger is saved to " + config.filename_perceptron)
+
+
+if __name__ == "__main__":
+    main()
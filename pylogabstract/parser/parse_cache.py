@@ -0,0 +1,141 @@
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+from collections import OrderedDict
+
+
+class ParseCache(object):
+    """Content-addressed on-disk cache of parsed log files.
+
+    An entry is keyed by the hash of the log file content and a fingerprint of the model and
+    parse settings, so a log file is parsed again only when it or the model changes.
+    Entities are stored column by column: one UTF-8 blob with offsets per field label and one
+    field layout id per line. The cache directory is kept under max_size bytes by removing the
+    least recently used entries, recency is the modification time of the entry file.
+    """
+    def __init__(self, cache_dir, max_size):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.__VERSION = 1
+        self.__CHUNK_SIZE = 1048576
+
+    def get_file_hash(self, log_file):
+        # output: sha1 of the file content
+        file_hash = hashlib.sha1()
+        with open(log_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.__CHUNK_SIZE), b''):
+                file_hash.update(chunk)
+
+        return file_hash.hexdigest()
+
+    def get_key(self, file_hash, fingerprint):
+        key = hashlib.sha1(json.dumps([self.__VERSION, file_hash, fingerprint]).encode('utf-8'))
+        return key.hexdigest()
+
+    def __get_path(self, key):
+        return os.path.join(self.cache_dir, key + '.npz')
+
+    def get(self, key):
+        # output: parsed logs {line_id: {label: value}} in line order, or None for a miss
+        path = self.__get_path(key)
+        try:
+            with np.load(path) as data:
+                parsed_logs = self.__read_columns(data)
+
+            # a hit makes the entry the most recently used one
+            os.utime(path, None)
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+
+        return parsed_logs
+
+    @staticmethod
+    def __read_columns(data):
+        fields = data['fields'].tolist()
+        layouts = json.loads(str(data['layouts']))
+        line_layouts = data['line_layouts'].tolist()
+
+        # values of each field in line order
+        field_values = []
+        for index in range(len(fields)):
+            blob = data['values_%d' % index].tobytes()
+            offsets = data['offsets_%d' % index].tolist()
+            field_values.append(iter([blob[offsets[position]:offsets[position + 1]].decode('utf-8')
+                                      for position in range(len(offsets) - 1)]))
+
+        parsed_logs = OrderedDict()
+        for line_id, layout_id in enumerate(line_layouts):
+            parsed_logs[line_id] = OrderedDict((fields[index], next(field_values[index]))
+                                               for index in layouts[layout_id])
+
+        return parsed_logs
+
+    def put(self, key, parsed_logs):
+        # parsed_logs: {line_id: {label: value}} with line ids 0, 1, 2, ...
+        fields = OrderedDict()
+        layouts = OrderedDict()
+        line_layouts = []
+        field_values = []
+        for parsed in parsed_logs.values():
+            layout = []
+            for label, value in parsed.items():
+                if label not in fields:
+                    fields[label] = len(fields)
+                    field_values.append([])
+                layout.append(fields[label])
+                field_values[fields[label]].append(value.encode('utf-8'))
+
+            layout = tuple(layout)
+            if layout not in layouts:
+                layouts[layout] = len(layouts)
+            line_layouts.append(layouts[layout])
+
+        arrays = {'fields': np.array(list(fields.keys()), dtype=str),
+                  'layouts': np.array(json.dumps([list(layout) for layout in layouts.keys()])),
+                  'line_layouts': np.array(line_layouts, dtype=np.int32)}
+        for index, values in enumerate(field_values):
+            offsets = np.zeros(len(values) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(value) for value in values])
+            arrays['values_%d' % index] = np.frombuffer(b''.join(values), dtype=np.uint8)
+            arrays['offsets_%d' % index] = offsets
+
+        # write to a temporary file first, so other processes never read a partial entry
+        # the cache must not break parsing, an entry that cannot be written is skipped
+        temp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            handle, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(handle, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(temp_path, self.__get_path(key))
+        except OSError:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        self.__evict()
+
+    def __evict(self):
+        # remove the least recently used entries until the cache fits in max_size
+        entries = []
+        total_size = 0
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.npz'):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, name, stat.st_size))
+                total_size += stat.st_size
+
+        for mtime, name, size in sorted(entries):
+            if total_size <= self.max_size:
+                break
+
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total_size -= size
@@ -1,25 +1,78 @@
 from collections import OrderedDict
-from pylogabstract.parser.model.ner_model import NERModel
 from pylogabstract.parser.model.config import Config
+from pylogabstract.parser.model.data_utils import load_vocab
+from pylogabstract.parser.inference_client import InferenceClient
+from pylogabstract.parser.raw_log_store import RawLogStore, iter_log_lines
+from pylogabstract.parser.prediction_cache import PredictionCache
+from pylogabstract.parser.header_grammar import HeaderGrammar
+from pylogabstract.parser.shard_parser import ShardParser
+from pylogabstract.parser.parse_cache import ParseCache
 
 
 class Parser(object):
-    def __init__(self):
+    def __init__(self, inference_socket=None, backend=None, parse_cache=None):
         self.model = None
-        self.config = None
+        self.config = Config(load=False, inference=True)
         self.master_label = {}
-
-        self.__load_pretrained_model()
+        self.prediction_cache = None
+        self.inference_socket = inference_socket
+        self.backend = backend if backend is not None else Config.backend
         self.__load_label()
 
+        # label sequences of already predicted token shapes
+        self.prediction_cache = PredictionCache(self.config.cache_size_parse)
+
+        # syslog header grammars for the hybrid mode
+        self.header_grammar = HeaderGrammar(load_vocab(self.config.filename_tags))
+
+        # parsed log files on disk, the model is only loaded when a file is not in the cache
+        # parse_cache: True or False to override Config.use_parse_cache
+        if parse_cache is not None:
+            self.config.use_parse_cache = parse_cache
+        self.parse_cache = ParseCache(self.config.dir_parse_cache, self.config.max_size_parse_cache)
+
+    def load_model(self):
+        # use the inference server only if its socket is given, otherwise load the model in this process
+        if self.model is not None:
+            return
+
+        if self.inference_socket is not None:
+            self.model = InferenceClient(self.inference_socket)
+        elif self.backend == 'perceptron':
+            self.__load_perceptron_tagger()
+        else:
+            self.__load_pretrained_model()
+
+    def __load_perceptron_tagger(self):
+        # numpy tagger, no tensorflow and no word vocabulary
+        from pylogabstract.parser.model.perceptron_tagger import PerceptronTagger
+
+        self.model = PerceptronTagger(self.config)
+        self.model.restore(self.config.filename_perceptron)
+
     def __load_pretrained_model(self):
-        # create instance of config
-        self.config = Config()
+        # tensorflow is imported only when the model is loaded in this process
+        from pylogabstract.parser.model.ner_model import NERModel
+
+        # the model has its own config with vocabulary, self.config only holds parsing settings
+        model_config = Config(inference=True)
+
+        # load pretrained model, only the graph needed for tagging
+        self.model = NERModel(model_config)
+        self.model.build_inference()
+        self.model.restore_model()
+
+    def __get_model_fingerprint(self):
+        # model files and settings that change parse results
+        # labels of an inference server come from its model, so the server reports the fingerprint of its files
+        if self.inference_socket is not None:
+            self.load_model()
+            model_fingerprint = ['server', self.model.get_model_fingerprint()]
+        else:
+            model_fingerprint = self.config.get_model_fingerprint(self.backend)
 
-        # load pretrained model
-        self.model = NERModel(self.config)
-        self.model.build()
-        self.model.restore_session(self.config.dir_model)
+        # the prediction cache reuses labels of lines with the same token shape, so its size changes labels too
+        return [self.config.use_header_grammar, self.config.cache_size_parse] + model_fingerprint
 
     def __load_label(self):
         # load NER label and its corresponding human-readable field label
@@ -59,21 +112,198 @@ class Parser(object):
 
         return final_entity
 
-    def parse_logs(self, log_file):
-        # parse log files using pretrained model
+    def __get_ner_labels(self, words_raw):
+        # hybrid mode: syslog headers are labeled by header grammars, only the rest of each line goes to the model
+        if not self.config.use_header_grammar:
+            return self.__predict_ner_labels(words_raw)
+
+        header_labels = {}
+        words_rest = OrderedDict()
+        for line_id, words in words_raw.items():
+            header_labels[line_id] = self.header_grammar.get_labels(words)
+            words_rest[line_id] = words[len(header_labels[line_id]):]
+
+        ner_labels = self.__predict_ner_labels(words_rest)
+        for line_id, header_label in header_labels.items():
+            ner_labels[line_id] = header_label + ner_labels[line_id]
+
+        return ner_labels
+
+    def __predict_ner_labels(self, words_raw):
+        # lines with a cached token shape reuse the cached labels, other lines are grouped by token shape
+        # if the cache is disabled, every line is predicted
+        use_cache = self.prediction_cache.max_size > 0
+        ner_labels = {}
+        signature_line_ids = OrderedDict()
+        for line_id, words in words_raw.items():
+            # lines without any word have no label
+            if not words:
+                ner_labels[line_id] = []
+                continue
+
+            if use_cache:
+                signature = self.prediction_cache.get_signature(words)
+                ner_label = self.prediction_cache.get(signature)
+                if ner_label is not None:
+                    ner_labels[line_id] = ner_label
+                    continue
+            else:
+                signature = line_id
+
+            if signature not in signature_line_ids:
+                signature_line_ids[signature] = []
+            signature_line_ids[signature].append(line_id)
+
+        # predict the first line of each token shape
+        if signature_line_ids:
+            self.load_model()
+
+        # sort by number of words so each minibatch needs little padding
+        signatures = sorted(signature_line_ids.keys(),
+                            key=lambda signature: len(words_raw[signature_line_ids[signature][0]]))
+
+        # predict labels per minibatch and map them back to their line ids
+        batch_size = self.config.batch_size_parse
+        for start in range(0, len(signatures), batch_size):
+            batch_signatures = signatures[start:start + batch_size]
+            batch_labels = self.model.predict_sentences([words_raw[signature_line_ids[signature][0]]
+                                                         for signature in batch_signatures])
+            for signature, ner_label in zip(batch_signatures, batch_labels):
+                if use_cache:
+                    self.prediction_cache.put(signature, ner_label)
+                for line_id in signature_line_ids[signature]:
+                    ner_labels[line_id] = ner_label
+
+        return ner_labels
+
+    def __get_parsed_batch(self, words_raw):
+        # parse a buffer of log lines, in line order
+        ner_labels = self.__get_ner_labels(words_raw)
+        parsed_batch = []
+        for line_id, words in words_raw.items():
+            parsed_batch.append((line_id, self.__get_per_entity(words, ner_labels[line_id])))
+
+        return parsed_batch
+
+    def iter_parse(self, log_file, raw_log_store=None):
+        # yield batches of (line_id, parsed_entities) in line order, only one buffer is held in memory
+        # if raw_log_store is given, byte offset and length of each log line are added to it
+        words_raw = OrderedDict()
+        parsed_log_index = 0
+        with open(log_file, 'rb') as f:
+            for offset, line in iter_log_lines(f):
+                words_raw[parsed_log_index] = line.decode('utf-8').strip().split()
+                if raw_log_store is not None:
+                    raw_log_store.add(offset, len(line))
+                parsed_log_index += 1
+
+                if len(words_raw) == self.config.buffer_size_parse:
+                    yield self.__get_parsed_batch(words_raw)
+                    words_raw = OrderedDict()
+
+        if words_raw:
+            yield self.__get_parsed_batch(words_raw)
+
+    def __get_parse_config(self):
+        # parsing settings passed to worker processes
+        names = ['batch_size_parse', 'buffer_size_parse', 'cache_size_parse', 'use_header_grammar']
+        parse_config = {name: getattr(self.config, name) for name in names}
+        parse_config['backend'] = self.backend
+
+        return parse_config
+
+    def parse_logs(self, log_file, batch=True, raw_log_store=False, workers=None):
+        # parse log files using pretrained model, a file that was parsed before is read from the parse cache
+        # the per-line mode always runs the model
+        if not batch or not self.config.use_parse_cache:
+            return self.__parse_logs(log_file, batch, raw_log_store, workers)
+
+        # text and binary reading split lines the same way, so both share an entry
+        file_hash = self.parse_cache.get_file_hash(log_file)
+        key = self.parse_cache.get_key(file_hash, self.__get_model_fingerprint())
+
+        parsed_logs = self.parse_cache.get(key)
+        if parsed_logs is not None:
+            raw_logs = self.__get_raw_logs(log_file, raw_log_store)
+            if len(raw_logs) == len(parsed_logs):
+                return parsed_logs, raw_logs
+
+        parsed_logs, raw_logs = self.__parse_logs(log_file, batch, raw_log_store, workers)
+        self.parse_cache.put(key, parsed_logs)
+
+        return parsed_logs, raw_logs
+
+    @staticmethod
+    def __get_raw_logs(log_file, raw_log_store):
+        # same raw logs as parsing the file, without running the model
+        if raw_log_store:
+            raw_logs = RawLogStore(log_file)
+            with open(log_file, 'rb') as f:
+                for offset, line in iter_log_lines(f):
+                    raw_logs.add(offset, len(line))
+
+            return raw_logs
+
+        raw_logs = {}
+        with open(log_file) as f:
+            for line in f:
+                if line not in ['', '\n', '\r\n']:
+                    raw_logs[len(raw_logs)] = line
+
+        return raw_logs
+
+    def __parse_logs(self, log_file, batch, raw_log_store, workers):
         raw_logs = {}
         parsed_logs = OrderedDict()
         parsed_log_index = 0
+
+        # parallel mode, byte-range shards of the log file are parsed by worker processes
+        if workers is not None and workers > 1:
+            shard_parser = ShardParser(log_file, workers, self.__get_parse_config(), self.config.shard_size_parse)
+            return shard_parser.parse_logs(raw_log_store)
+
+        # raw logs are read back from the file when needed instead of kept in memory
+        if raw_log_store:
+            raw_logs = RawLogStore(log_file)
+            for parsed_batch in self.iter_parse(log_file, raw_logs):
+                parsed_logs.update(parsed_batch)
+
+            return parsed_logs, raw_logs
+
+        # per-line mode, one prediction for each log line
+        if not batch:
+            self.load_model()
+            with open(log_file) as f:
+                for line_index, line in enumerate(f):
+                    if line not in ['\n', '\r\n']:
+                        raw_logs[parsed_log_index] = line
+                        words_raw = line.strip().split()
+
+                        ner_label = self.model.predict(words_raw)
+                        parsed = self.__get_per_entity(words_raw, ner_label)
+                        parsed_logs[parsed_log_index] = parsed
+                        parsed_log_index += 1
+
+            return parsed_logs, raw_logs
+
+        # batch mode, predict log lines in minibatches
         with open(log_file) as f:
-            for line_index, line in enumerate(f):
-                if line not in ['\n', '\r\n']:
-                    raw_logs[parsed_log_index] = line
-                    words_raw = line.strip().split()
-
-                    ner_label = self.model.predict(words_raw)
-                    parsed = self.__get_per_entity(words_raw, ner_label)
-                    parsed_logs[parsed_log_index] = parsed
-                    parsed_log_index += 1
+            parsed_logs, raw_logs = self.parse_lines(f)
+
+        return parsed_logs, raw_logs
+
+    def parse_lines(self, lines, line_id=0):
+        # parse log lines in memory, such as new lines of a tailed log file
+        # line ids start from line_id to continue the ids of previously parsed lines
+        raw_logs = {}
+        words_raw = OrderedDict()
+        for line in lines:
+            if line not in ['', '\n', '\r\n']:
+                raw_logs[line_id] = line
+                words_raw[line_id] = line.strip().split()
+                line_id += 1
+
+        parsed_logs = OrderedDict(self.__get_parsed_batch(words_raw))
 
         return parsed_logs, raw_logs
 
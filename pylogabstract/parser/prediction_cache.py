@@ -0,0 +1,62 @@
+import re
+from collections import OrderedDict
+
+
+class PredictionCache(object):
+    """Bounded LRU cache of NER label sequences keyed on the token shape of a log line.
+
+    Lines that differ only in IP addresses, hexadecimal strings, and numbers have the same signature,
+    so they reuse one predicted label sequence. This trades accuracy for speed: the model may label
+    a masked token differently in another line of the same shape. A cache with max_size 0 is disabled.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        # masks are applied in this order, the masks contain no digit or space
+        self.__MASKS = [
+            (re.compile(r'\d{1,3}(?:\.\d{1,3}){3}'), '<ip>'),
+            (re.compile(r'0[xX][0-9a-fA-F]+|\b(?=[a-fA-F]*\d)(?=\d*[a-fA-F])[0-9a-fA-F]{8,}\b'), '<hex>'),
+            (re.compile(r'\d+'), '0')
+        ]
+
+    def get_signature(self, words):
+        # words never contain a space, so the whole line is masked at once and the number of tokens is kept
+        line = ' '.join(words)
+        for pattern, mask in self.__MASKS:
+            line = pattern.sub(mask, line)
+
+        return tuple(line.split(' '))
+
+    def get(self, signature):
+        # output: label sequence or None
+        ner_label = self.cache.get(signature)
+        if ner_label is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.cache.move_to_end(signature)
+
+        return ner_label
+
+    def put(self, signature, ner_label):
+        if self.max_size <= 0:
+            return
+
+        self.cache[signature] = ner_label
+        self.cache.move_to_end(signature)
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+
+    def __len__(self):
+        return len(self.cache)
+
+    def get_hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.
+
+    def reset_counts(self):
+        self.hits = 0
+        self.misses = 0
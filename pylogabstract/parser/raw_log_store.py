@@ -0,0 +1,78 @@
+import mmap
+from array import array
+
+
+def iter_log_lines(f, offset=0):
+    # f: file opened in binary mode, offset: byte offset of its first line in the log file
+    # output: (byte offset, line) of every log line, empty lines are skipped
+    # lines end at b'\n', b'\r\n' or a lone b'\r' like a file opened in text mode,
+    # so line ids are the same as in the text mode paths and groundtruth files
+    for chunk in f:
+        for line in chunk.splitlines(True):
+            if line not in [b'\n', b'\r\n', b'\r']:
+                yield offset, line
+            offset += len(line)
+
+
+class RawLogStore(object):
+    """Raw log lines indexed by line id, read back from the log file through mmap.
+
+    Only the byte offset and length of each line are kept in memory, 12 bytes per line.
+    The store can be used in place of the raw_logs dictionary {line_id: raw_line}.
+    """
+    def __init__(self, log_file):
+        self.log_file = log_file
+        self.offsets = array('Q')
+        self.lengths = array('I')
+        self.__file = None
+        self.__mmap = None
+
+    def add(self, offset, length):
+        # the next line id is the current number of lines
+        self.offsets.append(offset)
+        self.lengths.append(length)
+
+    def __get_mmap(self):
+        if self.__mmap is None:
+            self.__file = open(self.log_file, 'rb')
+            self.__mmap = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self.__mmap
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, line_id):
+        return isinstance(line_id, int) and 0 <= line_id < len(self.offsets)
+
+    def __getitem__(self, line_id):
+        if line_id not in self:
+            raise KeyError(line_id)
+
+        offset = self.offsets[line_id]
+        line = self.__get_mmap()[offset:offset + self.lengths[line_id]]
+
+        # same line end as text mode
+        return line.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+    def __iter__(self):
+        return iter(range(len(self.offsets)))
+
+    def keys(self):
+        return range(len(self.offsets))
+
+    def values(self):
+        for line_id in self.keys():
+            yield self[line_id]
+
+    def items(self):
+        # lines are read in file order
+        for line_id in self.keys():
+            yield line_id, self[line_id]
+
+    def close(self):
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__file.close()
+            self.__mmap = None
+            self.__file = None
@@ -0,0 +1,104 @@
+import io
+import os
+import multiprocessing
+from collections import OrderedDict
+from pylogabstract.parser.raw_log_store import RawLogStore, iter_log_lines
+
+# parser of a worker process, loaded once by init_worker()
+worker_parser = None
+
+
+def init_worker(parse_config):
+    # load the pretrained model once per worker process
+    global worker_parser
+    from pylogabstract.parser.parser import Parser
+    from pylogabstract.parser.prediction_cache import PredictionCache
+
+    worker_parser = Parser(backend=parse_config['backend'])
+    for name, value in parse_config.items():
+        setattr(worker_parser.config, name, value)
+    worker_parser.prediction_cache = PredictionCache(worker_parser.config.cache_size_parse)
+    worker_parser.load_model()
+
+
+def parse_shard(shard):
+    # shard: (log_file, start byte, end byte, raw_log_store), start and end are at the beginning of a line
+    # output: parsed logs and raw lines in line order, or byte offsets and lengths for a raw log store
+    log_file, start, end, raw_log_store = shard
+    with open(log_file, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    # same lines as iter_parse, read in binary with the line ends of text mode
+    if raw_log_store:
+        lines = []
+        line_offsets = []
+        for offset, line in iter_log_lines(io.BytesIO(data), start):
+            lines.append(line.decode('utf-8'))
+            line_offsets.append((offset, len(line)))
+
+        parsed_logs, raw_logs = worker_parser.parse_lines(lines)
+        return list(parsed_logs.values()), line_offsets
+
+    # same lines as a log file opened in text mode, with universal newlines
+    lines = io.StringIO(data.decode('utf-8'), newline=None)
+    parsed_logs, raw_logs = worker_parser.parse_lines(lines)
+
+    return list(parsed_logs.values()), list(raw_logs.values())
+
+
+class ShardParser(object):
+    """Parse a log file in byte-range shards with one Parser per worker process.
+
+    Shards start and end on newline boundaries. Workers are started with the spawn method
+    because a TensorFlow session does not survive fork. Each worker restores the model once
+    and parses many shards, then results are merged back in line order.
+    """
+    def __init__(self, log_file, workers, parse_config, shard_size):
+        self.log_file = log_file
+        self.workers = workers
+        self.parse_config = parse_config
+        self.shard_size = shard_size
+
+    def get_shards(self):
+        # output: [(start byte, end byte), ...], every worker gets at least one shard if the file is big enough
+        file_size = os.path.getsize(self.log_file)
+        shard_size = max(1, min(self.shard_size, (file_size + self.workers - 1) // self.workers))
+
+        shards = []
+        start = 0
+        with open(self.log_file, 'rb') as f:
+            while start < file_size:
+                # move the end of a shard to the beginning of the next line
+                end = start + shard_size
+                if end < file_size:
+                    f.seek(end - 1)
+                    f.readline()
+                    end = f.tell()
+                else:
+                    end = file_size
+
+                shards.append((start, end))
+                start = end
+
+        return shards
+
+    def parse_logs(self, raw_log_store=False):
+        # output: (parsed_logs, raw_logs) in the same shape as Parser.parse_logs()
+        parsed_logs = OrderedDict()
+        raw_logs = RawLogStore(self.log_file) if raw_log_store else {}
+        shards = [(self.log_file, start, end, raw_log_store) for start, end in self.get_shards()]
+
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(processes=self.workers, initializer=init_worker, initargs=(self.parse_config,)) as pool:
+            line_id = 0
+            for shard_parsed_logs, shard_raw_logs in pool.imap(parse_shard, shards):
+                for parsed, raw in zip(shard_parsed_logs, shard_raw_logs):
+                    parsed_logs[line_id] = parsed
+                    if raw_log_store:
+                        raw_logs.add(raw[0], raw[1])
+                    else:
+                        raw_logs[line_id] = raw
+                    line_id += 1
+
+        return parsed_logs, raw_logs
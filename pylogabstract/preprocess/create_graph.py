@@ -1,22 +1,29 @@
 import networkx as nx
-from pylogabstract.preprocess.hamming_similarity import ParallelHammingSimilarity
+from pylogabstract.preprocess.hamming_similarity import VectorizedHammingSimilarity
 
 
 class CreateGraph(object):
-    def __init__(self, unique_events, event_attributes, event_indices):
+    def __init__(self, unique_events, event_attributes, event_indices, executor=None):
         self.unique_events = unique_events
         self.event_attributes = event_attributes
         self.event_indices = event_indices
+        self.executor = executor
         self.similarity = []
         self.graph = nx.Graph()
+        self.hamming_similarity = VectorizedHammingSimilarity(self.event_attributes, self.event_indices,
+                                                              self.executor)
 
-    def __get_similarity(self):
-        hamming_similarity = ParallelHammingSimilarity(self.event_attributes, self.event_indices)
-        self.similarity = hamming_similarity.get_parallel_hamming_similarity()
+    def __get_similarity(self, threshold=None):
+        self.similarity = self.hamming_similarity.get_vectorized_hamming_similarity(threshold)
 
-    def create_graph(self):
+    def get_edge_count(self):
+        # number of edges of the graph, without creating it
+        return self.hamming_similarity.get_edge_count()
+
+    def create_graph(self, threshold=None):
         # create graph with previously created nodes and edges
-        self.__get_similarity()
+        # with threshold, edges with weight < threshold are never created
+        self.__get_similarity(threshold)
         self.graph.add_nodes_from(self.unique_events)
         self.graph.add_weighted_edges_from(self.similarity)
 
@@ -1,5 +1,9 @@
 from itertools import combinations
 import multiprocessing
+import os
+import shutil
+import tempfile
+import numpy as np
 
 
 class HammingSimilarity(object):
@@ -41,6 +45,21 @@ class HammingSimilarity(object):
 
         return weighted_hamming
 
+    @staticmethod
+    def get_weighted_hamming_ids(tokens1, tokens2):
+        # same as get_weighted_hamming for two arrays of token ids
+        length = len(tokens1)
+        common = min(length, len(tokens2))
+        same_token = np.flatnonzero(tokens1[:common] == tokens2[:common])
+        weighted_hamming = int((length - same_token).sum())
+
+        try:
+            weighted_hamming = round(weighted_hamming / (length * (length + 1) // 2), 3)
+        except ZeroDivisionError:
+            weighted_hamming = 0
+
+        return weighted_hamming
+
 
 class ParallelHammingSimilarity(object):
     def __init__(self, event_attributes, event_indices):
@@ -91,3 +110,469 @@ class ParallelHammingSimilarity(object):
         self.edges_weight = similarity
 
         return similarity
+
+
+class VectorizedHammingSimilarity(object):
+    def __init__(self, event_attributes, event_indices, executor=None):
+        self.event_attributes = event_attributes
+        self.event_indices = event_indices
+        self.executor = executor
+        self.edges_weight = []
+        self.similarity_table = {}
+        self.token_matrix = None
+        self.weights = None
+        self.token_length = None
+        self.message_length = None
+        self.posting_rows = []
+        self.posting_rank = None
+        self.posting_end = None
+        self.row_pairs = None
+        self.threshold = None
+        self.count_only = False
+        self.min_score = None
+        self.prefix_length = None
+        self.suffix_score = None
+        self.prefix_pairs = None
+        self.shared_dir = None
+
+        # maximum number of token comparisons or candidate pairs held in memory for one block of rows
+        self.__MAX_BLOCK_ELEMENTS = 2 ** 24
+
+        # a block uses the inverted index if its candidate pairs cost less than the dense comparison
+        self.__SPARSE_PAIR_COST = 4
+
+        # arrays read by worker processes, they are memory-mapped from a temporary directory instead of pickled
+        self.__SHARED_ARRAYS = ['token_matrix', 'weights', 'token_length', 'message_length', 'posting_rank',
+                                'posting_end', 'row_pairs', 'min_score', 'prefix_length', 'suffix_score',
+                                'prefix_pairs']
+
+        # memory-backed file system for the shared arrays if there is one
+        self.__SHARED_ROOT = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+    def __set_token_matrix(self):
+        # rows of token ids of the event table, padding is -1
+        tokens = [self.event_attributes[event_id]['tokens'] for event_id in self.event_indices]
+        token_length = np.array([len(message) for message in tokens], dtype=np.int64)
+        message_length = np.array([self.event_attributes[event_id]['message_length']
+                                   for event_id in self.event_indices], dtype=np.int64)
+        width = int(token_length.max()) if len(tokens) > 0 else 0
+
+        token_matrix = np.full((len(tokens), width), -1, dtype=np.int32)
+        if len(tokens) > 0:
+            token_matrix[np.arange(width)[None, :] < token_length[:, None]] = np.concatenate(tokens)
+
+        # reversed index as weight, the first token has the largest weight
+        weights = token_length[:, None] - np.arange(width, dtype=np.int64)[None, :]
+        weights[weights < 0] = 0
+
+        self.token_matrix = token_matrix
+        self.weights = weights
+        self.token_length = token_length
+        self.message_length = message_length
+        self.__set_inverted_index()
+
+    def __set_inverted_index(self):
+        # posting lists of (message length, position, token): rows sorted by key at each position,
+        # rows of one posting list stay in ascending order, so the rows after a row are its candidates
+        total_rows, width = self.token_matrix.shape
+        _, length_group = np.unique(self.message_length, return_inverse=True)
+        total_tokens = int(self.token_matrix.max()) + 1 if self.token_matrix.size > 0 else 0
+
+        self.posting_rows = []
+        self.posting_rank = np.full((total_rows, width), -1, dtype=np.int64)
+        self.posting_end = np.zeros((total_rows, width), dtype=np.int64)
+        self.row_pairs = np.zeros(total_rows, dtype=np.int64)
+        for position in range(width):
+            rows = np.flatnonzero(self.token_matrix[:, position] >= 0)
+            keys = length_group[rows].astype(np.int64) * total_tokens + self.token_matrix[rows, position]
+            order = np.argsort(keys, kind='mergesort')
+            rows, keys = rows[order], keys[order]
+
+            # end of the posting list of each sorted row
+            new_posting = np.ones(len(keys), dtype=bool)
+            new_posting[1:] = keys[1:] != keys[:-1]
+            posting_start = np.flatnonzero(new_posting)
+            posting_end = np.append(posting_start[1:], len(keys))
+            ends = np.repeat(posting_end, posting_end - posting_start)
+
+            self.posting_rows.append(rows)
+            self.posting_rank[rows, position] = np.arange(len(rows))
+            self.posting_end[rows, position] = ends
+            self.row_pairs[rows] += ends - np.arange(len(rows)) - 1
+
+    def __get_similarity_table(self, token_length):
+        # similarity for every possible integer score of a message with token_length tokens,
+        # computed with the same float operations as HammingSimilarity.get_weighted_hamming
+        if token_length not in self.similarity_table.keys():
+            total = token_length * (token_length + 1) // 2
+            table = []
+            for score in range(total + 1):
+                try:
+                    similarity = round(score / total, 3)
+                except ZeroDivisionError:
+                    similarity = 0
+                table.append(round(similarity, 3))
+
+            self.similarity_table[token_length] = np.array(table, dtype=np.float64)
+
+        return self.similarity_table[token_length]
+
+    def get_similarity_matrix(self, start, end):
+        # weighted hamming similarity of rows [start, end) against rows [start, total_rows)
+        rows = self.token_matrix[start:end]
+        columns = self.token_matrix[start:]
+        same_token = (rows[:, None, :] == columns[None, :, :]) & (rows[:, None, :] >= 0)
+        score = (same_token * self.weights[start:end, None, :]).sum(axis=2)
+
+        # convert integer score to similarity per token length
+        similarity = np.zeros(score.shape, dtype=np.float64)
+        for length in np.unique(self.token_length[start:end]):
+            selected = self.token_length[start:end] == length
+            similarity[selected] = self.__get_similarity_table(int(length))[score[selected]]
+
+        # only the upper triangle and messages with the same length
+        upper = np.arange(start, end)[:, None] < np.arange(start, len(self.token_matrix))[None, :]
+        same_length = self.message_length[start:end, None] == self.message_length[None, start:]
+        similarity[~(upper & same_length)] = 0.
+
+        return similarity
+
+    def __get_similarity_edges(self, rows, scores):
+        # convert integer scores of row pairs to similarity per token length, keep positive edges
+        similarity = np.zeros(len(scores), dtype=np.float64)
+        token_length = self.token_length[rows]
+        for length in np.unique(token_length):
+            selected = token_length == length
+            similarity[selected] = self.__get_similarity_table(int(length))[scores[selected]]
+
+        return similarity > 0., similarity
+
+    def __get_sparse_edges(self, start, end):
+        # edges for rows [start, end) from the inverted index, only pairs that share a token at a position
+        total_rows, width = self.token_matrix.shape
+        block_rows = np.arange(start, end)
+        pair_keys, pair_weights = [], []
+        for position in range(width):
+            ranks = self.posting_rank[start:end, position]
+            valid = ranks >= 0
+            ranks = ranks[valid]
+            counts = self.posting_end[start:end, position][valid] - ranks - 1
+            total = int(counts.sum())
+            if total == 0:
+                continue
+
+            # candidates of each row are the next rows of its posting list
+            first = ranks + 1 - (np.cumsum(counts) - counts)
+            columns = self.posting_rows[position][np.repeat(first, counts) + np.arange(total)]
+            rows = np.repeat(block_rows[valid], counts)
+            pair_keys.append((rows - start) * total_rows + columns)
+            pair_weights.append(self.token_length[rows] - position)
+
+        if not pair_keys:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty, np.array([], dtype=np.float64)
+
+        # sum the weights of each pair, keys are sorted so edges come in combinations() order
+        keys, inverse = np.unique(np.concatenate(pair_keys), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(pair_weights)).astype(np.int64)
+        rows = keys // total_rows + start
+        columns = keys % total_rows
+        selected, similarity = self.__get_similarity_edges(rows, scores)
+
+        return rows[selected], columns[selected], similarity[selected]
+
+    def __get_dense_edges(self, start, end):
+        # edges for rows [start, end) by comparing all pairs, one memory-bounded block at a time
+        total_rows, width = self.token_matrix.shape
+        block_rows = max(1, self.__MAX_BLOCK_ELEMENTS // max(1, total_rows * width))
+
+        edge_rows, edge_columns, edge_weights = [], [], []
+        for block_start in range(start, end, block_rows):
+            block_end = min(block_start + block_rows, end)
+            similarity = self.get_similarity_matrix(block_start, block_end)
+            rows, columns = np.nonzero(similarity > 0.)
+            edge_rows.append(rows + block_start)
+            edge_columns.append(columns + block_start)
+            edge_weights.append(similarity[rows, columns])
+
+        return np.concatenate(edge_rows), np.concatenate(edge_columns), np.concatenate(edge_weights)
+
+    def __iter_edges(self, start, end):
+        # edges for rows [start, end) in blocks of bounded candidate pairs
+        # a block where common tokens make the candidates nearly all pairs is compared densely
+        total_rows, width = self.token_matrix.shape
+        block_start = start
+        while block_start < end:
+            cumulative_pairs = np.cumsum(self.row_pairs[block_start:end])
+            block_end = block_start + max(1, int(np.searchsorted(cumulative_pairs, self.__MAX_BLOCK_ELEMENTS,
+                                                                 side='right')))
+            sparse_cost = int(self.row_pairs[block_start:block_end].sum()) * self.__SPARSE_PAIR_COST
+            dense_cost = (block_end - block_start) * (2 * total_rows - block_start - block_end + 1) // 2 * width
+
+            if sparse_cost < dense_cost:
+                yield self.__get_sparse_edges(block_start, block_end)
+            else:
+                yield self.__get_dense_edges(block_start, block_end)
+
+            block_start = block_end
+
+    def __set_prefix_filter(self, threshold):
+        # minimum integer score of each row to reach threshold, and its prefix length:
+        # the smallest prefix whose following positions weigh less than the minimum score,
+        # so a pair that reaches threshold always shares a token within the prefix of its first row
+        total_rows, width = self.token_matrix.shape
+        self.min_score = np.zeros(total_rows, dtype=np.int64)
+        self.prefix_length = np.zeros(total_rows, dtype=np.int64)
+        for length in np.unique(self.token_length):
+            length = int(length)
+            min_score = int(np.searchsorted(self.__get_similarity_table(length), threshold, side='left'))
+            prefix_length = 0
+            while prefix_length < length and \
+                    (length - prefix_length) * (length - prefix_length + 1) // 2 >= min_score:
+                prefix_length += 1
+
+            selected = self.token_length == length
+            self.min_score[selected] = min_score
+            self.prefix_length[selected] = prefix_length
+
+        remaining = self.token_length - self.prefix_length
+        self.suffix_score = remaining * (remaining + 1) // 2
+
+        # candidate pairs of each row from the posting lists of its prefix only
+        in_prefix = (np.arange(width)[None, :] < self.prefix_length[:, None]) & (self.posting_rank >= 0)
+        self.prefix_pairs = np.where(in_prefix, self.posting_end - self.posting_rank - 1, 0).sum(axis=1)
+
+    def __get_suffix_scores(self, rows, columns):
+        # integer score of row pairs over the positions after the prefix of each row
+        width = self.token_matrix.shape[1]
+        chunk_size = max(1, self.__MAX_BLOCK_ELEMENTS // max(1, width))
+        positions = np.arange(width)[None, :]
+        scores = np.zeros(len(rows), dtype=np.int64)
+        for index in range(0, len(rows), chunk_size):
+            chunk_rows = rows[index:index + chunk_size]
+            row_tokens = self.token_matrix[chunk_rows]
+            same_token = (row_tokens == self.token_matrix[columns[index:index + chunk_size]]) & (row_tokens >= 0) & \
+                         (positions >= self.prefix_length[chunk_rows, None])
+            scores[index:index + chunk_size] = (same_token * self.weights[chunk_rows]).sum(axis=1)
+
+        return scores
+
+    def __get_threshold_block(self, start, end):
+        # edges with similarity >= threshold for rows [start, end), candidates come from the prefix postings
+        total_rows = self.token_matrix.shape[0]
+        block_rows = np.arange(start, end)
+        pair_keys, pair_weights = [], []
+        for position in range(int(self.prefix_length[start:end].max())):
+            ranks = self.posting_rank[start:end, position]
+            valid = (ranks >= 0) & (position < self.prefix_length[start:end])
+            ranks = ranks[valid]
+            counts = self.posting_end[start:end, position][valid] - ranks - 1
+            total = int(counts.sum())
+            if total == 0:
+                continue
+
+            first = ranks + 1 - (np.cumsum(counts) - counts)
+            columns = self.posting_rows[position][np.repeat(first, counts) + np.arange(total)]
+            rows = np.repeat(block_rows[valid], counts)
+            pair_keys.append((rows - start) * total_rows + columns)
+            pair_weights.append(self.token_length[rows] - position)
+
+        if not pair_keys:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty, np.array([], dtype=np.float64)
+
+        keys, inverse = np.unique(np.concatenate(pair_keys), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(pair_weights)).astype(np.int64)
+        rows = keys // total_rows + start
+        columns = keys % total_rows
+
+        # drop pairs that cannot reach the minimum score even if all positions after the prefix match
+        candidate = scores + self.suffix_score[rows] >= self.min_score[rows]
+        rows, columns, scores = rows[candidate], columns[candidate], scores[candidate]
+
+        # verify the remaining candidates on the positions after the prefix
+        scores += self.__get_suffix_scores(rows, columns)
+        selected = scores >= self.min_score[rows]
+        rows, columns, scores = rows[selected], columns[selected], scores[selected]
+        _, similarity = self.__get_similarity_edges(rows, scores)
+
+        return rows, columns, similarity
+
+    def __iter_threshold_edges(self, start, end):
+        # edges with similarity >= threshold for rows [start, end) in blocks of bounded candidate pairs
+        block_start = start
+        while block_start < end:
+            cumulative_pairs = np.cumsum(self.prefix_pairs[block_start:end])
+            block_end = block_start + max(1, int(np.searchsorted(cumulative_pairs, self.__MAX_BLOCK_ELEMENTS,
+                                                                 side='right')))
+            yield self.__get_threshold_block(block_start, block_end)
+            block_start = block_end
+
+    def __get_edges(self, start, end):
+        # edges or, with count_only, the number of edges for rows [start, end)
+        if self.threshold is not None:
+            blocks = self.__iter_threshold_edges(start, end)
+        else:
+            blocks = self.__iter_edges(start, end)
+
+        if self.count_only:
+            return sum(len(rows) for rows, columns, weights in blocks)
+
+        edge_rows, edge_columns, edge_weights = [], [], []
+        for rows, columns, weights in blocks:
+            edge_rows.append(rows)
+            edge_columns.append(columns)
+            edge_weights.append(weights)
+
+        return edge_rows, edge_columns, edge_weights
+
+    def __get_row_cost(self):
+        # a row costs its candidate pairs, at most its pairs with all following rows
+        total_rows = len(self.event_indices)
+        row_pairs = self.row_pairs if self.threshold is None else self.prefix_pairs
+        return np.minimum(row_pairs, total_rows - np.arange(total_rows) - 1)
+
+    def __get_row_ranges(self, row_cost, chunk_pairs):
+        # split rows so that every range holds about chunk_pairs pairs
+        total_rows = len(self.event_indices)
+        row_ranges = []
+        start, pairs = 0, 0
+        for row in range(total_rows):
+            pairs += row_cost[row]
+            if pairs >= chunk_pairs:
+                row_ranges.append((start, row + 1))
+                start, pairs = row + 1, 0
+
+        if start < total_rows:
+            row_ranges.append((start, total_rows))
+
+        return row_ranges
+
+    def __share_arrays(self):
+        # write the arrays of the current mode to .npy files that workers map read-only
+        self.shared_dir = tempfile.mkdtemp(prefix='pylogabstract-', dir=self.__SHARED_ROOT)
+        for name in self.__SHARED_ARRAYS:
+            array = getattr(self, name)
+            if array is not None:
+                np.save(os.path.join(self.shared_dir, name + '.npy'), array)
+
+        # posting lists of all positions in one array with the offset of each position
+        posting_offsets = np.cumsum([0] + [len(rows) for rows in self.posting_rows])
+        np.save(os.path.join(self.shared_dir, 'posting_rows.npy'), np.concatenate(self.posting_rows))
+        np.save(os.path.join(self.shared_dir, 'posting_offsets.npy'), posting_offsets)
+
+    def __attach_arrays(self):
+        # map the shared arrays in a worker process, no array is copied
+        for name in self.__SHARED_ARRAYS:
+            path = os.path.join(self.shared_dir, name + '.npy')
+            setattr(self, name, np.load(path, mmap_mode='r') if os.path.exists(path) else None)
+
+        posting_rows = np.load(os.path.join(self.shared_dir, 'posting_rows.npy'), mmap_mode='r')
+        posting_offsets = np.load(os.path.join(self.shared_dir, 'posting_offsets.npy'))
+        self.posting_rows = [posting_rows[posting_offsets[position]:posting_offsets[position + 1]]
+                             for position in range(len(posting_offsets) - 1)]
+
+    def __remove_shared_arrays(self):
+        if self.shared_dir is not None:
+            shutil.rmtree(self.shared_dir, ignore_errors=True)
+            self.shared_dir = None
+
+    def __getstate__(self):
+        # the executor holds the pool, it is not sent to worker processes
+        # with shared arrays, a task only carries the directory of the arrays and the scalar settings
+        state = self.__dict__.copy()
+        state['executor'] = None
+        if self.shared_dir is not None:
+            state['event_attributes'] = None
+            state['event_indices'] = None
+            state['posting_rows'] = []
+            for name in self.__SHARED_ARRAYS:
+                state[name] = None
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.shared_dir is not None:
+            self.__attach_arrays()
+
+    def __call__(self, row_range):
+        # get edges for a range of rows in a worker process, as three arrays
+        edges = self.__get_edges(row_range[0], row_range[1])
+        if self.count_only:
+            return edges
+
+        edge_rows, edge_columns, edge_weights = edges
+        return np.concatenate(edge_rows), np.concatenate(edge_columns), np.concatenate(edge_weights)
+
+    def __map_edges(self):
+        # edges or edge count of all rows, inline or over row ranges in the executor
+        total_rows = len(self.event_indices)
+        row_cost = self.__get_row_cost()
+        total_pairs = int(row_cost.sum())
+
+        if self.executor is None or self.executor.is_inline(total_pairs):
+            return self.__get_edges(0, total_rows)
+
+        # workers get row ranges only, the token matrix and index are shared through memory-mapped files
+        row_ranges = self.__get_row_ranges(row_cost, self.executor.get_chunk_pairs(total_pairs))
+        self.__share_arrays()
+        try:
+            results = self.executor.map(self, row_ranges, total_pairs)
+        finally:
+            self.__remove_shared_arrays()
+
+        if self.count_only:
+            return sum(results)
+
+        edge_rows, edge_columns, edge_weights = [], [], []
+        for rows, columns, weights in results:
+            edge_rows.append(rows)
+            edge_columns.append(columns)
+            edge_weights.append(weights)
+
+        return edge_rows, edge_columns, edge_weights
+
+    def __set_index(self):
+        # the token matrix and inverted index are built once and shared by all modes
+        if self.token_matrix is None:
+            self.__set_token_matrix()
+
+    def get_similarity_edges(self, threshold=None):
+        # get edges as arrays of row index, column index and weight, in combinations() order
+        # with threshold, only edges with weight >= threshold are generated (prefix-filtered join)
+        # every edge has a positive weight, so a threshold of 0 or below keeps all edges
+        if threshold is not None and threshold <= 0:
+            threshold = None
+
+        self.__set_index()
+        self.threshold = threshold
+        self.count_only = False
+        if threshold is not None:
+            self.__set_prefix_filter(threshold)
+
+        edge_rows, edge_columns, edge_weights = self.__map_edges()
+        if edge_rows:
+            return np.concatenate(edge_rows), np.concatenate(edge_columns), np.concatenate(edge_weights)
+        else:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+
+    def get_edge_count(self):
+        # number of edges with a positive weight, counted block by block without keeping the edges
+        self.__set_index()
+        self.threshold = None
+        self.count_only = True
+        edge_count = self.__map_edges()
+        self.count_only = False
+
+        return edge_count
+
+    def get_vectorized_hamming_similarity(self, threshold=None):
+        # same output as ParallelHammingSimilarity.get_parallel_hamming_similarity,
+        # without the edges with weight < threshold if threshold is given
+        rows, columns, edge_weights = self.get_similarity_edges(threshold)
+        event_indices = np.array(self.event_indices, dtype=np.int64)
+        similarity = list(zip(event_indices[rows].tolist(), event_indices[columns].tolist(), edge_weights.tolist()))
+        self.edges_weight = similarity
+
+        return similarity
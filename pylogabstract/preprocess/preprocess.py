@@ -1,26 +1,39 @@
 from collections import defaultdict
+from pylogabstract.preprocess.token_dictionary import TokenDictionary
 
 
 class Preprocess(object):
-    def __init__(self, parsed_logs, raw_logs):
+    def __init__(self, parsed_logs=None, raw_logs=None, token_dictionary=None):
         self.parsed_logs = parsed_logs
         self.raw_logs = raw_logs
+        self.token_dictionary = token_dictionary if token_dictionary is not None else TokenDictionary()
         self.event_attributes = {}
         self.message_length_group = defaultdict(list)
+        self.message_eventid = {}
 
     def get_unique_events(self):
         # get graph event_attributes
-        unique_events_only = []
-        unique_event_id = 0
+        self.update_unique_events(self.parsed_logs.items())
+
+    def update_unique_events(self, parsed_logs):
+        # parsed_logs: iterable of (line_id, parsed_log), such as a batch from Parser.iter_parse
+        # only unique messages and their member line ids are kept
+        # message_eventid[message] = unique_event_id, so a repeated message is found in O(1)
+        # a unique message is split once, its tokens are kept as token ids of self.token_dictionary
+        unique_event_id = len(self.event_attributes)
 
         # get unique events
-        for line_id, parsed_log in self.parsed_logs.items():
+        for line_id, parsed_log in parsed_logs:
+            message = parsed_log['message']
+            event_id = self.message_eventid.get(message)
+
             # if not exist
-            if parsed_log['message'] not in unique_events_only:
-                unique_events_only.append(parsed_log['message'])
-                message_length = len(parsed_log['message'].split(' '))
+            if event_id is None:
+                self.message_eventid[message] = unique_event_id
+                message_length = len(message.split(' '))
                 self.message_length_group[message_length].append(unique_event_id)
-                self.event_attributes[unique_event_id] = {'message': parsed_log['message'],
+                self.event_attributes[unique_event_id] = {'message': message,
+                                                          'tokens': self.token_dictionary.get_ids(message.split()),
                                                           'message_length': message_length,
                                                           'cluster': unique_event_id,
                                                           'member': [line_id]}
@@ -28,13 +41,12 @@ class Preprocess(object):
 
             # if exist
             else:
-                for index, attr in self.event_attributes.items():
-                    if parsed_log['message'] == attr['message']:
-                        attr['member'].append(line_id)
+                self.event_attributes[event_id]['member'].append(line_id)
 
     def get_partial_unique_events(self, indices):
         # get unique events based on given indices
         partial_unique_events = []
+        indices = set(indices)
         for index, attr in self.event_attributes.items():
             if index in indices:
                 partial_unique_events.append((index, attr))
@@ -0,0 +1,44 @@
+import multiprocessing
+
+
+class SimilarityExecutor(object):
+    def __init__(self, workers=None):
+        # a long-lived pool shared by all CreateGraph calls, created on first use
+        self.workers = workers if workers else multiprocessing.cpu_count()
+        self.pool = None
+
+        # below this number of pairs, similarity runs inline because process overhead costs more
+        self.__INLINE_PAIRS = 50000
+
+        # work is shipped in a few large chunks of pairs per worker
+        self.__TASKS_PER_WORKER = 4
+
+    def is_inline(self, total_pairs):
+        return self.workers <= 1 or total_pairs < self.__INLINE_PAIRS
+
+    def get_chunk_pairs(self, total_pairs):
+        # number of pairs in one task
+        total_tasks = self.workers * self.__TASKS_PER_WORKER
+        return max(1, (total_pairs + total_tasks - 1) // total_tasks)
+
+    def map(self, function, tasks, total_pairs, chunksize=1):
+        # run inline for small work, otherwise use the persistent pool
+        if self.is_inline(total_pairs):
+            return [function(task) for task in tasks]
+
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(processes=self.workers)
+
+        return self.pool.map(function, tasks, chunksize=chunksize)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
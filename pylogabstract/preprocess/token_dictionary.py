@@ -0,0 +1,43 @@
+import numpy as np
+
+# token id of the asterisk in abstractions
+ASTERISK_ID = 0
+
+
+class TokenDictionary(object):
+    """Mapping between message tokens and integer ids.
+
+    A message is split once when it becomes a unique event and is kept as an int32 array of token ids.
+    Similarity, asterisk extraction and merging compare these ids, strings are built again only for output.
+    A dictionary belongs to one Preprocess or LogAbstraction, so it is freed with them.
+    """
+    def __init__(self):
+        self.token_id = {'*': ASTERISK_ID}
+        self.tokens = ['*']
+
+    def get_ids(self, tokens):
+        # tokens: list of strings, new tokens get the next ids
+        ids = []
+        for token in tokens:
+            token_id = self.token_id.get(token)
+            if token_id is None:
+                token_id = len(self.tokens)
+                self.token_id[token] = token_id
+                self.tokens.append(token)
+            ids.append(token_id)
+
+        return np.array(ids, dtype=np.int32)
+
+    def get_tokens(self, ids):
+        return [self.tokens[token_id] for token_id in ids]
+
+    def get_string(self, ids):
+        return ' '.join(self.get_tokens(ids))
+
+    def is_asterisk_only(self, ids):
+        # same as set(' '.join(tokens).replace(' ', '')) == {'*'}, tokens such as ** are asterisk only too
+        if len(ids) == 0:
+            return False
+
+        return all(set(self.tokens[token_id]) == {'*'} for token_id in set(ids.tolist()))
+
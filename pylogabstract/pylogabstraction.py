@@ -1,5 +1,6 @@
 from optparse import OptionParser
 from pylogabstract.abstraction.abstraction import LogAbstraction
+from pylogabstract.abstraction.template_matcher import TemplateMatcher
 from pylogabstract.output.output import Output
 
 
@@ -13,6 +14,57 @@ def main():
                       action='store',
                       dest='output_file',
                       help='Output abstraction file.')
+    parser.add_option('-w', '--workers',
+                      action='store',
+                      type='int',
+                      dest='workers',
+                      help='Number of worker processes for graph construction. Default: number of CPUs.')
+    parser.add_option('-c', '--clustering',
+                      action='store',
+                      type='choice',
+                      choices=['girvan_newman', 'louvain', 'label_propagation'],
+                      default='girvan_newman',
+                      dest='clustering_backend',
+                      help='Graph clustering backend: girvan_newman, louvain, or label_propagation. '
+                           'Default: girvan_newman.')
+    parser.add_option('-p', '--parser',
+                      action='store',
+                      type='choice',
+                      choices=['ner', 'perceptron'],
+                      dest='parser_backend',
+                      help='Log parser backend: ner or perceptron. Default: Config.backend.')
+    parser.add_option('-s', '--inference-socket',
+                      action='store',
+                      dest='inference_socket',
+                      help='Unix domain socket of a running pylogabstract-server, the server tags the logs '
+                           'instead of a model loaded in this process. Default: no server.')
+    parser.add_option('--parse-cache',
+                      action='store_true',
+                      dest='parse_cache',
+                      help='Keep parse results on disk by log file content and model, so an unchanged log file '
+                           'is not parsed again. Default: Config.use_parse_cache.')
+    parser.add_option('-a', '--approximate',
+                      action='store',
+                      type='int',
+                      dest='lsh_min_group_size',
+                      help='Split message length groups with at least this many unique messages '
+                           'by MinHash LSH before clustering. Default: exact clustering.')
+    parser.add_option('--signatures',
+                      action='store',
+                      type='int',
+                      default=128,
+                      dest='lsh_signatures',
+                      help='Number of MinHash signatures for --approximate. Default: 128.')
+    parser.add_option('--bands',
+                      action='store',
+                      type='int',
+                      default=32,
+                      dest='lsh_bands',
+                      help='Number of LSH bands for --approximate, it divides --signatures. Default: 32.')
+    parser.add_option('-m', '--matcher',
+                      action='store',
+                      dest='matcher_file',
+                      help='Save a template matcher of the abstractions to a JSON file.')
 
     # get options
     (options, args) = parser.parse_args()
@@ -20,9 +72,25 @@ def main():
     output_file = options.output_file
 
     if options.input_file:
+        # approximate clustering of large groups
+        lsh_config = None
+        if options.lsh_min_group_size is not None:
+            lsh_config = {
+                'min_group_size': options.lsh_min_group_size,
+                'signatures': options.lsh_signatures,
+                'bands': options.lsh_bands
+            }
+
         # get abstraction
-        log_abstraction = LogAbstraction()
+        log_abstraction = LogAbstraction(options.workers, options.clustering_backend,
+                                         options.parser_backend, lsh_config, options.inference_socket,
+                                         options.parse_cache)
         abstractions, raw_logs = log_abstraction.get_abstraction(input_file)
+        log_abstraction.close()
+
+        if options.matcher_file:
+            print('Write template matcher to', options.matcher_file)
+            TemplateMatcher(abstractions).save(options.matcher_file)
 
         if options.output_file:
             print('Write results to', output_file)
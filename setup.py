@@ -17,12 +17,14 @@ setup(name='pylogabstract',
       packages=['pylogabstract'],
       entry_points={
           'console_scripts': [
-              'pylogabstract = pylogabstract.pylogabstraction:main'
+              'pylogabstract = pylogabstract.pylogabstraction:main',
+              'pylogabstract-server = pylogabstract.parser.inference_server:main'
           ],
       },
       install_requires=[
           'tensorflow==1.4.1',
           'networkx',
+          'numpy',
           'python-louvain'
       ],
       include_package_data=True,
@@ -0,0 +1,38 @@
+import pytest
+
+
+class FakeModel(object):
+    # stands in for the NER model: a syslog header of timestamp, hostname and service, the rest is the message
+    def __init__(self):
+        self.total_sentences = 0
+
+    def predict(self, words_raw):
+        header = ['B-TIM', 'I-TIM', 'I-TIM', 'I-HOS', 'B-SER']
+        return (header + ['O'] * len(words_raw))[:len(words_raw)]
+
+    def predict_sentences(self, sentences_raw):
+        self.total_sentences += len(sentences_raw)
+        return [self.predict(words_raw) for words_raw in sentences_raw]
+
+
+@pytest.fixture
+def fake_model():
+    return FakeModel()
+
+
+@pytest.fixture
+def auth_log(tmp_path):
+    # a small syslog file with a few templates
+    lines = []
+    for index in range(60):
+        user = ['root', 'alice', 'bob'][index % 3]
+        lines.append('Dec 1 00:00:%02d server sshd[%d]: Failed password for %s from 10.0.0.%d port %d ssh2\n' %
+                     (index, 100 + index, user, index % 7, 5000 + index))
+        lines.append('Dec 1 00:01:%02d server sshd[%d]: Connection closed by 10.0.0.%d\n' %
+                     (index, 200 + index, index % 5))
+        lines.append('Dec 1 00:02:%02d server su[%d]: session opened for user %s by (uid=0)\n' %
+                     (index, 300 + index, user))
+    log_file = tmp_path / 'auth.log'
+    log_file.write_text(''.join(lines))
+
+    return str(log_file)
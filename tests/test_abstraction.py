@@ -0,0 +1,124 @@
+from collections import ChainMap
+from pylogabstract.abstraction.abstraction import LogAbstraction
+from pylogabstract.parser.raw_log_store import RawLogStore
+
+
+def get_log_abstraction(fake_model):
+    log_abstraction = LogAbstraction(workers=1)
+    log_abstraction.parser.model = fake_model
+
+    return log_abstraction
+
+
+def test_update_assigns_new_lines(fake_model, auth_log):
+    log_abstraction = get_log_abstraction(fake_model)
+    abstractions, raw_logs = log_abstraction.get_abstraction(auth_log)
+    total_lines = len(raw_logs)
+    assert isinstance(raw_logs, RawLogStore)
+
+    lines = ['Dec 2 00:00:01 server sshd[999]: Failed password for carol from 10.0.0.9 port 6000 ssh2\n',
+             'Dec 2 00:00:02 server kernel: eth0 link up\n']
+    abstractions, raw_logs = log_abstraction.update(lines)
+    log_abstraction.close()
+
+    log_ids = sorted(log_id for abstraction in abstractions.values() for log_id in abstraction['log_id'])
+    assert log_ids == list(range(total_lines + len(lines)))
+    assert raw_logs[total_lines] == lines[0]
+    assert raw_logs[0].startswith('Dec 1 00:00:00 server')
+
+
+def test_partial_logs_keep_raw_log_store_after_update(fake_model, auth_log):
+    log_abstraction = get_log_abstraction(fake_model)
+    log_abstraction.get_abstraction(auth_log)
+    log_abstraction.update(['Dec 2 00:00:01 server kernel: eth0 link up\n'])
+    log_abstraction.close()
+    assert isinstance(log_abstraction.raw_logs, ChainMap)
+
+    # raw logs of an update are not copied line by line, the ChainMap over the store is passed on
+    get_partial_logs = log_abstraction._LogAbstraction__get_partial_logs
+    event_attributes = log_abstraction.preprocess.event_attributes
+    _, partial_raw_logs, _ = get_partial_logs([0, len(event_attributes) - 1], event_attributes,
+                                              log_abstraction.parsed_logs, log_abstraction.raw_logs)
+    assert partial_raw_logs is log_abstraction.raw_logs
+
+
+def get_abstraction_ids(abstractions):
+    # {log id: abstraction string}
+    return {log_id: abstraction['abstraction'] for abstraction in abstractions.values()
+            for log_id in abstraction['log_id']}
+
+
+def test_update_matches_existing_template(fake_model, auth_log):
+    log_abstraction = get_log_abstraction(fake_model)
+    abstractions, raw_logs = log_abstraction.get_abstraction(auth_log)
+    total_lines = len(raw_logs)
+
+    lines = ['Dec 1 00:03:01 server sshd[999]: Failed password for bob from 10.0.0.9 port 6000 ssh2\n',
+             'Dec 1 00:03:02 server sshd[998]: Connection closed by 10.0.0.9\n']
+    updated_abstractions, _ = log_abstraction.update(lines)
+    log_abstraction.close()
+
+    # new lines join the abstractions of their templates, no abstraction is added
+    assert len(updated_abstractions) == len(abstractions)
+    abstraction_ids = get_abstraction_ids(updated_abstractions)
+    assert abstraction_ids[total_lines] == abstraction_ids[6]
+    assert abstraction_ids[total_lines + 1] == abstraction_ids[1]
+    assert abstraction_ids[total_lines].endswith('Failed password for bob from * port * ssh2')
+
+
+def test_update_adds_new_template(fake_model, auth_log):
+    log_abstraction = get_log_abstraction(fake_model)
+    abstractions, raw_logs = log_abstraction.get_abstraction(auth_log)
+    total_lines = len(raw_logs)
+
+    lines = ['Dec 1 00:03:01 server kernel: eth0 link up\n', 'Dec 1 00:03:02 server kernel: eth1 link up\n']
+    updated_abstractions, _ = log_abstraction.update(lines)
+    log_abstraction.close()
+
+    # the new lines are clustered into one new abstraction, the other abstractions keep their lines
+    assert len(updated_abstractions) == len(abstractions) + 1
+    new_abstractions = [abstraction for abstraction in updated_abstractions.values()
+                        if total_lines in abstraction['log_id']]
+    assert len(new_abstractions) == 1
+    assert sorted(new_abstractions[0]['log_id']) == [total_lines, total_lines + 1]
+    assert new_abstractions[0]['abstraction'].endswith('kernel: * link up')
+    assert sorted(abstraction['abstraction'] for abstraction in abstractions.values()) == \
+        sorted(abstraction['abstraction'] for abstraction in updated_abstractions.values()
+               if total_lines not in abstraction['log_id'])
+
+
+def test_update_continues_line_ids(fake_model, auth_log):
+    log_abstraction = get_log_abstraction(fake_model)
+    _, raw_logs = log_abstraction.get_abstraction(auth_log)
+    total_lines = len(raw_logs)
+
+    batches = [['Dec 1 00:03:01 server su[1]: session opened for user carol by (uid=0)\n', '\n'],
+               ['Dec 1 00:03:02 server kernel: eth0 link up\n'],
+               ['Dec 1 00:03:03 server sshd[2]: Connection closed by 10.0.0.1\n',
+                'Dec 1 00:03:04 server kernel: eth1 link up\n']]
+    for batch in batches:
+        abstractions, raw_logs = log_abstraction.update(batch)
+    log_abstraction.close()
+
+    # empty lines get no id, ids of every update continue from the previous lines
+    new_lines = [line for batch in batches for line in batch if line != '\n']
+    assert sorted(get_abstraction_ids(abstractions).keys()) == list(range(total_lines + len(new_lines)))
+    assert [raw_logs[total_lines + index] for index in range(len(new_lines))] == new_lines
+
+
+def test_token_dictionary_belongs_to_log_abstraction(fake_model, auth_log):
+    log_abstraction = get_log_abstraction(fake_model)
+    log_abstraction.get_abstraction(auth_log)
+    total_tokens = len(log_abstraction.token_dictionary.tokens)
+    assert log_abstraction.preprocess.token_dictionary is log_abstraction.token_dictionary
+
+    # a new log file starts from a new dictionary, tokens of the previous file and its updates are dropped
+    log_abstraction.update(['Dec 1 00:03:01 server kernel: eth0 link up\n'])
+    assert len(log_abstraction.token_dictionary.tokens) > total_tokens
+    log_abstraction.get_abstraction(auth_log)
+    assert len(log_abstraction.token_dictionary.tokens) == total_tokens
+    assert len(log_abstraction.word_check) <= total_tokens
+
+    other_log_abstraction = get_log_abstraction(fake_model)
+    assert other_log_abstraction.token_dictionary is not log_abstraction.token_dictionary
+    log_abstraction.close()
@@ -0,0 +1,69 @@
+import networkx as nx
+import pytest
+from pylogabstract.abstraction.abstraction import LogAbstraction
+from pylogabstract.clustering import recursion_clustering
+from pylogabstract.clustering.community_detection import CommunityDetection
+
+BACKENDS = ['girvan_newman', 'louvain', 'label_propagation']
+
+
+def get_graph():
+    # three dense groups joined by light edges, and an isolated node
+    graph = nx.Graph()
+    for group in range(3):
+        nodes = range(group * 5, group * 5 + 5)
+        graph.add_weighted_edges_from((u, v, 0.9) for u in nodes for v in nodes if u < v)
+    graph.add_weighted_edges_from([(4, 5, 0.1), (9, 10, 0.1), (14, 0, 0.1)])
+    graph.add_node(15)
+
+    return graph
+
+
+def to_sets(communities):
+    return sorted(sorted(nodes) for nodes in communities)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_backend_returns_partition(backend):
+    graph = get_graph()
+    communities = CommunityDetection(graph, backend).get_communities()
+
+    # every node is in exactly one community
+    nodes = [node for nodes in communities for node in nodes]
+    assert sorted(nodes) == sorted(graph.nodes())
+    assert to_sets(communities) == [[0, 1, 2, 3, 4], [5, 6, 7, 8, 9], [10, 11, 12, 13, 14], [15]]
+
+
+@pytest.mark.parametrize('backend', ['louvain', 'label_propagation'])
+def test_backend_is_deterministic_with_seed(backend):
+    graph = nx.gnm_random_graph(60, 150, seed=1)
+    for u, v in graph.edges():
+        graph[u][v]['weight'] = 0.5 + (u * v) % 5 / 10.
+
+    communities = CommunityDetection(graph, backend, seed=3).get_communities()
+    for _ in range(3):
+        assert to_sets(CommunityDetection(graph, backend, seed=3).get_communities()) == to_sets(communities)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        CommunityDetection(get_graph(), 'unknown').get_communities()
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_backend_is_selected_by_log_abstraction(backend, fake_model, auth_log, monkeypatch):
+    selected = []
+
+    class RecordingCommunityDetection(CommunityDetection):
+        def get_communities(self):
+            selected.append(self.backend)
+            return super(RecordingCommunityDetection, self).get_communities()
+
+    monkeypatch.setattr(recursion_clustering, 'CommunityDetection', RecordingCommunityDetection)
+    log_abstraction = LogAbstraction(workers=1, clustering_backend=backend)
+    log_abstraction.parser.model = fake_model
+    log_abstraction.get_abstraction(auth_log)
+    log_abstraction.close()
+
+    assert selected
+    assert set(selected) == {backend}
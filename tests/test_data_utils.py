@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from pylogabstract.parser.model.data_utils import BatchEncoder, get_processing_word, pad_sequences, \
+    viterbi_decode_batch
+
+
+def viterbi_decode(score, transition_params):
+    # per-sentence decoding of tf.contrib.crf.viterbi_decode
+    trellis = np.zeros_like(score)
+    backpointers = np.zeros_like(score, dtype=np.int32)
+    trellis[0] = score[0]
+    for t in range(1, score.shape[0]):
+        v = np.expand_dims(trellis[t - 1], 1) + transition_params
+        trellis[t] = score[t] + np.max(v, 0)
+        backpointers[t] = np.argmax(v, 0)
+
+    viterbi = [np.argmax(trellis[-1])]
+    for bp in reversed(backpointers[1:]):
+        viterbi.append(bp[viterbi[-1]])
+    viterbi.reverse()
+
+    return [int(tag) for tag in viterbi], np.max(trellis[-1])
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_viterbi_decode_batch_matches_per_sentence(seed):
+    random_state = np.random.RandomState(seed)
+    ntags = 7
+    sequence_lengths = random_state.randint(1, 12, size=16)
+    scores = random_state.randn(len(sequence_lengths), sequence_lengths.max(), ntags)
+    transition_params = random_state.randn(ntags, ntags)
+
+    viterbi_sequences, viterbi_scores = viterbi_decode_batch(scores, transition_params, sequence_lengths)
+    for index, length in enumerate(sequence_lengths):
+        viterbi_sequence, viterbi_score = viterbi_decode(scores[index, :length], transition_params)
+        assert viterbi_sequences[index] == viterbi_sequence
+        assert viterbi_scores[index] == pytest.approx(viterbi_score)
+
+
+def get_sentences():
+    return [['Failed', 'password', 'for', 'root', 'from', '10.0.0.1'], ['sshd'],
+            ['session', 'opened', 'for', 'user', 'Root', '42'], ['Connection', 'closed']]
+
+
+def get_vocabs():
+    vocab_words = {'$UNK$': 0, '$NUM$': 1, 'failed': 2, 'password': 3, 'for': 4, 'root': 5, 'sshd': 6,
+                   'session': 7, 'opened': 8}
+    vocab_chars = {char: index for index, char in enumerate('abcdefghijklmnopqrstuvwxyzFSRC0123456789.')}
+
+    return vocab_words, vocab_chars
+
+
+def test_batch_encoder_matches_pad_sequences():
+    vocab_words, _ = get_vocabs()
+    processing_word = get_processing_word(vocab_words, lowercase=True)
+    sentences = get_sentences()
+
+    word_ids, sequence_lengths = pad_sequences([[processing_word(word) for word in words] for words in sentences], 0)
+    encoded = BatchEncoder(processing_word).encode(sentences)
+
+    assert encoded[0].tolist() == word_ids
+    assert encoded[1].tolist() == sequence_lengths
+    assert encoded[2] is None and encoded[3] is None
+
+
+def test_batch_encoder_with_chars_matches_pad_sequences():
+    vocab_words, vocab_chars = get_vocabs()
+    processing_word = get_processing_word(vocab_words, vocab_chars, lowercase=True, chars=True)
+    sentences = get_sentences()
+
+    # same steps as NERModel.get_feed_dict
+    tokens = [[processing_word(word) for word in words] for words in sentences]
+    char_ids, word_ids = zip(*[zip(*sentence) for sentence in tokens])
+    word_ids, sequence_lengths = pad_sequences(word_ids, 0)
+    char_ids, word_lengths = pad_sequences(char_ids, pad_tok=0, nlevels=2)
+
+    # a small cache is emptied while encoding, the result must not change
+    encoder = BatchEncoder(processing_word, chars=True, max_size=3)
+    for _ in range(2):
+        encoded = encoder.encode(sentences)
+        assert encoded[0].tolist() == word_ids
+        assert encoded[1].tolist() == sequence_lengths
+        assert encoded[2].tolist() == char_ids
+        assert encoded[3].tolist() == word_lengths
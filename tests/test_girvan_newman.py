@@ -0,0 +1,55 @@
+import random
+from operator import itemgetter
+import community as commun
+import networkx as nx
+import pytest
+from networkx.algorithms import community
+from pylogabstract.clustering.girvan_newman import IncrementalGirvanNewman
+
+
+def lightest(graph):
+    return min(graph.edges(data='weight'), key=itemgetter(2))[:2]
+
+
+def get_girvan_newman_partition(graph):
+    # full sweep of networkx girvan_newman(), the level with the highest modularity is kept
+    max_modularity = -1.
+    best_cluster = []
+    for cluster in community.girvan_newman(graph, most_valuable_edge=lightest):
+        partition = {node: cluster_id for cluster_id, nodes in enumerate(cluster) for node in nodes}
+        modularity = commun.modularity(partition, graph)
+        if max_modularity < modularity:
+            max_modularity = modularity
+            best_cluster = cluster
+
+    return best_cluster
+
+
+def get_random_graph(total_nodes, total_edges, seed):
+    # few distinct weights, so many removal ties have to be broken like min() does
+    random.seed(seed)
+    graph = nx.gnm_random_graph(total_nodes, total_edges, seed=seed)
+    for u, v in graph.edges():
+        graph[u][v]['weight'] = random.choice([0.25, 0.5, 0.75, 1.0])
+    graph.add_nodes_from(range(total_nodes, total_nodes + 3))
+
+    return graph
+
+
+def to_sets(partition):
+    return sorted(sorted(nodes) for nodes in partition)
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_incremental_matches_girvan_newman(seed):
+    graph = get_random_graph(30, 60, seed)
+    expected = get_girvan_newman_partition(graph)
+
+    assert to_sets(IncrementalGirvanNewman(graph).get_best_partition()) == to_sets(expected)
+
+
+def test_graph_without_edges():
+    graph = nx.Graph()
+    graph.add_nodes_from(range(4))
+
+    assert to_sets(IncrementalGirvanNewman(graph).get_best_partition()) == [[0], [1], [2], [3]]
@@ -0,0 +1,106 @@
+import random
+from collections import OrderedDict
+from itertools import combinations
+import pytest
+from pylogabstract.preprocess.preprocess import Preprocess
+from pylogabstract.preprocess.create_graph import CreateGraph
+from pylogabstract.preprocess.hamming_similarity import HammingSimilarity, VectorizedHammingSimilarity
+from pylogabstract.preprocess.similarity_executor import SimilarityExecutor
+
+
+def get_event_attributes(total_lines, seed=0):
+    # messages of several lengths with shared words, so every similarity score occurs
+    random.seed(seed)
+    parsed_logs = OrderedDict()
+    for line_id in range(total_lines):
+        length = random.randint(1, 8)
+        message = ['w%d' % random.randint(0, 3) for _ in range(length)]
+        parsed_logs[line_id] = {'message': ' '.join(message)}
+
+    preprocess = Preprocess(parsed_logs, {})
+    preprocess.get_unique_events()
+
+    return preprocess.event_attributes
+
+
+def get_pairwise_similarity(event_attributes, event_indices):
+    # original pairwise implementation on message strings
+    hamming_similarity = HammingSimilarity()
+    similarity = []
+    for event_id1, event_id2 in combinations(event_indices, 2):
+        if event_attributes[event_id1]['message_length'] == event_attributes[event_id2]['message_length']:
+            weight = hamming_similarity.get_weighted_hamming(event_attributes[event_id1]['message'],
+                                                             event_attributes[event_id2]['message'])
+            if weight > 0.:
+                similarity.append((event_id1, event_id2, round(weight, 3)))
+
+    return similarity
+
+
+def test_weighted_hamming_ids_match_strings():
+    event_attributes = get_event_attributes(300)
+    hamming_similarity = HammingSimilarity()
+    for event_id1, event_id2 in combinations(list(event_attributes.keys())[:60], 2):
+        attributes1, attributes2 = event_attributes[event_id1], event_attributes[event_id2]
+        assert hamming_similarity.get_weighted_hamming_ids(attributes1['tokens'], attributes2['tokens']) == \
+            hamming_similarity.get_weighted_hamming(attributes1['message'], attributes2['message'])
+
+
+def test_vectorized_matches_pairwise():
+    event_attributes = get_event_attributes(600)
+    event_indices = list(event_attributes.keys())
+    hamming_similarity = VectorizedHammingSimilarity(event_attributes, event_indices)
+
+    expected = get_pairwise_similarity(event_attributes, event_indices)
+    assert hamming_similarity.get_vectorized_hamming_similarity() == expected
+    assert hamming_similarity.get_edge_count() == len(expected)
+
+
+@pytest.mark.parametrize('sparse_pair_cost', [0, 10 ** 9])
+def test_sparse_and_dense_blocks_match_pairwise(sparse_pair_cost):
+    event_attributes = get_event_attributes(600, seed=4)
+    event_indices = list(event_attributes.keys())
+    expected = get_pairwise_similarity(event_attributes, event_indices)
+
+    # every block uses the inverted index, or every block is compared densely
+    hamming_similarity = VectorizedHammingSimilarity(event_attributes, event_indices)
+    hamming_similarity._VectorizedHammingSimilarity__SPARSE_PAIR_COST = sparse_pair_cost
+    assert hamming_similarity.get_vectorized_hamming_similarity() == expected
+    assert hamming_similarity.get_edge_count() == len(expected)
+
+
+@pytest.mark.parametrize('threshold', [0.3, 0.75, 1.0])
+def test_vectorized_threshold_matches_pairwise(threshold):
+    event_attributes = get_event_attributes(600, seed=1)
+    event_indices = list(event_attributes.keys())
+    hamming_similarity = VectorizedHammingSimilarity(event_attributes, event_indices)
+
+    expected = [edge for edge in get_pairwise_similarity(event_attributes, event_indices) if edge[2] >= threshold]
+    assert hamming_similarity.get_vectorized_hamming_similarity(threshold) == expected
+
+
+def test_vectorized_shared_workers_match_inline():
+    event_attributes = get_event_attributes(600, seed=2)
+    event_indices = list(event_attributes.keys())
+    expected = VectorizedHammingSimilarity(event_attributes, event_indices).get_vectorized_hamming_similarity()
+
+    # every block goes to the worker processes, which read the arrays from the shared files
+    with SimilarityExecutor(2) as executor:
+        executor._SimilarityExecutor__INLINE_PAIRS = 0
+        hamming_similarity = VectorizedHammingSimilarity(event_attributes, event_indices, executor)
+        assert hamming_similarity.get_vectorized_hamming_similarity() == expected
+        assert hamming_similarity.get_edge_count() == len(expected)
+
+
+@pytest.mark.parametrize('threshold', [0.0, -0.5])
+def test_threshold_zero_keeps_all_edges(threshold):
+    event_attributes = get_event_attributes(300, seed=3)
+    event_indices = list(event_attributes.keys())
+    expected = VectorizedHammingSimilarity(event_attributes, event_indices).get_vectorized_hamming_similarity()
+
+    hamming_similarity = VectorizedHammingSimilarity(event_attributes, event_indices)
+    assert hamming_similarity.get_vectorized_hamming_similarity(threshold) == expected
+
+    graph = CreateGraph(event_indices, event_attributes, event_indices).create_graph(threshold)
+    assert graph.number_of_nodes() == len(event_indices)
+    assert sorted(graph.edges(data='weight')) == sorted(expected)
@@ -0,0 +1,55 @@
+from collections import OrderedDict
+from pylogabstract.parser.header_grammar import HeaderGrammar
+from pylogabstract.parser.model.config import Config
+from pylogabstract.parser.model.data_utils import load_vocab
+from pylogabstract.parser.parser import Parser
+
+
+def get_header_grammar():
+    return HeaderGrammar(load_vocab(Config.filename_tags))
+
+
+def test_rfc3164_labels():
+    words = 'Dec 1 00:00:01 server sshd[42]: Failed password for root'.split()
+    assert get_header_grammar().get_labels(words) == ['B-TIM', 'I-TIM', 'I-TIM', 'I-HOS', 'B-SER']
+
+
+def test_rfc5424_labels():
+    words = "<34>1 2003-10-11T22:14:15.003Z mymachine.example.com su - ID47 - 'su root' failed".split()
+    assert get_header_grammar().get_labels(words) == ['I-LEV', 'B-TIM', 'I-HOS', 'B-SER', 'I-NUM', 'B-SUB']
+
+
+def test_iso_timestamp_labels():
+    words = '2018-03-01T10:00:00.123456+01:00 server kernel: eth0 link up'.split()
+    assert get_header_grammar().get_labels(words) == ['B-TIM', 'I-HOS', 'B-SER']
+
+
+def test_no_matching_grammar():
+    assert get_header_grammar().get_labels('eth0 link up'.split()) == []
+
+
+def test_labels_are_model_tags():
+    tags = load_vocab(Config.filename_tags)
+    header_grammar = HeaderGrammar(tags)
+    for line in ['Dec 1 00:00:01 server sshd[42]: x', '<34>1 2003-10-11T22:14:15Z host app 42 ID47 x',
+                 '2018-03-01T10:00:00Z server kernel: x']:
+        assert set(header_grammar.get_labels(line.split())) <= set(tags)
+
+
+class MessageModel(object):
+    # every word after the header is part of the message
+    def predict_sentences(self, sentences_raw):
+        return [['O'] * len(words_raw) for words_raw in sentences_raw]
+
+
+def test_rfc5424_fields():
+    parser = Parser()
+    parser.model = MessageModel()
+    parser.config.use_header_grammar = True
+    parsed_logs, _ = parser.parse_lines(["<34>1 2003-10-11T22:14:15.003Z mymachine.example.com su - ID47 - "
+                                         "'su root' failed\n"])
+
+    assert parsed_logs[0] == OrderedDict([('level', '<34>1'), ('timestamp', '2003-10-11T22:14:15.003Z'),
+                                          ('hostname', 'mymachine.example.com'), ('service', 'su'),
+                                          ('number', '-'), ('subservice', 'ID47'),
+                                          ('message', "- 'su root' failed")])
@@ -0,0 +1,103 @@
+import os
+import json
+import socketserver
+import threading
+import pytest
+from pylogabstract.parser.inference_client import InferenceClient
+from pylogabstract.parser.model.config import Config
+from pylogabstract.parser.parser import Parser
+
+
+class FakeServerHandler(socketserver.StreamRequestHandler):
+    # same protocol as InferenceServer, every word is part of the message
+    def handle(self):
+        for line in self.rfile:
+            request = json.loads(line.decode('utf-8'))
+            if 'model' in request:
+                response = {'model': self.server.model_fingerprint}
+            else:
+                self.server.total_sentences += len(request['sentences'])
+                response = {'labels': [['O'] * len(words) for words in request['sentences']]}
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+
+@pytest.fixture
+def fake_server(tmp_path):
+    server = socketserver.ThreadingUnixStreamServer(str(tmp_path / 'ner.sock'), FakeServerHandler)
+    server.daemon_threads = True
+    server.model_fingerprint = ['ner', ['model.bundle', 1, 1]]
+    server.total_sentences = 0
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_default_socket_is_private():
+    assert os.path.dirname(Config.inference_socket) == Config.dir_inference
+    assert os.path.basename(Config.dir_inference).startswith('pylogabstract-')
+
+
+def test_parser_uses_server_only_with_socket(monkeypatch):
+    # a parser without a socket never connects to a server, even one on the default socket
+    monkeypatch.setattr(InferenceClient, '_InferenceClient__connect',
+                        lambda client: pytest.fail('connected to ' + client.socket_path))
+    monkeypatch.setattr(Parser, '_Parser__load_pretrained_model', lambda parser: setattr(parser, 'model', 'local'))
+    parser = Parser()
+    parser.load_model()
+
+    assert parser.model == 'local'
+
+
+def test_client_round_trip(fake_server):
+    client = InferenceClient(fake_server.server_address)
+    assert client.get_model_fingerprint() == fake_server.model_fingerprint
+    assert client.predict_sentences([['a', 'b'], ['c']]) == [['O', 'O'], ['O']]
+    assert client.predict(['a']) == ['O']
+    client.close()
+
+
+def test_parse_cache_key_has_server_model(fake_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'dir_parse_cache', str(tmp_path / 'cache'))
+    log_file = tmp_path / 'auth.log'
+    log_file.write_text('Dec 1 00:00:01 server sshd[1]: Failed password for root\n')
+
+    parser = Parser(inference_socket=fake_server.server_address, parse_cache=True)
+    parsed_logs, _ = parser.parse_logs(str(log_file))
+    parser.parse_logs(str(log_file))
+    assert fake_server.total_sentences == 1
+
+    # labels of another server model are not read from the cache
+    fake_server.model_fingerprint = ['ner', ['model.bundle', 2, 2]]
+    parser.prediction_cache = type(parser.prediction_cache)(0)
+    assert parser.parse_logs(str(log_file))[0] == parsed_logs
+    assert fake_server.total_sentences == 2
+    parser.model.close()
+
+
+def test_suite_drivers_use_server(fake_server):
+    from pylogabstract.groundtruth.groundtruth import GroundTruth
+    from pylogabstract.misc.misc_utility import MiscUtility
+
+    # the multi-run drivers tag logs with the server instead of loading their own model
+    for parser in [GroundTruth('casper-rw', '', '', fake_server.server_address).parser,
+                   MiscUtility(fake_server.server_address).parser]:
+        parser.load_model()
+        assert isinstance(parser.model, InferenceClient)
+        assert parser.model.predict(['a', 'b']) == ['O', 'O']
+        parser.model.close()
+
+
+@pytest.mark.parametrize('method', ['pylogabstract', 'drain'])
+def test_experiment_uses_server(fake_server, method):
+    # the other abstraction methods need pandas
+    pytest.importorskip('pandas')
+    from pylogabstract.experiment.experiment import Experiment
+
+    experiment = Experiment(method, 'casper-rw', '', inference_socket=fake_server.server_address)
+    parser = experiment.log_abstraction.parser if method == 'pylogabstract' else experiment.misc_utility.parser
+    parser.load_model()
+    assert isinstance(parser.model, InferenceClient)
+    parser.model.close()
@@ -0,0 +1,106 @@
+import os
+import stat
+import time
+import threading
+import multiprocessing
+import pytest
+from pylogabstract.parser.inference_client import InferenceClient
+from pylogabstract.parser.inference_server import InferenceServer
+
+
+class StubModel(object):
+    # stands in for NERModel in the server process, the size of each batch is appended to batch_file
+    def __init__(self, batch_file):
+        self.batch_file = batch_file
+
+    def predict_sentences(self, sentences_raw):
+        with open(self.batch_file, 'a') as f:
+            f.write('%d\n' % len(sentences_raw))
+
+        return [['B-SER'] + ['O'] * (len(words) - 1) for words in sentences_raw]
+
+
+def get_labels(words):
+    return ['B-SER'] + ['O'] * (len(words) - 1) if words else []
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    # the real asyncio server in a forked process, only the model is stubbed
+    socket_path = str(tmp_path / 'ner.sock')
+    batch_file = str(tmp_path / 'batches.txt')
+    monkeypatch.setattr(InferenceServer, '_InferenceServer__load_model',
+                        lambda inference_server: setattr(inference_server, 'model', StubModel(batch_file)))
+
+    inference_server = InferenceServer(socket_path, max_wait=0.5)
+    process = multiprocessing.get_context('fork').Process(target=inference_server.serve_forever)
+    process.start()
+    for _ in range(200):
+        if os.path.exists(socket_path):
+            break
+        time.sleep(0.05)
+
+    yield inference_server, process, batch_file
+    if process.is_alive():
+        process.terminate()
+    process.join(10)
+
+
+def read_batches(batch_file):
+    with open(batch_file) as f:
+        return [int(line) for line in f]
+
+
+def test_server_round_trip(server):
+    inference_server, process, batch_file = server
+    assert stat.S_IMODE(os.stat(inference_server.socket_path).st_mode) == 0o600
+
+    client = InferenceClient(inference_server.socket_path)
+    assert client.get_model_fingerprint() == inference_server.model_fingerprint
+
+    # empty sentences are not sent to the model
+    sentences = [['Failed', 'password'], [], ['session', 'opened', 'for', 'root']]
+    assert client.predict_sentences(sentences) == [get_labels(words) for words in sentences]
+    assert client.predict(['cron']) == ['B-SER']
+    client.close()
+    assert read_batches(batch_file) == [2, 1]
+
+
+def test_server_batches_concurrent_clients(server):
+    inference_server, process, batch_file = server
+    total_clients = 4
+    clients = [InferenceClient(inference_server.socket_path) for _ in range(total_clients)]
+    for client in clients:
+        client.get_model_fingerprint()
+
+    # requests sent at the same time are predicted in one dynamic batch
+    barrier = threading.Barrier(total_clients)
+    labels = [None] * total_clients
+
+    def request(index):
+        barrier.wait()
+        labels[index] = clients[index].predict_sentences([['client', str(index)], ['line'] * (index + 1)])
+
+    threads = [threading.Thread(target=request, args=(index,)) for index in range(total_clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    for index in range(total_clients):
+        assert labels[index] == [get_labels(['client', str(index)]), get_labels(['line'] * (index + 1))]
+        clients[index].close()
+
+    batches = read_batches(batch_file)
+    assert sum(batches) == 2 * total_clients
+    assert len(batches) < total_clients
+
+
+def test_server_stops_on_sigterm(server):
+    inference_server, process, batch_file = server
+    process.terminate()
+    process.join(10)
+
+    # the socket is removed when the server stops
+    assert process.exitcode == 0
+    assert not os.path.exists(inference_server.socket_path)
@@ -0,0 +1,95 @@
+import random
+from collections import Counter
+import pytest
+from pylogabstract.abstraction.abstraction import LogAbstraction
+from pylogabstract.clustering.minhash_lsh import MinHashLSH
+from pylogabstract.preprocess.preprocess import Preprocess
+
+
+def get_random_word(length=6):
+    return ''.join(random.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(length))
+
+
+def get_messages(total_lines, seed=0):
+    # messages of 8 words from 20 templates with 2 to 5 variable positions
+    random.seed(seed)
+    templates = []
+    for _ in range(20):
+        variables = set(random.sample(range(8), random.randint(2, 5)))
+        templates.append([None if position in variables else get_random_word() for position in range(8)])
+
+    values = ['root', 'alice', 'bob'] + ['10.0.0.%d' % index for index in range(1, 30)] + \
+        ['user%d' % index for index in range(50)]
+    messages = []
+    for _ in range(total_lines):
+        template = random.choice(templates)
+        messages.append(' '.join(word if word else random.choice(values + [str(random.randint(1, 9999))])
+                                 for word in template))
+
+    return messages
+
+
+def get_pairs(labels):
+    # number of line pairs in the same abstraction
+    return sum(count * (count - 1) // 2 for count in Counter(labels).values())
+
+
+def get_line_labels(abstractions):
+    line_labels = {}
+    for abstraction_id, abstraction in abstractions.items():
+        for log_id in abstraction['log_id']:
+            line_labels[log_id] = abstraction_id
+
+    return [line_labels[log_id] for log_id in sorted(line_labels)]
+
+
+def get_abstractions(fake_model, log_file, lsh_config):
+    log_abstraction = LogAbstraction(workers=1, clustering_backend='girvan_newman', lsh_config=lsh_config)
+    log_abstraction.parser.model = fake_model
+    abstractions, _ = log_abstraction.get_abstraction(log_file)
+    log_abstraction.close()
+
+    return abstractions
+
+
+def test_buckets_cover_group():
+    preprocess = Preprocess({line_id: {'message': message} for line_id, message in enumerate(get_messages(500))}, {})
+    preprocess.get_unique_events()
+    group = preprocess.message_length_group[8]
+
+    buckets = MinHashLSH(preprocess.event_attributes, group).get_buckets()
+    assert sorted(event_id for bucket in buckets for event_id in bucket) == sorted(group)
+    assert all(bucket == sorted(bucket, key=group.index) for bucket in buckets)
+    assert MinHashLSH(preprocess.event_attributes, group).get_buckets() == buckets
+
+    with pytest.raises(ValueError):
+        MinHashLSH(preprocess.event_attributes, group, signatures=100, bands=32)
+
+
+def test_lsh_drift_is_bounded(fake_model, tmp_path):
+    lines = ['Dec 1 00:00:00 server app: %s\n' % message for message in get_messages(600)]
+    log_file = tmp_path / 'app.log'
+    log_file.write_text(''.join(lines))
+
+    exact = get_line_labels(get_abstractions(fake_model, str(log_file), None))
+    approximate = get_line_labels(get_abstractions(fake_model, str(log_file), {'min_group_size': 50}))
+
+    # pairs of lines that share an abstraction in both outputs, against the pairs of each output
+    same_pairs = get_pairs(list(zip(exact, approximate)))
+    assert same_pairs >= 0.95 * get_pairs(exact)
+    assert same_pairs >= 0.95 * get_pairs(approximate)
+    assert len(set(approximate)) <= 1.1 * len(set(exact)) + 2
+
+
+def test_small_bucket_work_is_bounded():
+    # half of the messages have no template, each of them stays in a bucket of its own
+    messages = get_messages(5000) + [' '.join(get_random_word() for _ in range(8)) for _ in range(5000)]
+    preprocess = Preprocess({line_id: {'message': message} for line_id, message in enumerate(messages)}, {})
+    preprocess.get_unique_events()
+    group = preprocess.message_length_group[8]
+
+    # small buckets are compared with one row per large bucket, not with every row of the large buckets
+    lsh = MinHashLSH(preprocess.event_attributes, group)
+    buckets = lsh.get_buckets()
+    assert sorted(event_id for bucket in buckets for event_id in bucket) == sorted(group)
+    assert 0 < lsh.comparisons <= 10 * len(group)
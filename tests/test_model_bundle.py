@@ -0,0 +1,33 @@
+from collections import OrderedDict
+import numpy as np
+from pylogabstract.parser.model.model_bundle import ModelBundle, get_vocab_arrays, write_bundle
+
+
+def test_bundle_round_trip(tmp_path):
+    vocab_words = {'$UNK$': 0, 'sshd': 1, 'password': 2, u'caf\xe9': 3, 'root': 4}
+    embeddings = np.arange(15, dtype=np.float32).reshape(5, 3)
+    weights = np.linspace(-1., 1., 12).astype(np.float32).reshape(3, 4)
+
+    arrays = OrderedDict()
+    blob, offsets, ids = get_vocab_arrays(vocab_words)
+    arrays['words/blob'] = blob
+    arrays['words/offsets'] = offsets
+    arrays['words/ids'] = ids
+    arrays['embeddings'] = embeddings
+    arrays['variable/proj/W'] = weights
+    filename = str(tmp_path / 'model.bundle')
+    write_bundle(filename, arrays, ['proj/W'], {'dim_word': 3})
+
+    bundle = ModelBundle(filename)
+    assert bundle.header['config'] == {'dim_word': 3}
+    assert np.array_equal(bundle.embeddings, embeddings)
+    assert np.array_equal(bundle.get_variables()['proj/W'], weights)
+    assert np.array_equal(bundle.get_word_embeddings([[1, 4], [0, 0]]), embeddings[[[1, 4], [0, 0]]])
+
+    vocab = bundle.get_vocab('words')
+    assert len(vocab) == len(vocab_words)
+    assert dict(vocab.items()) == vocab_words
+    for word, index in vocab_words.items():
+        assert vocab[word] == index
+    assert vocab.get('unknown') is None
+    assert 'unknown' not in vocab
@@ -0,0 +1,136 @@
+from collections import OrderedDict
+import pytest
+from pylogabstract.parser.model.config import Config
+from pylogabstract.parser.parse_cache import ParseCache
+from pylogabstract.parser.parser import Parser
+from pylogabstract.parser.prediction_cache import PredictionCache
+
+
+def get_parsed_logs():
+    parsed_logs = OrderedDict()
+    parsed_logs[0] = OrderedDict([('timestamp', 'Dec 1 00:00:01'), ('hostname', 'server'), ('service', 'sshd[42]:'),
+                                  ('message', 'Failed password for root')])
+    parsed_logs[1] = OrderedDict([('timestamp', 'Dec 1 00:00:02'), ('message', u'caf\xe9 opened')])
+    parsed_logs[2] = OrderedDict([('message', '')])
+    parsed_logs[3] = OrderedDict([('timestamp', 'Dec 1 00:00:03'), ('hostname', 'server'), ('service', 'cron:'),
+                                  ('message', 'session closed')])
+
+    return parsed_logs
+
+
+def test_put_get_round_trip(tmp_path):
+    parse_cache = ParseCache(str(tmp_path / 'cache'), 2 ** 20)
+    key = parse_cache.get_key('content hash', {'backend': 'ner'})
+    assert parse_cache.get(key) is None
+
+    parsed_logs = get_parsed_logs()
+    parse_cache.put(key, parsed_logs)
+    cached = parse_cache.get(key)
+
+    assert cached == parsed_logs
+    assert [list(parsed.keys()) for parsed in cached.values()] == \
+        [list(parsed.keys()) for parsed in parsed_logs.values()]
+
+
+def test_key_depends_on_fingerprint():
+    parse_cache = ParseCache('unused', 2 ** 20)
+    assert parse_cache.get_key('content hash', {'backend': 'ner'}) != \
+        parse_cache.get_key('content hash', {'backend': 'perceptron'})
+
+
+def test_file_hash(tmp_path):
+    log_file = tmp_path / 'auth.log'
+    log_file.write_bytes(b'first line\nsecond line\n')
+    parse_cache = ParseCache('unused', 2 ** 20)
+    file_hash = parse_cache.get_file_hash(str(log_file))
+    assert file_hash == parse_cache.get_file_hash(str(log_file))
+
+    log_file.write_bytes(b'first line\r\nsecond line\n')
+    assert parse_cache.get_file_hash(str(log_file)) != file_hash
+
+
+def test_eviction_keeps_cache_size(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    parse_cache = ParseCache(str(cache_dir), 1)
+    parse_cache.put(parse_cache.get_key('first', {}), get_parsed_logs())
+    parse_cache.put(parse_cache.get_key('second', {}), get_parsed_logs())
+
+    assert len(list(cache_dir.glob('*.npz'))) == 0
+
+
+def write_log(tmp_path, line_end):
+    lines = ['Dec 1 00:00:%02d server sshd[%d]: Failed password for root from 10.0.0.%d' % (index, index, index % 4)
+             for index in range(20)]
+    lines[3] = 'Dec 1 00:00:03 server su[3]: session\ropened for root'
+    log_file = tmp_path / 'auth.log'
+    log_file.write_bytes((line_end.join(lines) + line_end + line_end).encode('utf-8'))
+
+    return str(log_file)
+
+
+def test_parser_cache_is_off_by_default():
+    assert not Parser().config.use_parse_cache
+    assert Parser(parse_cache=True).config.use_parse_cache
+
+
+@pytest.mark.parametrize('line_end', ['\n', '\r\n'])
+@pytest.mark.parametrize('raw_log_store', [False, True])
+def test_cached_parse_matches_uncached(fake_model, tmp_path, monkeypatch, line_end, raw_log_store):
+    monkeypatch.setattr(Config, 'dir_parse_cache', str(tmp_path / 'cache'))
+    log_file = write_log(tmp_path, line_end)
+
+    parser = Parser(parse_cache=False)
+    parser.model = fake_model
+    parsed_logs, raw_logs = parser.parse_logs(log_file, raw_log_store=raw_log_store)
+    assert not (tmp_path / 'cache').exists()
+
+    # the first parse fills the cache, the second one does not run the model
+    cached_parser = Parser(parse_cache=True)
+    cached_parser.model = fake_model
+    for use_model in [True, False]:
+        total_sentences = fake_model.total_sentences
+        cached_parsed_logs, cached_raw_logs = cached_parser.parse_logs(log_file, raw_log_store=raw_log_store)
+        assert cached_parsed_logs == parsed_logs
+        assert list(cached_raw_logs.items()) == list(raw_logs.items())
+        assert (fake_model.total_sentences > total_sentences) == use_model
+
+
+def test_key_depends_on_prediction_cache_size(fake_model, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'dir_parse_cache', str(tmp_path / 'cache'))
+    log_file = write_log(tmp_path, '\n')
+
+    parser = Parser(parse_cache=True)
+    parser.model = fake_model
+    parser.parse_logs(log_file)
+    total_sentences = fake_model.total_sentences
+
+    # the shape cache changes labels, so results of another cache size are not read from the parse cache
+    parser.config.cache_size_parse = 10
+    parser.prediction_cache = PredictionCache(parser.config.cache_size_parse)
+    parser.parse_logs(log_file)
+    assert fake_model.total_sentences > total_sentences
+
+    total_sentences = fake_model.total_sentences
+    parser.parse_logs(log_file)
+    assert fake_model.total_sentences == total_sentences
+
+
+@pytest.mark.parametrize('parse_cache', [None, True])
+def test_suite_drivers_pass_parse_cache(parse_cache):
+    from pylogabstract.groundtruth.groundtruth import GroundTruth
+    from pylogabstract.misc.misc_utility import MiscUtility
+
+    assert GroundTruth('casper-rw', '', '', parse_cache=parse_cache).parser.config.use_parse_cache == \
+        bool(parse_cache)
+    assert MiscUtility(parse_cache=parse_cache).parser.config.use_parse_cache == bool(parse_cache)
+
+
+@pytest.mark.parametrize('method', ['pylogabstract', 'drain'])
+def test_experiment_passes_parse_cache(method):
+    # the other abstraction methods need pandas
+    pytest.importorskip('pandas')
+    from pylogabstract.experiment.experiment import Experiment
+
+    experiment = Experiment(method, 'casper-rw', '', parse_cache=True)
+    parser = experiment.log_abstraction.parser if method == 'pylogabstract' else experiment.misc_utility.parser
+    assert parser.config.use_parse_cache
@@ -0,0 +1,81 @@
+import sys
+import logging
+import numpy as np
+import pytest
+from pylogabstract.parser.model.config import Config
+from pylogabstract.parser.model.perceptron_tagger import PerceptronTagger
+from pylogabstract.parser.parser import Parser
+
+
+class TaggerConfig(object):
+    # the settings PerceptronTagger reads from Config
+    def __init__(self):
+        self.logger = logging.getLogger('test_perceptron_tagger')
+        self.vocab_tags = {'O': 0, 'B-TIM': 1, 'I-TIM': 2, 'I-HOS': 3, 'B-SER': 4}
+        self.nepochs_perceptron = 5
+        self.batch_size_parse = 4
+
+
+def get_dataset():
+    # syslog lines: timestamp, hostname, service, then the message
+    dataset = []
+    hosts = ['server', 'gateway', 'web01']
+    services = ['sshd[%d]:', 'su[%d]:', 'cron[%d]:', 'kernel:']
+    messages = [['Failed', 'password', 'for', 'root'], ['session', 'opened'], ['job', 'done', 'ok'], ['link', 'up']]
+    for index in range(24):
+        service = services[index % 4] % (100 + index) if '%d' in services[index % 4] else services[index % 4]
+        words = ['Dec', str(index % 28 + 1), '00:%02d:%02d' % (index, index), hosts[index % 3], service] + \
+            messages[index % 4]
+        tags = ['B-TIM', 'I-TIM', 'I-TIM', 'I-HOS', 'B-SER'] + ['O'] * len(messages[index % 4])
+        dataset.append((words, tags))
+
+    return dataset
+
+
+@pytest.fixture
+def tagger():
+    tagger = PerceptronTagger(TaggerConfig())
+    tagger.train(get_dataset(), get_dataset()[:4])
+
+    return tagger
+
+
+def test_train_and_tag(tagger):
+    dataset = get_dataset()
+    assert tagger.predict_sentences([words for words, tags in dataset]) == [tags for words, tags in dataset]
+    assert tagger.run_evaluate(dataset)['acc'] == 100.
+
+    # an unseen line of the same structure
+    words = ['Dec', '30', '00:59:07', 'server', 'sshd[7]:', 'Connection', 'closed']
+    assert tagger.predict(words) == ['B-TIM', 'I-TIM', 'I-TIM', 'I-HOS', 'B-SER', 'O', 'O']
+
+
+def test_save_restore_round_trip(tagger, tmp_path):
+    filename = str(tmp_path / 'perceptron.npz')
+    tagger.save(filename)
+
+    restored = PerceptronTagger(TaggerConfig())
+    restored.restore(filename)
+    assert restored.tags == tagger.tags
+    assert restored.features == tagger.features
+    assert np.array_equal(restored.weights, tagger.weights)
+    assert np.array_equal(restored.transitions, tagger.transitions)
+
+    sentences = [words for words, tags in get_dataset()]
+    assert restored.predict_sentences(sentences) == tagger.predict_sentences(sentences)
+
+
+def test_parser_loads_perceptron_without_tensorflow(tagger, tmp_path, monkeypatch):
+    filename = str(tmp_path / 'perceptron.npz')
+    tagger.save(filename)
+    monkeypatch.setattr(Config, 'filename_perceptron', filename)
+    monkeypatch.delitem(sys.modules, 'tensorflow', raising=False)
+
+    parser = Parser(backend='perceptron', parse_cache=False)
+    parser.load_model()
+    assert isinstance(parser.model, PerceptronTagger)
+    assert 'tensorflow' not in sys.modules
+
+    parsed_logs, raw_logs = parser.parse_lines(['Dec 1 00:00:01 server sshd[1]: Failed password for root\n'])
+    assert parsed_logs[0] == {'timestamp': 'Dec 1 00:00:01', 'hostname': 'server', 'service': 'sshd[1]:',
+                              'message': 'Failed password for root'}
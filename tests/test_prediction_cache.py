@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from pylogabstract.parser.parser import Parser
+from pylogabstract.parser.prediction_cache import PredictionCache
+
+
+def test_signature_masks_variable_tokens():
+    prediction_cache = PredictionCache(10)
+    signature = prediction_cache.get_signature(['Accepted', 'password', 'from', '192.168.1.20', 'port', '5022',
+                                                'pid=0x1f3a', 'session', 'deadbeef01', 'user1'])
+
+    assert signature == ('Accepted', 'password', 'from', '<ip>', 'port', '0', 'pid=<hex>', 'session', '<hex>',
+                         'user0')
+    assert prediction_cache.get_signature(['Accepted', 'password', 'from', '10.0.0.1', 'port', '22',
+                                           'pid=0xFF', 'session', '0123abcdef', 'user42']) == signature
+
+    # words are not masked, and the number of tokens is part of the signature
+    assert prediction_cache.get_signature(['Failed', 'password']) != prediction_cache.get_signature(['Accepted',
+                                                                                                   'password'])
+    assert prediction_cache.get_signature(['port', '22']) != prediction_cache.get_signature(['port', '22', '23'])
+
+
+def test_lru_eviction():
+    prediction_cache = PredictionCache(2)
+    prediction_cache.put(('a',), ['O'])
+    prediction_cache.put(('b',), ['O'])
+
+    # reading a keeps it, so b is the least recently used entry
+    assert prediction_cache.get(('a',)) == ['O']
+    prediction_cache.put(('c',), ['B-SER'])
+
+    assert len(prediction_cache) == 2
+    assert prediction_cache.get(('b',)) is None
+    assert prediction_cache.get(('a',)) == ['O']
+    assert prediction_cache.get(('c',)) == ['B-SER']
+    assert (prediction_cache.hits, prediction_cache.misses) == (3, 1)
+
+
+def test_max_size_zero_disables_cache():
+    prediction_cache = PredictionCache(0)
+    prediction_cache.put(('a',), ['O'])
+
+    assert len(prediction_cache) == 0
+    assert prediction_cache.get(('a',)) is None
+
+
+def get_words_raw():
+    words_raw = OrderedDict()
+    for line_id in range(6):
+        words_raw[line_id] = ('Dec 1 00:00:%02d server sshd[%d]: Failed password from 10.0.0.%d' %
+                              (line_id, line_id, line_id)).split()
+
+    return words_raw
+
+
+def test_parser_cache_is_off_by_default(fake_model):
+    parser = Parser(parse_cache=False)
+    parser.model = fake_model
+    assert parser.prediction_cache.max_size == 0
+
+    # every line is predicted
+    parser._Parser__get_parsed_batch(get_words_raw())
+    assert fake_model.total_sentences == 6
+
+
+def test_parser_cache_reuses_labels_of_same_shape(fake_model):
+    parser = Parser(parse_cache=False)
+    parser.model = fake_model
+    parser.prediction_cache = PredictionCache(10)
+
+    # the lines only differ in numbers and IP addresses, one of them is predicted
+    parsed_batch = parser._Parser__get_parsed_batch(get_words_raw())
+    assert fake_model.total_sentences == 1
+    assert [parsed['service'] for line_id, parsed in parsed_batch] == ['sshd[%d]:' % line_id for line_id in range(6)]
@@ -0,0 +1,72 @@
+import random
+from collections import OrderedDict
+from pylogabstract.preprocess.preprocess import Preprocess
+
+
+def get_parsed_logs(total_lines, seed=0):
+    # messages of a few templates, many of them repeated
+    random.seed(seed)
+    templates = ['session opened for user {} by (uid={})', 'Failed password for {} from {} port {} ssh2',
+                 'Connection closed by {}', 'pam_unix(sshd:auth): check pass; user {} unknown']
+    parsed_logs = OrderedDict()
+    for line_id in range(total_lines):
+        template = random.choice(templates)
+        variables = [random.choice(['root', 'alice', 'bob', '10.0.0.%d' % random.randint(1, 5), str(random.randint(0, 9))])
+                     for _ in range(template.count('{}'))]
+        parsed_logs[line_id] = {'message': template.format(*variables)}
+
+    return parsed_logs
+
+
+def get_baseline_unique_events(parsed_logs):
+    # list-based implementation this class replaced
+    event_attributes = {}
+    message_length_group = {}
+    unique_events_only = []
+    unique_event_id = 0
+    for line_id, parsed_log in parsed_logs.items():
+        if parsed_log['message'] not in unique_events_only:
+            unique_events_only.append(parsed_log['message'])
+            message_length = len(parsed_log['message'].split(' '))
+            message_length_group.setdefault(message_length, []).append(unique_event_id)
+            event_attributes[unique_event_id] = {'message': parsed_log['message'],
+                                                 'message_length': message_length,
+                                                 'cluster': unique_event_id,
+                                                 'member': [line_id]}
+            unique_event_id += 1
+        else:
+            for index, attr in event_attributes.items():
+                if parsed_log['message'] == attr['message']:
+                    attr['member'].append(line_id)
+
+    return event_attributes, message_length_group
+
+
+def test_unique_events_match_baseline():
+    parsed_logs = get_parsed_logs(2000)
+    preprocess = Preprocess(parsed_logs, {})
+    preprocess.get_unique_events()
+    event_attributes, message_length_group = get_baseline_unique_events(parsed_logs)
+
+    assert dict(preprocess.message_length_group) == message_length_group
+    assert preprocess.event_attributes.keys() == event_attributes.keys()
+    for event_id, attributes in event_attributes.items():
+        tokens = preprocess.event_attributes[event_id].pop('tokens')
+        assert len(tokens) == len(attributes['message'].split())
+        assert preprocess.event_attributes[event_id] == attributes
+
+
+def test_update_unique_events_in_batches():
+    parsed_logs = get_parsed_logs(1000, seed=1)
+    preprocess = Preprocess(parsed_logs, {})
+    preprocess.get_unique_events()
+
+    batched = Preprocess()
+    items = list(parsed_logs.items())
+    for start in range(0, len(items), 128):
+        batched.update_unique_events(items[start:start + 128])
+
+    assert dict(batched.message_length_group) == dict(preprocess.message_length_group)
+    for event_id, attributes in preprocess.event_attributes.items():
+        assert batched.event_attributes[event_id]['member'] == attributes['member']
+        assert batched.event_attributes[event_id]['tokens'].tolist() == attributes['tokens'].tolist()
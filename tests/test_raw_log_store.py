@@ -0,0 +1,49 @@
+from pylogabstract.abstraction.abstraction import LogAbstraction
+from pylogabstract.parser.parser import Parser
+from pylogabstract.parser.raw_log_store import RawLogStore
+
+
+def write_log(tmp_path):
+    # lone carriage returns end a line in text mode, like a newline
+    data = (b'Dec 1 00:00:01 server sshd[1]: Failed password\rfor root\n'
+            b'\r'
+            b'Dec 1 00:00:02 server sshd[2]: Connection closed\r\n'
+            b'\r\n'
+            b'Dec 1 00:00:03 server su[3]: session\ropened\r\rfor user root\n'
+            b'Dec 1 00:00:04 server cron[4]: job done\r')
+    log_file = tmp_path / 'auth.log'
+    log_file.write_bytes(data)
+
+    return str(log_file)
+
+
+def test_store_lines_match_text_mode(fake_model, tmp_path):
+    log_file = write_log(tmp_path)
+    with open(log_file) as f:
+        text_lines = [line for line in f if line not in ['\n', '\r\n']]
+
+    parser = Parser(parse_cache=False)
+    parser.model = fake_model
+    parsed_logs, raw_logs = parser.parse_logs(log_file)
+    store_parsed_logs, store_raw_logs = parser.parse_logs(log_file, raw_log_store=True)
+    store_raw_logs.close()
+
+    assert list(raw_logs.values()) == text_lines
+    assert list(store_raw_logs.values()) == text_lines
+    assert store_parsed_logs == parsed_logs
+
+
+def test_close_releases_raw_log_store(fake_model, auth_log):
+    log_abstraction = LogAbstraction(workers=1)
+    log_abstraction.parser.model = fake_model
+    _, raw_logs = log_abstraction.get_abstraction(auth_log)
+    assert isinstance(raw_logs, RawLogStore)
+    first_line = raw_logs[0]
+    assert raw_logs._RawLogStore__mmap is not None
+
+    log_abstraction.close()
+    assert raw_logs._RawLogStore__mmap is None
+
+    # lines can still be read, the file is mapped again on access
+    assert raw_logs[0] == first_line
+    raw_logs.close()
@@ -0,0 +1,69 @@
+from pylogabstract.parser import shard_parser
+from pylogabstract.parser.parser import Parser
+from pylogabstract.parser.shard_parser import ShardParser, parse_shard
+
+
+def get_parser(fake_model):
+    parser = Parser()
+    parser.model = fake_model
+
+    return parser
+
+
+def write_log(tmp_path):
+    # lone carriage returns, windows line ends and empty lines
+    data = (b'Dec 1 00:00:01 server sshd[1]: Failed password\rfor root\n'
+            b'\n'
+            b'Dec 1 00:00:02 server sshd[2]: Connection closed\r\n'
+            b'\r\n'
+            b'Dec 1 00:00:03 server su[3]: session\ropened\r\rfor user root\n'
+            b'Dec 1 00:00:04 server cron[4]: job done')
+    log_file = tmp_path / 'auth.log'
+    log_file.write_bytes(data)
+
+    return str(log_file)
+
+
+def parse_shards(log_file, raw_log_store):
+    shards = ShardParser(log_file, 3, {}, 40).get_shards()
+    parsed_logs, raw_logs = [], []
+    for start, end in shards:
+        shard_parsed_logs, shard_raw_logs = parse_shard((log_file, start, end, raw_log_store))
+        parsed_logs.extend(shard_parsed_logs)
+        raw_logs.extend(shard_raw_logs)
+
+    return parsed_logs, raw_logs
+
+
+def test_raw_log_store_shards_match_serial(fake_model, tmp_path, monkeypatch):
+    log_file = write_log(tmp_path)
+    parser = get_parser(fake_model)
+    monkeypatch.setattr(shard_parser, 'worker_parser', parser)
+
+    parsed_logs, raw_logs = parser.parse_logs(log_file, raw_log_store=True)
+    shard_parsed_logs, line_offsets = parse_shards(log_file, True)
+
+    assert shard_parsed_logs == list(parsed_logs.values())
+    assert line_offsets == [(raw_logs.offsets[line_id], raw_logs.lengths[line_id]) for line_id in raw_logs]
+
+
+def test_text_shards_match_serial(fake_model, tmp_path, monkeypatch):
+    log_file = write_log(tmp_path)
+    parser = get_parser(fake_model)
+    monkeypatch.setattr(shard_parser, 'worker_parser', parser)
+
+    parsed_logs, raw_logs = parser.parse_logs(log_file)
+    shard_parsed_logs, shard_raw_logs = parse_shards(log_file, False)
+
+    assert shard_parsed_logs == list(parsed_logs.values())
+    assert shard_raw_logs == list(raw_logs.values())
+
+
+def test_init_worker_loads_model(monkeypatch):
+    loaded = []
+    monkeypatch.setattr(Parser, 'load_model', lambda parser: loaded.append(parser))
+    monkeypatch.setattr(shard_parser, 'worker_parser', None)
+    shard_parser.init_worker({'backend': 'ner', 'batch_size_parse': 16})
+
+    assert loaded == [shard_parser.worker_parser]
+    assert shard_parser.worker_parser.config.batch_size_parse == 16
@@ -0,0 +1,34 @@
+from collections import OrderedDict
+from pylogabstract.abstraction.template_matcher import TemplateMatcher
+
+
+def get_abstractions():
+    return {0: {'abstraction': 'Failed password for * from * port * ssh2'},
+            1: {'abstraction': 'Failed password for root from * port * ssh2'},
+            2: {'abstraction': 'session opened for user *'},
+            3: {'abstraction': 'Connection closed by *'}}
+
+
+def test_match():
+    template_matcher = TemplateMatcher(get_abstractions())
+
+    assert template_matcher.match('Failed password for root from 10.0.0.1 port 22 ssh2'.split()) == 1
+    assert template_matcher.match('Failed password for bob from 10.0.0.1 port 22 ssh2'.split()) == 0
+    assert template_matcher.match('session opened for user root'.split()) == 2
+    assert template_matcher.match('session opened for root'.split()) is None
+    assert template_matcher.match_parsed(OrderedDict([('hostname', 'Connection'),
+                                                      ('message', 'closed by 10.0.0.2')])) == 3
+
+
+def test_save_load_round_trip(tmp_path):
+    template_matcher = TemplateMatcher(get_abstractions())
+    json_file = str(tmp_path / 'matcher.json')
+    template_matcher.save(json_file)
+    loaded = TemplateMatcher.load(json_file)
+
+    assert loaded.tree == template_matcher.tree
+    assert loaded.abstractions == template_matcher.abstractions
+    assert len(loaded) == len(template_matcher)
+    for line in ['Failed password for root from 10.0.0.1 port 22 ssh2', 'Connection closed by 10.0.0.2',
+                 'session opened for user root', 'unknown line']:
+        assert loaded.match(line.split()) == template_matcher.match(line.split())